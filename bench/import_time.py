@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#===========================================================================
+#
+# Import time benchmark.
+#
+#===========================================================================
+"""Measure the import time of the command line and server entry points.
+
+Usage:  python bench/import_time.py [-n REPEAT] [--top N]
+
+Each entry point is imported in a new interpreter with python -X importtime
+and the best total time of the runs is reported along with the slowest
+modules.  The command line entry point must not import any of the server
+only modules in HEAVY - the script exits with an error if it does so this
+can be used to catch regressions.
+"""
+import argparse
+import subprocess
+import sys
+
+# Entry point name -> module to import.
+TARGETS = {
+    "cli" : "insteon_mqtt.cmd_line.main",
+    "server" : "insteon_mqtt.cmd_line.start",
+    }
+
+# Modules the command line tool should never import.
+HEAVY = ["jinja2", "requests", "serial", "insteon_mqtt.mqtt.Mqtt",
+         "insteon_mqtt.network.Hub", "insteon_mqtt.Modem"]
+
+
+#===========================================================================
+def import_time(module):
+    """Import a module in a new interpreter.
+
+    Args:
+      module (str):  The module to import.
+
+    Returns:
+      (float, list):  Returns the total time in seconds and a list of
+      (cumulative seconds, module name) for every imported module.
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", "import " + module]
+    result = subprocess.run(cmd, cwd=".", stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True)
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        if not fields[1].strip().isdigit():
+            continue
+
+        times.append((int(fields[1]) * 1e-6, fields[2].strip()))
+
+    total = [t for t, name in times if name == module]
+    return total[-1], times
+
+
+#===========================================================================
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("-n", "--repeat", type=int, default=5,
+                   help="Number of times to run each import.")
+    p.add_argument("--top", type=int, default=5,
+                   help="Number of slowest modules to show.")
+    args = p.parse_args()
+
+    status = 0
+    for name, module in TARGETS.items():
+        runs = [import_time(module) for _ in range(args.repeat)]
+        total, times = min(runs, key=lambda x: x[0])
+        print("%-8s %-30s %.3f sec" % (name, module, total))
+
+        top = sorted((i for i in times if i[1] != module),
+                     reverse=True)[:args.top]
+        for t, mod in top:
+            print("    %.3f %s" % (t, mod))
+
+        if name == "cli":
+            loaded = [mod for t, mod in times if mod in HEAVY]
+            if loaded:
+                print("ERROR: command line imports %s" % ", ".join(loaded))
+                status = 1
+
+    return status
+
+
+#===========================================================================
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+#===========================================================================
+#
+# Inbound message parsing benchmark.
+#
+#===========================================================================
+"""Measure the Protocol parse rate in messages/second.
+
+Usage:  python bench/parse.py [stream.txt] [-n REPEAT]
+
+The input file is a recorded PLM stream written as hex bytes (whitespace
+is ignored and lines starting with # are comments).  Each line is fed to
+the parser as one link read.  If no file is input, a synthetic stream of
+broadcast, cleanup, ack, and extended messages is used instead.
+"""
+import argparse
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+import insteon_mqtt as IM  # noqa: E402
+
+
+# Synthetic stream: broadcast + duplicate, cleanup, direct ack, extended.
+SYNTHETIC = [
+    "02 50 3e e2 c4 00 00 01 cf 11 00",
+    "02 50 3e e2 c4 00 00 01 cb 11 00",
+    "02 50 3e e2 c4 44 85 11 4f 11 01",
+    "02 50 48 3d 46 44 85 11 2f 11 ff",
+    "02 51 48 3d 46 44 85 11 1f 2f 00 00 01 0f ff 00 a2 00 44 85 11 ff "
+    "1f 01 00",
+    ]
+
+
+#===========================================================================
+class Link:
+    """Minimal network link that the Protocol can connect to."""
+    def __init__(self):
+        self.signal_read = IM.Signal()
+        self.signal_wrote = IM.Signal()
+
+    def poll(self, t):
+        pass
+
+    def write(self, data, next_write_time):
+        pass
+
+
+#===========================================================================
+def load(path):
+    lines = SYNTHETIC
+    if path:
+        with open(path) as f:
+            lines = [i for i in f if i.strip() and not i.startswith("#")]
+
+    return [bytes.fromhex(i.replace(" ", "").strip()) for i in lines]
+
+
+#===========================================================================
+def main():
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("stream", nargs="?", help="Recorded hex stream file.")
+    p.add_argument("-n", "--repeat", type=int, default=20000,
+                   help="Number of times to replay the stream.")
+    args = p.parse_args()
+
+    chunks = load(args.stream)
+
+    link = Link()
+    proto = IM.Protocol(link)
+    count = [0]
+
+    # Count every parsed message, including dropped duplicates.
+    is_duplicate = proto._is_duplicate
+
+    def counter(msg):
+        count[0] += 1
+        return is_duplicate(msg)
+
+    proto._is_duplicate = counter
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for data in chunks:
+            link.signal_read.emit(link, data)
+
+    dt = time.perf_counter() - t0
+    print("%d messages in %.3f sec: %.0f messages/sec" %
+          (count[0], dt, count[0] / dt))
+
+
+#===========================================================================
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ from . import message as Msg
 from . import util
 from . import Scenes
 from .Signal import Signal
+from .StartupRefresh import StartupRefresh
+from .StateCache import StateCache
 
 LOG = log.get_logger()
 
@@ -51,6 +53,9 @@ class Modem:
 
         self.save_path = None
 
+        # Saved device states.  Created in load_config_step2 if enabled.
+        self.state_cache = None
+
         # Map of Address.id -> Device and name -> Device.  name is optional
         # so devices might not be in that map.
         self.devices = {}
@@ -66,8 +71,19 @@ class Modem:
         # Map of Virtual Modem Scene Names to groups
         self.scene_map = {}
 
-        # Signal to emit when a new device is added.
+        # Signal to emit when a new device is added or removed.
         self.signal_new_device = Signal()  # emit(modem, device)
+        self.signal_remove_device = Signal()  # emit(modem, device)
+
+        # Loaded insteon config data.  Used by reload_config() to find the
+        # changes.
+        self._config = None
+
+        # Startup refresh progress.  done and total are the number of
+        # devices, deferred is the number of battery devices that will be
+        # refreshed when they wake up.
+        # emit(modem, done, total, deferred)
+        self.signal_refresh_progress = Signal()
 
         # Remove (mqtt) commands mapped to methods calls.  These are handled
         # in run_command().  Commands should all be lower case (inputs are
@@ -144,6 +160,10 @@ class Modem:
         - storage   Path to store database records in.
         - startup_refresh    True if device databases should be checked for
                              new entries on start up.
+        - startup_refresh_window   Time in seconds to spread the startup
+                                   refresh of the devices over.
+        - state_cache   True if device states should be saved and restored
+                        at start up.
         - devices   List of devices.  Each device is a type and insteon
                     address of the device.
 
@@ -204,6 +224,7 @@ class Modem:
                           "config %s", self.addr)
 
         self.label = "%s (%s)" % (self.addr, self.name)
+        self._config = config_data
 
         # Load the modem database.
         if 'storage' in config_data:
@@ -231,12 +252,20 @@ class Modem:
         self.scenes = Scenes.SceneManager(self,
                                           config_data.get('scenes', None))
 
+        # Restore the saved device states.  This publishes them right away,
+        # the refresh below will confirm them.
+        if config_data.get('state_cache', False) is True and self.save_path:
+            path = os.path.join(self.save_path, "state.json")
+            self.state_cache = StateCache(self, path)
+            self.state_cache.load()
+            self.state_cache.connect(self.devices.values())
+
         # Send refresh messages to each device to check if the database is up
-        # to date.
+        # to date.  These are staged so other commands aren't blocked.
         if config_data.get('startup_refresh', False) is True:
-            LOG.info("Starting device refresh")
-            for device in self.devices.values():
-                device.refresh()
+            window = config_data.get('startup_refresh_window', 0)
+            refresh = StartupRefresh(self, window)
+            refresh.start(self.devices.values())
 
     #-----------------------------------------------------------------------
     def get_addr(self, on_done=None):
@@ -378,10 +407,103 @@ class Modem:
           device: The device object to add.  If the device doesn't exist,
                   nothing is done.
         """
-        self.devices.pop(device.addr.id, None)
+        if self.devices.pop(device.addr.id, None) is None:
+            return
+
         if device.name:
             self.device_names.pop(device.name, None)
 
+        self.signal_remove_device.emit(self, device)
+
+    #-----------------------------------------------------------------------
+    def reload_config(self, data):
+        """Apply a changed configuration without restarting.
+
+        This should be the insteon key in the configuration data.  Devices
+        that were removed from the config or whose type or extra settings
+        changed are removed and new devices are created for the new
+        entries.  Renamed devices keep their state and message history.
+        The scenes file is loaded again.  The modem connection and storage
+        settings can't be changed while running so a warning is logged if
+        they changed.
+
+        Args:
+          data (dict):  Configuration data to load.
+
+        Returns:
+          dict:  Returns the labels of the 'added', 'removed', and
+          'renamed' devices.
+        """
+        LOG.info("Reloading configuration data")
+        old_data = self._config or {}
+
+        # Settings that are applied below.  Everything else needs a restart.
+        reloaded = ['devices', 'scenes', 'startup_refresh',
+                    'startup_refresh_window']
+        for key in sorted(set(old_data) | set(data)):
+            if key not in reloaded and old_data.get(key) != data.get(key):
+                LOG.warning("Config setting insteon.%s changed - restart to "
+                            "use the new value", key)
+
+        old = config.parse_devices(old_data.get('devices', {}))
+        new = config.parse_devices(data.get('devices', {}))
+        result = {'added' : [], 'removed' : [], 'renamed' : []}
+
+        # Remove the devices that are gone or have changed types.
+        for addr_id, (device_type, _, _, config_extra) in old.items():
+            device = self.devices.get(addr_id, None)
+            entry = new.get(addr_id, None)
+            if device is None or (entry is not None and
+                                  entry[0] == device_type and
+                                  entry[3] == config_extra):
+                continue
+
+            LOG.info("Removed %s at %s", device_type, device.label)
+            self.remove(device)
+            result['removed'].append(device.label)
+
+        added = []
+        for addr_id, (device_type, value, name, _) in new.items():
+            device = self.devices.get(addr_id, None)
+            if device is None:
+                dev_class, kwargs = config.find(device_type)
+                for dev in dev_class.from_config([value], self.protocol, self,
+                                                 **kwargs):
+                    LOG.info("Created %s at %s", device_type, dev.label)
+                    self.add(dev)
+                    self.signal_new_device.emit(self, dev)
+                    added.append(dev)
+                    result['added'].append(dev.label)
+
+            elif device.name_user_case != name:
+                # Removing and adding the device again updates the name map
+                # and lets the MQTT device unsubscribe from the old topics.
+                old_label = device.label
+                self.remove(device)
+                device.name_user_case = name
+                device.name = name.lower() if name is not None else None
+                device.label = str(device.addr)
+                if device.name:
+                    device.label += " (%s)" % device.name
+
+                LOG.info("Renamed %s to %s", old_label, device.label)
+                self.add(device)
+                self.signal_new_device.emit(self, device)
+                result['renamed'].append(device.label)
+
+        # Scenes are defined using the device names and addresses.
+        self.scenes = Scenes.SceneManager(self, data.get('scenes', None))
+
+        if added and self.state_cache:
+            self.state_cache.connect(added)
+
+        if added and data.get('startup_refresh', False) is True:
+            window = data.get('startup_refresh_window', 0)
+            StartupRefresh(self, window).start(added)
+
+        self._config = data
+        return result
+
     #-----------------------------------------------------------------------
     def find(self, addr):
         """Find a device by address.
@@ -830,22 +952,38 @@ class Modem:
             seq.add(self.sync, dry_run, refresh=False, sequence=sequence)
         else:
             LOG.ui("Syncing %s device %s", self.label, dry_run_text)
-            # Perform diff after refresh
-            diff = self.db_config.diff(self.db)
-
-            if len(diff.del_entries) > 0 or len(diff.add_entries) > 0:
-                for entry in diff.del_entries:
-                    seq.add(self._sync_del, entry, dry_run)
-                for entry in diff.add_entries:
-                    seq.add(self._sync_add, entry, dry_run)
-            else:
-                LOG.ui("  No changes necessary.")
+            self._sync_diff(seq, dry_run)
 
         if sequence is None:
             seq.run()
         else:
             on_done(True, "Sync Complete", None)
 
+    def _sync_diff(self, seq, dry_run):
+        '''Adds the Changes Needed to Sync the Modem to a Sequence
+
+        Used by sync() after the database has been refreshed.
+        '''
+        # Skip the diff if the config and database are the same as the
+        # last time no changes were needed.
+        sync_key = self._sync_key()
+        if sync_key is not None and self.db.get_meta('sync') == sync_key:
+            LOG.ui("  No changes necessary.")
+            return
+
+        # Perform diff after refresh
+        diff = self.db_config.diff(self.db)
+
+        if len(diff.del_entries) > 0 or len(diff.add_entries) > 0:
+            for entry in diff.del_entries:
+                seq.add(self._sync_del, entry, dry_run)
+            for entry in diff.add_entries:
+                seq.add(self._sync_add, entry, dry_run)
+        else:
+            LOG.ui("  No changes necessary.")
+            if sync_key is not None:
+                self.db.set_meta('sync', sync_key)
+
     def _sync_del(self, entry, dry_run, on_done=None):
         '''Deletes a link on the device with a Log UI Message
 
@@ -870,6 +1008,21 @@ class Modem:
             LOG.ui("  Adding %s:", entry)
             self.db.add_on_device(entry, on_done=on_done)
 
+    def _sync_key(self):
+        """Returns the Key Used to Skip Unchanged Syncs
+
+        The modem database doesn't have a delta so the key is the hash of the
+        scenes config links and the hash of the modem database links.
+
+        Returns:
+          (dict) The key or None if there is no config database.
+        """
+        if self.db_config is None:
+            return None
+
+        return {"config": self.db_config.content_hash(),
+                "db": self.db.content_hash()}
+
     #-----------------------------------------------------------------------
     def sync_all(self, dry_run=True, refresh=True, on_done=None):
         """Perform the 'sync' command on all devices.
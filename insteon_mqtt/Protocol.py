@@ -7,6 +7,7 @@ import collections
 import enum
 import time
 import datetime
+import logging
 from . import log
 from . import message as Msg
 from .Signal import Signal
@@ -27,8 +28,10 @@ class WriteStatus(enum.Enum):
     WAIT_FOR_REPLY = 2
 
 
-# Output message and handler stored together.
-OutputMsg = collections.namedtuple('OutputMsg', ['msg', 'handler'])
+# Output message and handler stored together with the UI callback of the
+# command session that sent the message.
+OutputMsg = collections.namedtuple('OutputMsg', ['msg', 'handler',
+                                                 'ui_callback'])
 
 
 class Protocol:
@@ -214,7 +217,7 @@ class Protocol:
             return
 
         # Normal message queue.
-        output = OutputMsg(msg, msg_handler)
+        output = OutputMsg(msg, msg_handler, log.get_ui_callback())
         if not high_priority:
             self._write_queue.append(output)
 
@@ -241,9 +244,10 @@ class Protocol:
         if wait_time == 0 or wait_time > self._next_write_time:
             wait_time = time.time() if wait_time == 0 else wait_time
             self._next_write_time = wait_time
-            print_time = datetime.datetime.fromtimestamp(
-                self._next_write_time).strftime('%H:%M:%S.%f')[:-3]
-            LOG.debug("Setting next write time: %s", print_time)
+            if LOG.isEnabledFor(logging.DEBUG):
+                print_time = datetime.datetime.fromtimestamp(
+                    self._next_write_time).strftime('%H:%M:%S.%f')[:-3]
+                LOG.debug("Setting next write time: %s", print_time)
 
     #-----------------------------------------------------------------------
     def get_next_write_time(self):
@@ -257,6 +261,17 @@ class Protocol:
         """
         return self._next_write_time
 
+    #-----------------------------------------------------------------------
+    def write_queue_size(self):
+        """Returns the number of messages waiting to be written.
+
+        This includes the message currently waiting for replies.
+
+        Returns:
+          int:  The number of messages in the write queue.
+        """
+        return len(self._write_queue)
+
     #-----------------------------------------------------------------------
     def is_addr_in_write_queue(self, addr):
         """Checks whether a message to the specified address already exists
@@ -294,9 +309,11 @@ class Protocol:
         # If we're waiting for a reply, ask the write handler if it's past
         # the time out in which case we'll mark this message as finished and
         # move on.
-        if (self._write_status == WriteStatus.WAIT_FOR_REPLY and
-                self._write_queue[0].handler.is_expired(self, t)):
-            self._write_finished()
+        if self._write_status == WriteStatus.WAIT_FOR_REPLY:
+            out = self._write_queue[0]
+            with log.ui_callback(out.ui_callback):
+                if out.handler.is_expired(self, t):
+                    self._write_finished()
 
     #-----------------------------------------------------------------------
     def _data_read(self, link, data):
@@ -310,6 +327,10 @@ class Protocol:
           link (network.Link): The serial connection that read the data.
           data (bytes): bytes: The data that was read.
         """
+        # This is called by the link as soon as the data is read so use the
+        # current time as the receive time for every message in the data.
+        read_time = time.time()
+
         # Append the read data to the inbound message buffer.
         self._buf.extend(data)
 
@@ -378,6 +399,11 @@ class Protocol:
             self._buf = self._buf[msg_size:]
             LOG.info("Read %#04x: %s", msg_type, msg)
 
+            # Standard and extended messages compute their expiration time
+            # from the read time.
+            if isinstance(msg, (Msg.InpStandard, Msg.InpExtended)):
+                msg.read_time = read_time
+
             if self._is_duplicate(msg):
                 LOG.info("Ignored duplicate %s", msg)
             else:
@@ -460,9 +486,14 @@ class Protocol:
         # expects. If it's CONTINUE, it processed the message but expects
         # more.  If it's UNKNOWN, the handler ignored that message.
         if self._write_queue:
-            handler = self._write_queue[0].handler
+            out = self._write_queue[0]
+            handler = out.handler
             LOG.debug("Passing msg to write handler: %s", handler)
-            status = handler.msg_received(self, msg)
+
+            # Run the handler in the command session that sent the message
+            # so UI messages are sent to the right session.
+            with log.ui_callback(out.ui_callback):
+                status = handler.msg_received(self, msg)
 
             # Handler is finished.  Send the next outgoing message if one is
             # waiting.
@@ -553,7 +584,8 @@ class Protocol:
         msg_bytes = out.msg.to_bytes()
 
         LOG.info("Write message to modem: %s", out.msg)
-        LOG.debug("Write bytes to modem: %s", msg_bytes.hex())
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Write bytes to modem: %s", msg_bytes.hex())
 
         # Write the message to the PLM modem.  The message will only be sent
         # when the current time is after the next write time as tracked by
@@ -0,0 +1,134 @@
+#===========================================================================
+#
+# Modem scene substitution for multi-device commands.
+#
+#===========================================================================
+from . import log
+
+LOG = log.get_logger()
+
+
+class ScenePlanner:
+    """Replaces direct commands to many devices with modem scenes.
+
+    Each direct on/off command is a separate round trip to the PLM.  If a
+    modem group already has exactly the requested devices as responders at
+    the requested levels, one modem scene broadcast changes all of them in
+    a single transmission.  When the scene is ACK'ed, Modem.handle_scene
+    updates the state of every responder.
+
+    The planner only uses a modem group if every responder of the group is
+    in the requested set and would end up in the requested state.  Groups
+    that would change other devices, or the requested devices to a
+    different level, are never used.
+    """
+    def __init__(self, modem, min_devices=2):
+        """Constructor
+
+        Args:
+          modem (Modem):  The Insteon modem with the scene groups.
+          min_devices (int):  The minimum number of requested devices a
+                      scene must cover to be used.
+        """
+        self.modem = modem
+        self.min_devices = min_devices
+
+    #-----------------------------------------------------------------------
+    def plan(self, targets):
+        """Plan the scenes and direct commands for a set of targets.
+
+        Each target is a (device, group, is_on, level) tuple where group is
+        the local group (button) of the device and level is the requested
+        on level or None for the device default.
+
+        Args:
+          targets (list):  The requested (device, group, is_on, level)
+                  targets.
+
+        Returns:
+          (list, list):  Returns the scenes and the leftover targets.
+          Scenes are (modem group, is_on, [targets]) tuples and the
+          leftover targets need direct commands.
+        """
+        by_addr = {}
+        for target in targets:
+            by_addr[target[0].addr] = target
+
+        # Find the groups that only change the requested devices.
+        candidates = []
+        for group in sorted(self.modem.db.groups):
+            entries = self.modem.db.find_group(group)
+            if len(entries) < self.min_devices:
+                continue
+
+            for is_on in (True, False):
+                covered = self._match(group, entries, is_on, by_addr)
+                if covered:
+                    candidates.append((group, is_on, covered))
+                    break
+
+        # Greedily use the group that covers the most devices that haven't
+        # been covered yet.
+        scenes = []
+        done = set()
+        while candidates:
+            best = max(candidates,
+                       key=lambda x: len(set(x[2]) - done))
+            num = len(set(best[2]) - done)
+            if num < self.min_devices:
+                break
+
+            candidates.remove(best)
+            done.update(best[2])
+            scenes.append((best[0], best[1],
+                           [by_addr[addr] for addr in best[2]]))
+            LOG.debug("Modem group %s covers %d devices", best[0], num)
+
+        leftovers = [i for i in targets if i[0].addr not in done]
+        return scenes, leftovers
+
+    #-----------------------------------------------------------------------
+    def _match(self, group, entries, is_on, by_addr):
+        """See if a modem group sets all its responders as requested.
+
+        Args:
+          group (int):  The modem group number.
+          entries (list):  The modem controller entries of the group.
+          is_on (bool):  True for an on scene, False for an off scene.
+          by_addr (dict):  Address to requested target.
+
+        Returns:
+          list:  Returns the addresses covered by the group or None if the
+          group can't be used.
+        """
+        covered = []
+        for entry in entries:
+            target = by_addr.get(entry.addr)
+            if target is None:
+                return None
+
+            device, local_group, target_on, level = target
+            if target_on != is_on:
+                return None
+
+            resp = device.db.find(self.modem.addr, group, is_controller=False)
+            if resp is None:
+                return None
+
+            if (device.group_cmd_local_group(resp) != local_group or
+                    device.group_cmd_on_off(resp, is_on) != is_on):
+                return None
+
+            # Switches have no scene level.  For dimmers, the requested
+            # level has to match.  No level means the device default which
+            # depends on the current state so direct commands are used.
+            if is_on:
+                scene_level = device.group_cmd_on_level(resp, is_on)
+                if scene_level is not None and scene_level != level:
+                    return None
+
+            covered.append(entry.addr)
+
+        return covered
+
+    #-----------------------------------------------------------------------
@@ -28,6 +28,12 @@ class SceneManager:
         self.path = path
         self.data = []
         self.entries = []
+
+        # Index of the scenes each device is in.  Keys are the device
+        # (address, group) and values are lists of SceneEntry.  Maintained
+        # by append_scene, del_scene and the SceneEntry append/del methods.
+        self._ctrl_index = {}
+        self._resp_index = {}
         self._load()
 
     #-----------------------------------------------------------------------
@@ -55,9 +61,12 @@ class SceneManager:
         # There is never more than one controller in this case
         new_controller = new_entry.controllers[0]
 
-        # Loop existing Scenes
+        # Find the first existing scene with this controller
         found_controller = None
-        for scene in self.entries:
+        scenes = self.find_scenes(new_controller)
+        if len(scenes) > 1:
+            scenes = sorted(scenes, key=self.entries.index)
+        for scene in scenes:
             found_controller = scene.find_controller(new_controller)
             if found_controller is not None:
                 for new_responder in new_entry.responders:
@@ -121,80 +130,37 @@ class SceneManager:
 
         Attempts to make things more readable to humans, by compressing
         scene defintions.  Any two definitions that have identical
-        controllers are merged.
+        responders are merged by combining their controllers.
 
         This is a companion to compress_responders and compress_n_way.  These
         are seperate functions so that they can be called seperately using
         Stacks.
+        """
+        def merge(target, scene):
+            for new_controller in scene.controllers:
+                target.append_controller(new_controller)
 
-        This function only processes the scenes in a single pass.  If it runs
-        multiple passes, it may further compress things.  However, this
-        function is a bit time consuming, so can't keep looping through it.
-
-        """
-        i = 0
-        while i < len(self.entries):
-            found = False
-            test_scene = self.entries[i]
-            # Anything less than or equal to ourselves has already been tested
-            j = i + 1
-            while j < len(self.entries):
-                scene = self.entries[j]
-                j += 1
-                # Merge controllers that have identical responders
-                if Counter(test_scene.responders) == Counter(scene.responders):
-                    for new_controller in test_scene.controllers:
-                        scene.append_controller(new_controller)
-                    if test_scene.name is not None:
-                        scene.name = test_scene.name
-                    self.del_scene(test_scene)
-                    found = True
-                    break
-            if found is not True:
-                # if we found something we deleted the current entry so check
-                # this position again.
-                i += 1
+        self._compress(lambda scene: self._signature(scene.responders),
+                       merge)
 
     #-----------------------------------------------------------------------
     def compress_responders(self):
         """Compress Scenes Down into a Human Readable Form by Responders
 
         Attempts to make things more readable to humans, by compressing scene
-        defintions.  Any two definitions that have identical responders are
-        merged.
+        defintions.  Any two definitions that have identical controllers are
+        merged by combining their responders.
 
         This is a companion to compress_controllers and compress_n_way.
         These are seperate functions so that they can be called seperately
         using Stacks.
+        """
+        def merge(target, scene):
+            for new_responder in scene.responders:
+                target.append_responder(new_responder)
 
-        This function only processes the scenes in a single pass.  If it runs
-        multiple passes, it may further compress things.  However, this
-        function is a bit time consuming, so can't keep looping through it.
-
-        """
-        i = 0
-        while i < len(self.entries):
-            found = False
-            test_scene = self.entries[i]
-            # Anything less than or equal to ourselves has already been tested
-            j = i + 1
-            while j < len(self.entries):
-                scene = self.entries[j]
-                j += 1
-                # Merge responders that have identical controllers
-                test_ctrls = test_scene.controllers
-                if Counter(test_ctrls) == Counter(scene.controllers):
-                    for new_responder in test_scene.responders:
-                        scene.append_responder(new_responder)
-                    if test_scene.name is not None:
-                        scene.name = test_scene.name
-                    self.del_scene(test_scene)
-                    found = True
-                    break
-            if found is not True:
-                # if we found something we deleted the current entry so check
-                # this position again.
-                i += 1
+        self._compress(lambda scene: self._signature(scene.controllers),
+                       merge)
 
     #-----------------------------------------------------------------------
     def compress_n_way(self):
@@ -202,69 +168,89 @@ class SceneManager:
 
         Attempts to make things more readable to humans, by compressing scene
         defintions.  3-way or N-way links are compressed into a single
-        definition..
+        definition.  Two definitions can be merged if every device (address
+        and group) in one appears as a controller or responder in the other.
 
         This is a companion to compress_responders and compress_controllers.
         These are seperate functions so that they can be called seperately
         using Stacks.
+        """
+        def signature(scene):
+            return frozenset((str(device.addr), device.group) for device in
+                             scene.controllers + scene.responders)
 
-        This function only processes the scenes in a single pass.  If it runs
-        multiple passes, it may further compress things.  However, this
-        function is a bit time consuming, so can't keep looping through it.
-
-        """
-        i = 0
-        while i < len(self.entries):
-            found = False
-            test_scene = self.entries[i]
-            # Anything less than or equal to ourselves has already been tested
-            j = i + 1
-            while j < len(self.entries):
-                scene = self.entries[j]
-                j += 1
-                # Merge n-way switches
-                if self._can_merge_n_way(test_scene, scene):
-                    for new_controller in test_scene.controllers:
-                        scene.append_controller(new_controller)
-                    for new_responder in test_scene.responders:
-                        scene.append_responder(new_responder)
-                    if test_scene.name is not None:
-                        scene.name = test_scene.name
-                    self.del_scene(test_scene)
-                    found = True
-                    break
-            if found is not True:
-                # if we found something we deleted the current entry so check
-                # this position again.
-                i += 1
+        def merge(target, scene):
+            for new_controller in scene.controllers:
+                target.append_controller(new_controller)
+            for new_responder in scene.responders:
+                target.append_responder(new_responder)
+
+        self._compress(signature, merge)
 
     #-----------------------------------------------------------------------
-    def _can_merge_n_way(self, lhs, rhs):
-        """Determines Whether two Scenes Can be Merged as N-Way Scenes
+    def _signature(self, devices):
+        """Returns a Hashable Multiset of SceneDevices
 
-        The test is whether all of the devices (ctrl & resp) appear on both
-        the left and right side
+        Two lists of devices have the same signature if they have the same
+        devices using the strong comparison of SceneDevice.__eq__, in any
+        order.
+
+        Args:
+          devices (list): The SceneDevice objects.
 
         Returns:
-          True if they are N-way compatible, False otherwise
-        """
-        for controller in lhs.controllers:
-            if (rhs.find_controller(controller) is None and
-                    rhs.find_responder(controller) is None):
-                return False
-        for responder in lhs.responders:
-            if (rhs.find_controller(responder) is None and
-                    rhs.find_responder(responder) is None):
-                return False
-        for controller in rhs.controllers:
-            if (lhs.find_controller(controller) is None and
-                    lhs.find_responder(controller) is None):
-                return False
-        for responder in rhs.responders:
-            if (lhs.find_controller(responder) is None and
-                    lhs.find_responder(responder) is None):
-                return False
-        return True
+          (frozenset) The signature.
+        """
+        return frozenset(Counter(str(device) for device in devices).items())
+
+    #-----------------------------------------------------------------------
+    def _compress(self, signature, merge):
+        """Merges All Scenes with Identical Signatures
+
+        Scenes are grouped by the hash of their signature so each pass is
+        linear in the number of scenes instead of comparing every pair.
+        Within a group, each scene is merged into the last scene of the
+        group which keeps its place in the file.  The name of the first
+        scene with a name is kept.
+
+        Merging can change a scene's signature, so passes are repeated until
+        nothing changes.
+
+        Args:
+          signature (function): signature(SceneEntry) returns a hashable key.
+                    Scenes with equal keys are merged.
+          merge (function): merge(target, scene) merges the devices from
+                scene into target.
+        """
+        while True:
+            groups = {}
+            for scene in self.entries:
+                groups.setdefault(signature(scene), []).append(scene)
+
+            removed = set()
+            for scenes in groups.values():
+                if len(scenes) < 2:
+                    continue
+
+                # Merging in reverse order gives the same device order as
+                # merging each scene into the next one.
+                target = scenes[-1]
+                for scene in reversed(scenes[:-1]):
+                    merge(target, scene)
+                    removed.add(id(scene))
+
+                for scene in scenes[:-1]:
+                    if scene.name is not None:
+                        target.name = scene.name
+                        break
+
+            if not removed:
+                return
+
+            # Delete from the end so the indexes stay valid.
+            for index in reversed(range(len(self.entries))):
+                if id(self.entries[index]) in removed:
+                    self._del_index(index)
 
     #-----------------------------------------------------------------------
     def _load(self):
@@ -295,6 +281,125 @@ class SceneManager:
         self.entries = []
         for scene in self.data:
             self.entries.append(SceneEntry(self, scene))
+        self._init_index()
+
+    #-----------------------------------------------------------------------
+    def _init_index(self):
+        """Builds the Device to Scene Index from the Scene Entries
+        """
+        self._ctrl_index = {}
+        self._resp_index = {}
+        for scene in self.entries:
+            self._index_scene(scene)
+
+    #-----------------------------------------------------------------------
+    def _index_scene(self, scene):
+        """Adds all of the Devices in a Scene to the Index
+
+        Args:
+          scene:    (SceneEntry) The scene
+        """
+        scene.is_indexed = True
+        for controller in scene.controllers:
+            self.index_device(scene, controller)
+        for responder in scene.responders:
+            self.index_device(scene, responder)
+
+    #-----------------------------------------------------------------------
+    def _unindex_scene(self, scene):
+        """Removes all of the Devices in a Scene from the Index
+
+        Args:
+          scene:    (SceneEntry) The scene
+        """
+        scene.is_indexed = False
+        for index, devices in ((self._ctrl_index, scene.controllers),
+                               (self._resp_index, scene.responders)):
+            for device in devices:
+                key = (str(device.addr), device.group)
+                scenes = index.get(key, [])
+                if scene in scenes:
+                    scenes.remove(scene)
+                    if not scenes:
+                        del index[key]
+
+    #-----------------------------------------------------------------------
+    def index_device(self, scene, device):
+        """Adds a Device in a Scene to the Index
+
+        This is called by SceneEntry when a device is added to a scene or
+        changed.  Scenes that haven't been added to the SceneManager are
+        ignored.  If the device group changed, the old key is left in the
+        index so lookups must check the results.
+
+        Args:
+          scene:    (SceneEntry) The scene the device is in.
+          device:   (SceneDevice) The device
+        """
+        if not scene.is_indexed:
+            return
+
+        index = self._ctrl_index if device.is_controller else self._resp_index
+        scenes = index.setdefault((str(device.addr), device.group), [])
+        if scene not in scenes:
+            scenes.append(scene)
+
+    #-----------------------------------------------------------------------
+    def unindex_device(self, scene, device):
+        """Removes a Device in a Scene from the Index
+
+        This is called by SceneEntry when a device is removed from a scene.
+        The scene is only removed from the index if no other device in the
+        scene has the same address and group.
+
+        Args:
+          scene:    (SceneEntry) The scene the device is in.
+          device:   (SceneDevice) The device
+        """
+        if not scene.is_indexed:
+            return
+
+        if device.is_controller:
+            index = self._ctrl_index
+            devices = scene.controllers
+        else:
+            index = self._resp_index
+            devices = scene.responders
+
+        key = (str(device.addr), device.group)
+        for other in devices:
+            if other is not device and (str(other.addr), other.group) == key:
+                return
+
+        scenes = index.get(key, [])
+        if scene in scenes:
+            scenes.remove(scene)
+            if not scenes:
+                del index[key]
+
+    #-----------------------------------------------------------------------
+    def find_scenes(self, device, is_controller=None):
+        """Finds the Scenes a Device is in Using the Index
+
+        Only the address and group are matched, data1-3 do not have to
+        match.  The results may include scenes where the device group has
+        since changed so use SceneEntry.find_controller or find_responder to
+        check them.
+
+        Args:
+          device:   (SceneDevice) The device to find.
+          is_controller: (bool) True to find the scenes where the device is a
+                         controller, False for responder.  None uses
+                         device.is_controller.
+
+        Returns:
+          (list) The SceneEntry objects.  This may not be in file order.
+        """
+        if is_controller is None:
+            is_controller = device.is_controller
+        index = self._ctrl_index if is_controller else self._resp_index
+        scenes = index.get((str(device.addr), device.group), [])
+        return [scene for scene in scenes if scene.is_indexed]
 
     #-----------------------------------------------------------------------
     def save(self):
@@ -416,6 +521,7 @@ class SceneManager:
 
         # All done save the config file if necessary
         if updated:
+            self._init_index()
             self.save()
 
     #-----------------------------------------------------------------------
@@ -429,6 +535,7 @@ class SceneManager:
         """
         self.entries.append(scene)
         self.data.append(scene.data)
+        self._index_scene(scene)
 
     def del_scene(self, scene):
         """Deletes a SceneEntry from the SceneManager
@@ -438,9 +545,19 @@ class SceneManager:
         Args:
           scene:    (SceneEntry) The scene to be deleted
         """
-        if scene.index is not None:
-            del self.data[scene.index]
-            del self.entries[scene.index]
+        index = scene.index
+        if index is not None:
+            self._del_index(index)
+
+    def _del_index(self, index):
+        """Deletes the SceneEntry at an Index in the SceneManager
+
+        Args:
+          index:    (int) The index of the scene to be deleted
+        """
+        self._unindex_scene(self.entries[index])
+        del self.data[index]
+        del self.entries[index]
 
 #===========================================================================
 
@@ -460,6 +577,8 @@ class SceneEntry:
           scene:    (dict): The parsed yaml data read from the config file.
         """
         self.scene_manager = scene_manager
+        # True once the scene manager has added this to its device index.
+        self.is_indexed = False
         self._name = None
         self._controllers = []
         self._responders = []
@@ -617,6 +736,7 @@ class SceneEntry:
         if controller not in self._controllers:
             self._controllers.append(controller)
             self._data['controllers'].append(controller.data)
+            self.scene_manager.index_device(self, controller)
 
     #-----------------------------------------------------------------------
     def append_responder(self, responder):
@@ -628,6 +748,7 @@ class SceneEntry:
         if responder not in self._responders:
             self._responders.append(responder)
             self._data['responders'].append(responder.data)
+            self.scene_manager.index_device(self, responder)
 
     #-----------------------------------------------------------------------
     def find_controller(self, controller):
@@ -672,9 +793,11 @@ class SceneEntry:
         Args:
           controller:    (SceneDevice) The controller
         """
-        if controller.index is not None:
-            del self._data['controllers'][controller.index]
-            del self._controllers[controller.index]
+        index = controller.index
+        if index is not None:
+            del self._data['controllers'][index]
+            del self._controllers[index]
+            self.scene_manager.unindex_device(self, controller)
 
     #-----------------------------------------------------------------------
     def update_device(self, device):
@@ -689,6 +812,9 @@ class SceneEntry:
         else:
             self._data['responders'][device.index] = device.data
 
+        # The group may have changed.
+        self.scene_manager.index_device(self, device)
+
 #===========================================================================
 
 
@@ -91,6 +91,18 @@ class Signal:
         except ValueError:
             pass
 
+    #-----------------------------------------------------------------------
+    def disconnect_object(self, obj):
+        """Disconnect all of the slots that are methods of an object.
+
+        Args:
+           obj:  The object whose methods should be disconnected.
+        """
+        for i in reversed(range(len(self.slots))):
+            slot = self.slots[i]()
+            if getattr(slot, "__self__", None) is obj:
+                del self.slots[i]
+
     #-----------------------------------------------------------------------
     def clear(self):
         """Clear all the attached slots from the signal.
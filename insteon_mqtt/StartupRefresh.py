@@ -0,0 +1,158 @@
+#===========================================================================
+#
+# Startup device refresh scheduler.
+#
+#===========================================================================
+import time
+from . import log
+from .device import BatterySensor
+
+LOG = log.get_logger()
+
+
+class StartupRefresh:
+    """Staged, rate limited refresh of all the devices at startup.
+
+    Refreshing every device at once puts hundreds of refresh sequences in the
+    PLM write queue and any interactive command has to wait until they are
+    all done.  Instead, this class refreshes one device at a time, spread out
+    over a time window.
+
+    - Devices without a database or model information are refreshed first.
+    - Battery devices are not scheduled.  Their refresh is queued on the
+      device and is sent the next time they wake up.
+    - A refresh is only started when the PLM write queue is empty so other
+      commands always go first.
+
+    Progress is reported with Modem.signal_refresh_progress after each
+    device refresh finishes.
+    """
+    def __init__(self, modem, window=0, retry_delay=1.0):
+        """Constructor
+
+        Args:
+          modem (Modem):  The Insteon modem object.
+          window (float):  The time in seconds to spread the device refreshes
+                 over.  0 to refresh each device as soon as the previous one
+                 finishes.
+          retry_delay (float):  The time in seconds to wait before trying to
+                      start the next refresh again when the PLM is busy.
+        """
+        self.modem = modem
+        self.window = window
+        self.retry_delay = retry_delay
+
+        # Devices left to refresh in order.
+        self.devices = []
+
+        # Number of scheduled devices, number finished, and the number of
+        # battery devices that will be refreshed when they wake up.
+        self.total = 0
+        self.done = 0
+        self.deferred = 0
+
+        # Time between refresh starts and the earliest time the next refresh
+        # can start.
+        self._interval = 0
+        self._next_time = 0
+
+    #-----------------------------------------------------------------------
+    def start(self, devices):
+        """Start refreshing the devices.
+
+        Args:
+          devices:  Iterable of the Insteon devices to refresh.
+        """
+        self.devices = []
+        for device in devices:
+            if isinstance(device, BatterySensor):
+                # This will wait in the device queue until it wakes up.
+                self.deferred += 1
+                device.refresh()
+            else:
+                self.devices.append(device)
+
+        # Sort is stable so the config order is kept within a priority.
+        self.devices.sort(key=self._priority)
+        self.total = len(self.devices)
+        if self.total:
+            self._interval = float(self.window) / self.total
+
+        LOG.info("Starting device refresh of %d devices over %s sec, %d "
+                 "battery devices will refresh when awake", self.total,
+                 self.window, self.deferred)
+        self._emit()
+        self._schedule(time.time())
+
+    #-----------------------------------------------------------------------
+    def _priority(self, device):
+        """Sort key for the refresh order.
+
+        Args:
+          device:  The Insteon device.
+
+        Returns:
+          int:  Lower values are refreshed first.
+        """
+        # Never downloaded the database.
+        if device.db.delta is None:
+            return 0
+
+        # Missing model or engine information.
+        if (device.db.desc is None or device.db.firmware is None or
+                device.db.engine is None):
+            return 1
+
+        return 2
+
+    #-----------------------------------------------------------------------
+    def _schedule(self, t):
+        """Schedule the next refresh attempt.
+
+        Args:
+          t (float):  The Unix clock time to try at.
+        """
+        if self.devices:
+            self.modem.timed_call.add(t, self._run_next)
+
+    #-----------------------------------------------------------------------
+    def _run_next(self):
+        """Start the next device refresh if the PLM isn't busy.
+        """
+        if self.modem.protocol.write_queue_size():
+            LOG.debug("PLM busy, delaying startup refresh")
+            self._schedule(time.time() + self.retry_delay)
+            return
+
+        device = self.devices.pop(0)
+        self._next_time = time.time() + self._interval
+
+        LOG.info("Startup refresh %d of %d: %s", self.done + 1, self.total,
+                 device.label)
+        device.refresh(on_done=self._device_done)
+
+    #-----------------------------------------------------------------------
+    def _device_done(self, success, msg, data):
+        """Callback for a finished device refresh.
+
+        Args:
+          success (bool):  True if the refresh worked.
+          msg (str):  Message about the result.
+          data:  Unused.
+        """
+        self.done += 1
+        self._emit()
+
+        if self.devices:
+            self._schedule(max(time.time(), self._next_time))
+        else:
+            LOG.ui("Startup refresh complete for %d devices", self.total)
+
+    #-----------------------------------------------------------------------
+    def _emit(self):
+        """Emit the current progress.
+        """
+        self.modem.signal_refresh_progress.emit(self.modem, self.done,
+                                                self.total, self.deferred)
+
+    #-----------------------------------------------------------------------
@@ -0,0 +1,164 @@
+#===========================================================================
+#
+# Persisted device state cache.
+#
+#===========================================================================
+import json
+import os
+import time
+from . import log
+from . import on_off
+from .device import Remote
+
+LOG = log.get_logger()
+
+
+class StateCache:
+    """Saved copy of the device on/off and level states.
+
+    Device states are only known in memory so after a restart nothing is
+    known until each device is refreshed.  This class records the state of
+    each device group every time it changes and saves it to a file.  At
+    startup the saved states are loaded back into the devices which
+    publishes them right away.  The startup refresh (if enabled) will then
+    confirm the actual states.
+
+    Saves are write behind:  a state change schedules a save after a short
+    delay so a burst of changes (scenes) only writes the file once.
+
+    The file is a JSON dict of device address to a dict of group to the last
+    is_on and level values.
+    """
+    def __init__(self, modem, path, delay=5.0):
+        """Constructor
+
+        Args:
+          modem (Modem):  The Insteon modem object.  Used to schedule saves.
+          path (str):  The file to save the states to.
+          delay (float):  The time in seconds to wait after a change before
+                saving.
+        """
+        self.modem = modem
+        self.path = path
+        self.delay = delay
+
+        # Address hex string -> { group str -> {"is_on", "level"} }
+        self.states = {}
+
+        # True if there are changes that haven't been saved.  _pending is
+        # the scheduled save call or None.
+        self._dirty = False
+        self._pending = None
+
+    #-----------------------------------------------------------------------
+    def load(self):
+        """Load the saved states from the file.
+
+        If the file doesn't exist or can't be read, nothing is loaded.
+        """
+        if not os.path.exists(self.path):
+            LOG.debug("State cache %s doesn't exist", self.path)
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.states = json.load(f)
+        except (OSError, ValueError):
+            LOG.exception("Error reading state cache %s", self.path)
+            self.states = {}
+
+    #-----------------------------------------------------------------------
+    def save(self):
+        """Save the states to the file if they have changed.
+
+        The file is written to a temporary file first and then moved into
+        place so a crash during the write can't leave a corrupt file.
+        """
+        self._pending = None
+        if not self._dirty:
+            return
+
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.states, f)
+            os.replace(tmp_path, self.path)
+        except (OSError, ValueError):
+            LOG.exception("Error writing state cache %s", self.path)
+            return
+
+        self._dirty = False
+        LOG.debug("State cache saved %d devices", len(self.states))
+
+    #-----------------------------------------------------------------------
+    def connect(self, devices):
+        """Restore the saved states and start recording changes.
+
+        Each saved state is set on the device.  That emits the normal state
+        changed signal so the state is published to MQTT.
+
+        Args:
+          devices:  Iterable of the Insteon devices.
+        """
+        for device in devices:
+            # Remote button presses are events, not states.
+            if isinstance(device, Remote):
+                continue
+
+            self._restore(device)
+            device.signal_state.connect(self.handle_state)
+
+    #-----------------------------------------------------------------------
+    def _restore(self, device):
+        """Restore the saved states for a device.
+
+        Args:
+          device:  The Insteon device.
+        """
+        groups = self.states.get(device.addr.hex, {})
+        for group, state in groups.items():
+            LOG.debug("Restoring %s group %s state %s", device.label, group,
+                      state)
+            try:
+                device.restore_state(is_on=state.get("is_on"),
+                                     level=state.get("level"),
+                                     group=None if group == "" else int(group),
+                                     reason=on_off.REASON_CACHE)
+            except:
+                LOG.exception("Error restoring %s state %s", device.label,
+                              state)
+
+    #-----------------------------------------------------------------------
+    def handle_state(self, device, is_on=None, level=None, mode=None,
+                     button=None, reason="", **kwargs):
+        """Device state changed callback.
+
+        This is triggered via signal when the Insteon device state changes.
+        It records the new state and schedules a save.
+
+        Args:
+          device:  The Insteon device that changed.
+          is_on (bool):  The on/off state.  None if it wasn't set.
+          level (int):  The level in the range [0,255].  None if it wasn't
+                set.
+          mode (on_off.Mode):  The on/off mode.
+          button (int):  The group that changed.  None for the device.
+          reason (str):  The reason the state changed.
+        """
+        # Manual mode messages are momentary events, not states.
+        if mode == on_off.Mode.MANUAL or (is_on is None and level is None):
+            return
+
+        groups = self.states.setdefault(device.addr.hex, {})
+        group = "" if button is None else str(button)
+        state = {"is_on": is_on, "level": level}
+        if groups.get(group) == state:
+            return
+
+        groups[group] = state
+        self._dirty = True
+        if self._pending is None:
+            self._pending = self.modem.timed_call.add(time.time() + self.delay,
+                                                      self.save)
+
+    #-----------------------------------------------------------------------
@@ -14,21 +14,41 @@ For docs, see: https://www.github.com/TD22057/insteon-mqtt
 
 #===========================================================================
 
-from . import catalog
-from . import cmd_line
-from . import db
-from . import device
-from . import log
-from . import message
-from . import mqtt
-from . import network
-from . import on_off
-from . import util
-
+# The modules are imported the first time they're used so the command line
+# tool doesn't have to load the server modules and their dependencies.
+import typing as _typing
 from .const import __version__
+from . import util as _util
+
+_util.lazy_import(__name__, {
+    "catalog" : (".catalog", None),
+    "cmd_line" : (".cmd_line", None),
+    "db" : (".db", None),
+    "device" : (".device", None),
+    "log" : (".log", None),
+    "message" : (".message", None),
+    "mqtt" : (".mqtt", None),
+    "network" : (".network", None),
+    "on_off" : (".on_off", None),
+    "util" : (".util", None),
+
+    "Address" : (".Address", "Address"),
+    "CommandSeq" : (".CommandSeq", "CommandSeq"),
+    "Modem" : (".Modem", "Modem"),
+    "Protocol" : (".Protocol", "Protocol"),
+    "ScenePlanner" : (".ScenePlanner", "ScenePlanner"),
+    "Signal" : (".Signal", "Signal"),
+    "StartupRefresh" : (".StartupRefresh", "StartupRefresh"),
+    "StateCache" : (".StateCache", "StateCache"),
+    })
 
-from .Address import Address
-from .CommandSeq import CommandSeq
-from .Modem import Modem
-from .Protocol import Protocol
-from .Signal import Signal
+# Let pylint and other static tools see the lazy attributes.
+if _typing.TYPE_CHECKING:
+    from .Address import Address
+    from .CommandSeq import CommandSeq
+    from .Modem import Modem
+    from .Protocol import Protocol
+    from .ScenePlanner import ScenePlanner
+    from .Signal import Signal
+    from .StartupRefresh import StartupRefresh
+    from .StateCache import StateCache
@@ -12,8 +12,18 @@ or send a variety of commands to a running server process.
 """
 
 #===========================================================================
-from . import device
-from . import modem
-from . import util
+# The modules are imported the first time they're used.
+import typing as _typing
+from .. import util as _util
 
-from .main import main
+_util.lazy_import(__name__, {
+    "batch" : (".batch", None),
+    "device" : (".device", None),
+    "modem" : (".modem", None),
+    "util" : (".util", None),
+    "main" : (".main", "main"),
+    })
+
+# Let pylint and other static tools see the lazy attributes.
+if _typing.TYPE_CHECKING:
+    from .main import main
@@ -0,0 +1,70 @@
+#===========================================================================
+#
+# Batch command processing
+#
+#===========================================================================
+import shlex
+import sys
+from . import util
+
+
+#===========================================================================
+def run(args, config):
+    """Run many commands over a single MQTT connection.
+
+    Each line of the input file is a command line without the config file
+    (e.g. 'on aa.bb.cc' or 'refresh kitchen -f').  Blank lines and lines
+    that start with # are skipped.  Up to args.jobs commands run at the
+    same time.
+
+    Each line is parsed with args.parse_args (main.parse_args - passed in
+    because main imports this module).  Commands that set no_batch (start
+    and batch) can't be used.
+
+    Args:
+      args:    The parsed command line arguments.
+      config:  (dict) Configuration dictionary.
+
+    Returns:
+      int:  Returns 0 if every command worked or -1 if any failed.
+    """
+    if args.file == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(args.file, encoding="utf-8") as f:
+            lines = f.readlines()
+
+    status = 0
+    with util.batch(config, args.jobs) as client:
+        for num, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            try:
+                cmd_args = args.parse_args([args.config] +
+                                           shlex.split(line))
+            except (SystemExit, ValueError):
+                print("ERROR: invalid command on line %d: %s" % (num, line))
+                status = -1
+                continue
+
+            if getattr(cmd_args, "no_batch", False):
+                print("ERROR: command can't be used in a batch on line %d: %s"
+                      % (num, line))
+                status = -1
+                continue
+
+            cmd_args.topic = args.topic
+            if args.quiet:
+                cmd_args.quiet = True
+
+            cmd_args.func(cmd_args, config)
+
+    for session in client.sessions:
+        if session["status"] != 0:
+            status = -1
+
+    return status
+
+#===========================================================================
@@ -6,9 +6,9 @@
 import sys
 from . import argparse_ext
 from .. import config
+from . import batch
 from . import device
 from . import modem
-from . import start
 from ..const import __version__
 
 
@@ -61,7 +61,35 @@ def parse_args(args):
     sp.add_argument("--level", metavar="log_level", type=int,
                     help="Logging level to use.  10=debug, 20=info,"
                     "30=warn, 40=error, 50=critical")
-    sp.set_defaults(func=start.start)
+    sp.set_defaults(func=start_server, no_batch=True)
+
+    #---------------------------------------
+    # batch command
+    sp = systemgrp.add_parser("batch", help="Run commands from a file over "
+                              "one connection.",
+                              description="Run commands from a file over "
+                              "one MQTT connection.  Each line is a command "
+                              "without the config file (e.g. 'on aa.bb.cc'). "
+                              "Blank lines and lines starting with # are "
+                              "skipped.")
+    sp.add_argument("file", nargs="?", default="-", help="File of commands "
+                    "to run.  Use - or leave blank to read from stdin.")
+    sp.add_argument("-j", "--jobs", type=int, default=1, help="Maximum "
+                    "number of commands to run at the same time.")
+    sp.add_argument("-q", "--quiet", action="store_true",
+                    help="Don't print any command results to the screen.")
+    sp.set_defaults(func=batch.run, no_batch=True, parse_args=parse_args)
+
+    #---------------------------------------
+    # modem.reload command
+    sp = systemgrp.add_parser("reload", help="Reload the server config file.",
+                              description="Reload the server config file "
+                              "and apply the changes without restarting.  "
+                              "Modem and broker connection settings still "
+                              "need a restart.")
+    sp.add_argument("-q", "--quiet", action="store_true",
+                    help="Don't print any command results to the screen.")
+    sp.set_defaults(func=modem.reload)
 
     #---------------------------------------
     # modem.join_all command
@@ -568,18 +596,27 @@ def parse_args(args):
     return p.parse_args(args)
 
 
+#===========================================================================
+def start_server(args, cfg):
+    """Start the Insteon<->MQTT server.
+
+    The server modules are only imported when the server is started so the
+    client commands load faster.
+    """
+    from . import start
+    return start.start(args, cfg)
+
+
 #===========================================================================
 def main(mqtt_converter=None):
     args = parse_args(sys.argv[1:])
 
-    # Validate the configuration file
-    val_errors = config.validate(args.config)
+    # Load and validate the configuration file.  Unchanged configs are
+    # loaded from the validated config cache.
+    cfg, val_errors = config.load_validated(args.config)
     if val_errors != "":
         return val_errors
 
-    # Load the configuration file.
-    cfg = config.load(args.config)
-
     topic = cfg.get("mqtt", {}).get("cmd_topic", None)
     if topic:
         args.topic = topic
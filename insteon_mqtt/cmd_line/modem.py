@@ -87,6 +87,17 @@ def factory_reset(args, config):
     return reply["status"]
 
 
+#===========================================================================
+def reload(args, config):
+    topic = "%s/modem" % (args.topic)
+    payload = {
+        "cmd" : "reload",
+        }
+
+    reply = util.send(config, topic, payload, args.quiet)
+    return reply["status"]
+
+
 #===========================================================================
 def get_devices(args, config):
     topic = "%s/modem" % (args.topic)
@@ -3,6 +3,8 @@
 # Start the main server
 #
 #===========================================================================
+import functools
+import signal
 from .. import config
 from .. import log
 from .. import mqtt
@@ -67,6 +69,22 @@ def start(args, cfg):
     # Load the configuration data into the objects.
     config.apply(cfg, mqtt_handler, modem)
 
+    # The config file is reloaded by the modem 'reload' command or SIGHUP.
+    # The signal handler can run in the middle of the loop so it only
+    # flags the reload and it runs after the next select().
+    reload = functools.partial(config.reload, args.config, mqtt_handler,
+                               modem)
+    modem.cmd_map['reload'] = reload
+
+    reload_pending = []
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP,
+                      lambda signum, frame: reload_pending.append(signum))
+
     # Start the network event loop.
     while loop.active():
         loop.select(time_out=time_out)
+
+        if reload_pending:
+            del reload_pending[:]
+            reload()
@@ -3,6 +3,8 @@
 # Command line utilities
 #
 #===========================================================================
+import contextlib
+import functools
 import ssl
 import json
 import random
@@ -51,10 +53,20 @@ except AttributeError:
     pass
 
 
+#===========================================================================
+# The shared client used by send() in batch mode.  None to use a new
+# connection for each command.
+_BATCH_CLIENT = None
+
+
 #===========================================================================
 def send(config, topic, payload, quiet=False):
     """Send a message and get the replies from the server.
 
+    In batch mode (see batch()), the message is sent using the shared
+    client connection and this returns right away.  The session status is
+    updated when the replies arrive.
+
     Args:
       config:   (dict) Configuration dictionary.  The MQTT broker and
                 connection information is read from this.
@@ -67,92 +79,228 @@ def send(config, topic, payload, quiet=False):
       Returns the session reply object.  This is a dict with the results of the
       command.
     """
-    session = {
-        "result" : None,
-        "done" : False,
-        "status" : 0,  # 0 == success
-        "quiet" : int(quiet),
-        }
-
-    client = mqtt.Client(userdata=session)
-
-    # Add user/password if the config file has them set.
-    if config["mqtt"].get("username", None):
-        user = config["mqtt"]["username"]
-        password = config["mqtt"].get("password", None)
-        client.username_pw_set(user, password)
-
-    encryption = config["mqtt"].get('encryption', {})
-    if encryption is None:
-        encryption = {}
-    ca_cert = encryption.get('ca_cert', None)
-    if ca_cert is not None and ca_cert != "":
-        # Set the basic arguments
-        certfile = encryption.get('certfile', None)
-        if certfile == "":
-            certfile = None
-        keyfile = encryption.get('keyfile', None)
-        if keyfile == "":
-            keyfile = None
-        ciphers = encryption.get('ciphers', None)
-        if ciphers == "":
-            ciphers = None
-
-        # These require passing specific constants so we use a lookup
-        # map for them.
-        addl_tls_kwargs = {}
-        tls_ver = encryption.get('tls_version', 'tls')
-        tls_version_const = TLS_VER_OPTIONS.get(tls_ver, None)
-        if tls_version_const is not None:
-            addl_tls_kwargs['tls_version'] = tls_version_const
-        cert_reqs = encryption.get('cert_reqs', None)
-        cert_reqs = CERT_REQ_OPTIONS.get(cert_reqs, None)
-        if cert_reqs is not None:
-            addl_tls_kwargs['cert_reqs'] = cert_reqs
-
-        # Finally, try the connection
-        try:
-            client.tls_set(ca_certs=ca_cert,
-                           certfile=certfile,
-                           keyfile=keyfile,
-                           ciphers=ciphers, **addl_tls_kwargs)
-        except FileNotFoundError as e:
-            print("Cannot locate a SSL/TLS file = %s.", e)
-
-        except ssl.SSLError as e:
-            print("SSL/TLS Config error = %s.", e)
-
-    # Connect to the broker.
-    client.connect(config["mqtt"]["broker"], config["mqtt"]["port"])
-
-    # Generate a random session ID to use so the server can reply directly to
-    # us via MQTT.
-    id = str(random.getrandbits(32))
-    payload["session"] = id
-
-    # Session topic - this must match the servers definition of the session
-    # topic (i.e. don't just change it here).
-    rtn_topic = "%s/session/%s" % (topic, id)
-    client.message_callback_add(rtn_topic, callback)
-    client.subscribe(rtn_topic)
-
-    # Send the message).
-    client.publish(topic, json.dumps(payload), qos=2)
-
-    # Loop on the client until the callback sets the done field in the
-    # session data or we time out.
-    session["end_time"] = time.time() + TIME_OUT  # seconds
-    while not session["done"] and time.time() < session["end_time"]:
-        client.loop(timeout=0.5)
-
-    if not session["done"]:
-        print("Command line timed out waiting for a reply, the command may " +
-              "still be running.")
-
-    client.disconnect()
+    if _BATCH_CLIENT is not None:
+        return _BATCH_CLIENT.send(topic, payload, quiet)
+
+    client = Client(config)
+    try:
+        session = client.send(topic, payload, quiet)
+        client.wait()
+    finally:
+        client.close()
+
     return session
 
 
+#===========================================================================
+@contextlib.contextmanager
+def batch(config, jobs=1):
+    """Context manager to send many commands over one connection.
+
+    Inside the context, send() uses a single shared client connection and
+    at most jobs commands run at the same time.  All the commands have
+    finished when the context exits.
+
+    Args:
+      config:   (dict) Configuration dictionary.  The MQTT broker and
+                connection information is read from this.
+      jobs:     (int) The maximum number of commands to run at once.
+
+    Returns:
+      Returns the Client object.
+    """
+    global _BATCH_CLIENT  # pylint: disable=global-statement
+    client = Client(config, jobs)
+    _BATCH_CLIENT = client
+    try:
+        yield client
+        client.wait()
+    finally:
+        _BATCH_CLIENT = None
+        client.close()
+
+
+#===========================================================================
+class Client:
+    """Command line MQTT client.
+
+    This connects to the broker, sends commands to the server, and prints
+    the replies from the server.  Each command gets a random session ID and
+    the server publishes the replies to the session topic.  Several commands
+    can be waiting for replies at the same time.
+    """
+    def __init__(self, config, jobs=1):
+        """Constructor
+
+        Args:
+          config:   (dict) Configuration dictionary.  The MQTT broker and
+                    connection information is read from this.
+          jobs:     (int) The maximum number of commands to run at once.
+        """
+        self.jobs = max(1, int(jobs))
+
+        # Session reply topic -> session dict for the commands that are
+        # still running.
+        self.active = {}
+
+        # All the sessions that have been sent.
+        self.sessions = []
+
+        self.client = mqtt.Client()
+        self._setup(config)
+
+        # Connect to the broker.
+        self.client.connect(config["mqtt"]["broker"], config["mqtt"]["port"])
+
+    #-----------------------------------------------------------------------
+    def send(self, topic, payload, quiet=False):
+        """Send a command to the server.
+
+        If the maximum number of commands are running, this waits for one
+        of them to finish first.
+
+        Args:
+          topic:    (str) The MQTT topic string.
+          payload:  (dict) Message payload dictionary.  Will be converted to
+                    json.
+          quiet:    0: show all messages.  1: show no messages.  2: show only
+                    the reply messages.
+
+        Returns:
+          Returns the session reply object.  This is a dict with the results
+          of the command which is updated as the replies arrive.
+        """
+        self.wait(self.jobs - 1)
+
+        session = {
+            "result" : None,
+            "done" : False,
+            "status" : 0,  # 0 == success
+            "quiet" : int(quiet),
+            }
+
+        # Generate a random session ID to use so the server can reply
+        # directly to us via MQTT.
+        id = str(random.getrandbits(32))
+        payload["session"] = id
+
+        # Session topic - this must match the servers definition of the
+        # session topic (i.e. don't just change it here).
+        rtn_topic = "%s/session/%s" % (topic, id)
+        session["topic"] = rtn_topic
+        self.client.message_callback_add(
+            rtn_topic, functools.partial(self._on_message, session))
+        self.client.subscribe(rtn_topic)
+
+        # Send the message.
+        self.client.publish(topic, json.dumps(payload), qos=2)
+
+        session["end_time"] = time.time() + TIME_OUT  # seconds
+        self.active[rtn_topic] = session
+        self.sessions.append(session)
+        return session
+
+    #-----------------------------------------------------------------------
+    def wait(self, count=0):
+        """Wait until no more than count commands are running.
+
+        Commands time out if there are no replies for TIME_OUT seconds.
+
+        Args:
+          count:    (int) The number of commands that can still be running.
+        """
+        while len(self.active) > count:
+            self.client.loop(timeout=0.5)
+
+            now = time.time()
+            for topic, session in list(self.active.items()):
+                if not session["done"] and now >= session["end_time"]:
+                    print("Command line timed out waiting for a reply, the "
+                          "command may still be running.")
+                    session["status"] = -1
+                    session["done"] = True
+
+                if session["done"]:
+                    del self.active[topic]
+                    self.client.message_callback_remove(topic)
+                    self.client.unsubscribe(topic)
+
+    #-----------------------------------------------------------------------
+    def close(self):
+        """Disconnect from the broker.
+        """
+        self.client.disconnect()
+
+    #-----------------------------------------------------------------------
+    def _on_message(self, session, client, userdata, message):
+        """MQTT session topic message callback.
+
+        Args:
+          session:  The session dictionary of the command.
+          client:   The MQTT client.
+          userdata: User data (unused).
+          message:  The incoming message.
+        """
+        callback(client, session, message)
+
+    #-----------------------------------------------------------------------
+    def _setup(self, config):
+        """Set the login and encryption options from the config.
+
+        Args:
+          config:   (dict) Configuration dictionary.
+        """
+        client = self.client
+
+        # Add user/password if the config file has them set.
+        if config["mqtt"].get("username", None):
+            user = config["mqtt"]["username"]
+            password = config["mqtt"].get("password", None)
+            client.username_pw_set(user, password)
+
+        encryption = config["mqtt"].get('encryption', {})
+        if encryption is None:
+            encryption = {}
+        ca_cert = encryption.get('ca_cert', None)
+        if ca_cert is not None and ca_cert != "":
+            # Set the basic arguments
+            certfile = encryption.get('certfile', None)
+            if certfile == "":
+                certfile = None
+            keyfile = encryption.get('keyfile', None)
+            if keyfile == "":
+                keyfile = None
+            ciphers = encryption.get('ciphers', None)
+            if ciphers == "":
+                ciphers = None
+
+            # These require passing specific constants so we use a lookup
+            # map for them.
+            addl_tls_kwargs = {}
+            tls_ver = encryption.get('tls_version', 'tls')
+            tls_version_const = TLS_VER_OPTIONS.get(tls_ver, None)
+            if tls_version_const is not None:
+                addl_tls_kwargs['tls_version'] = tls_version_const
+            cert_reqs = encryption.get('cert_reqs', None)
+            cert_reqs = CERT_REQ_OPTIONS.get(cert_reqs, None)
+            if cert_reqs is not None:
+                addl_tls_kwargs['cert_reqs'] = cert_reqs
+
+            # Finally, try the connection
+            try:
+                client.tls_set(ca_certs=ca_cert,
+                               certfile=certfile,
+                               keyfile=keyfile,
+                               ciphers=ciphers, **addl_tls_kwargs)
+            except FileNotFoundError as e:
+                print("Cannot locate a SSL/TLS file = %s.", e)
+
+            except ssl.SSLError as e:
+                print("SSL/TLS Config error = %s.", e)
+
+    #-----------------------------------------------------------------------
+
+
 #===========================================================================
 def callback(client, session, message):
     """MQTT message callback
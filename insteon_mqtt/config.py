@@ -8,34 +8,48 @@ __doc__ = """Configuration file utilties
 """
 
 #===========================================================================
+import hashlib
 import os.path
+import pickle
 import re
 import yaml
 from cerberus import Validator
 from cerberus.errors import BasicErrorHandler
+from .Address import Address
+from .const import __version__
 from . import device
+from . import log
+from . import util
+
+LOG = log.get_logger()
+
+# Format version of the validated config cache file.  Change this if the
+# format of the cached data changes.
+CACHE_VERSION = 1
 
 # Configuration file input description to class map.
 devices = {
-    # Key is config file input.  Value is tuple of (class, **kwargs) of the
-    # class to use and any extra keyword args to pass to the constructor.
-    'dimmer' : (device.Dimmer, {}),
-    'battery_sensor' : (device.BatterySensor, {}),
-    "ezio4o": (device.EZIO4O, {}),
-    'fan_linc' : (device.FanLinc, {}),
-    'hidden_door' : (device.HiddenDoor, {}),
-    'io_linc' : (device.IOLinc, {}),
-    'keypad_linc' : (device.KeypadLincDimmer, {}),
-    'keypad_linc_sw' : (device.KeypadLinc, {}),
-    'leak' : (device.Leak, {}),
-    'mini_remote1' : (device.Remote, {'num_button' : 1}),
-    'mini_remote4' : (device.Remote, {'num_button' : 4}),
-    'mini_remote8' : (device.Remote, {'num_button' : 8}),
-    'motion' : (device.Motion, {}),
-    'outlet' : (device.Outlet, {}),
-    'smoke_bridge' : (device.SmokeBridge, {}),
-    'switch' : (device.Switch, {}),
-    'thermostat' : (device.Thermostat, {}),
+    # Key is config file input.  Value is tuple of (class name, **kwargs) of
+    # the device class to use and any extra keyword args to pass to the
+    # constructor.  The class is looked up by name so the device modules are
+    # only imported when they are used.
+    'dimmer' : ('Dimmer', {}),
+    'battery_sensor' : ('BatterySensor', {}),
+    "ezio4o": ('EZIO4O', {}),
+    'fan_linc' : ('FanLinc', {}),
+    'hidden_door' : ('HiddenDoor', {}),
+    'io_linc' : ('IOLinc', {}),
+    'keypad_linc' : ('KeypadLincDimmer', {}),
+    'keypad_linc_sw' : ('KeypadLinc', {}),
+    'leak' : ('Leak', {}),
+    'mini_remote1' : ('Remote', {'num_button' : 1}),
+    'mini_remote4' : ('Remote', {'num_button' : 4}),
+    'mini_remote8' : ('Remote', {'num_button' : 8}),
+    'motion' : ('Motion', {}),
+    'outlet' : ('Outlet', {}),
+    'smoke_bridge' : ('SmokeBridge', {}),
+    'switch' : ('Switch', {}),
+    'thermostat' : ('Thermostat', {}),
     }
 
 
@@ -46,13 +60,25 @@ def validate(path):
     Args:
       path:  The file to load
 
+    Returns:
+      string: the failure message text or an empty string if no errors
+    """
+    return validate_config(load(path))
+
+
+#===========================================================================
+def validate_config(document):
+    """Validates a loaded configuration against the defined schema
+
+    Args:
+      document (dict):  The configuration dictionary from load().
+
     Returns:
       string: the failure message text or an empty string if no errors
     """
     error = ""
 
     # Check the main config file first
-    document = load(path)
     error += validate_file(document, 'config-schema.yaml', 'configuration')
 
     # Check the Scenes file
@@ -146,6 +172,161 @@ def load(path):
     return overlay(base_config, user_config)
 
 
+#===========================================================================
+def load_validated(path, use_cache=True):
+    """Load and validate the configuration file.
+
+    Validating the config against the schemas is slow.  When the config is
+    valid, the result is saved to a cache file next to the config file
+    along with the content hashes of every file it was built from: the
+    config and its !include files, the scenes file, the base config, and
+    the schemas.  If none of those files have changed, the cached config is
+    returned without loading or validating anything.
+
+    Args:
+      path (str):  The file to load.
+      use_cache (bool):  False to ignore the cache.
+
+    Returns:
+      (dict, str):  Returns the configuration dictionary and the validation
+      error message.  If the error message isn't empty, the configuration
+      is None.
+    """
+    cache_path = cache_file(path)
+    if use_cache:
+        cfg = _read_cache(cache_path, path)
+        if cfg is not None:
+            return cfg, ""
+
+    # Track every yaml file the loader reads.
+    Loader.files = []
+    try:
+        cfg = load(path)
+        error = validate_config(cfg)
+        files = Loader.files
+    finally:
+        Loader.files = None
+
+    if error:
+        return None, error
+
+    if use_cache:
+        basepath = os.path.join(os.path.dirname(__file__), 'data')
+        files.append(os.path.join(basepath, 'config-schema.yaml'))
+        files.append(os.path.join(basepath, 'scenes-schema.yaml'))
+        _write_cache(cache_path, path, cfg, files)
+
+    return cfg, ""
+
+
+#===========================================================================
+def cache_file(path):
+    """Return the validated config cache file name for a config file.
+
+    The cache is stored next to the config file because the storage
+    directory is only known after the config has been loaded.
+
+    Args:
+      path (str):  The config file.
+
+    Returns:
+      str:  Returns the cache file name.
+    """
+    dir_name, base_name = os.path.split(path)
+    return os.path.join(dir_name, ".%s.cache" % base_name)
+
+
+#===========================================================================
+def _read_cache(cache_path, path):
+    """Read the validated config cache.
+
+    Args:
+      cache_path (str):  The cache file to read.
+      path (str):  The config file.
+
+    Returns:
+      dict:  Returns the cached config or None if there is no cache or any
+      of the files the config was built from have changed.
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            data = pickle.load(f)
+    except Exception:  # pylint: disable=broad-except
+        # Missing or unreadable cache - the config is validated again.
+        return None
+
+    if not isinstance(data, dict) or data.get("key") != _cache_key(path):
+        return None
+
+    for file_name, digest in data["files"].items():
+        if _hash_file(file_name) != digest:
+            LOG.debug("Config cache out of date, %s changed", file_name)
+            return None
+
+    return data["config"]
+
+
+#===========================================================================
+def _write_cache(cache_path, path, cfg, files):
+    """Write the validated config cache.
+
+    Errors are logged and ignored - the config is validated again on the
+    next start.
+
+    Args:
+      cache_path (str):  The cache file to write.
+      path (str):  The config file.
+      cfg (dict):  The validated configuration dictionary.
+      files (list):  The files the config was built from.
+    """
+    data = {
+        "key" : _cache_key(path),
+        "files" : {os.path.abspath(i) : _hash_file(i) for i in files},
+        "config" : cfg,
+        }
+
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except (OSError, pickle.PicklingError) as e:
+        LOG.warning("Unable to write config cache %s: %s", cache_path, e)
+
+
+#===========================================================================
+def _cache_key(path):
+    """Return the key that a config cache has to match.
+
+    The config file name is part of the key because !rel_path values are
+    built from it.
+
+    Args:
+      path (str):  The config file.
+
+    Returns:
+      tuple:  Returns the cache key.
+    """
+    return (CACHE_VERSION, __version__, path)
+
+
+#===========================================================================
+def _hash_file(path):
+    """Return the SHA-256 hash of a file's contents.
+
+    Args:
+      path (str):  The file to hash.
+
+    Returns:
+      str:  Returns the hex digest or None if the file can't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
 #===========================================================================
 def overlay(base_config, user_config):
     """This overlays a user config file on top of the base config file
@@ -197,6 +378,83 @@ def apply(config, mqtt, modem):
     modem.load_config(config['insteon'])
 
 
+#===========================================================================
+def reload(path, mqtt, modem, on_done=None):
+    """Reload the configuration file and apply the changes.
+
+    The file is loaded and validated again and only the changes are applied
+    to the running objects.  The modem and broker connections and the
+    message queues stay active.  See mqtt.Mqtt.reload_config() and
+    Modem.reload_config() for details.
+
+    Args:
+      path (str):  The configuration file to load.
+      mqtt (mqtt.Mqtt):  The main MQTT handler.
+      modem (Modem):  The PLM modem object.
+      on_done:  Finished callback.  This is called when the command has
+                completed.  Signature is: on_done(success, msg, data)
+    """
+    on_done = util.make_callback(on_done)
+
+    # Load the file and parse the device entries before anything is changed
+    # so a bad file (including YAML syntax errors) leaves the running
+    # config alone.
+    try:
+        cfg, error = load_validated(path)
+        if not error:
+            parse_devices(cfg['insteon'].get('devices', {}))
+    except Exception as e:  # pylint: disable=broad-except
+        error = str(e)
+
+    if error:
+        LOG.error("Config reload failed: %s", error)
+        on_done(False, "Config reload failed, the config file is invalid.",
+                None)
+        return
+
+    # Load the MQTT config first so new devices use the new templates.
+    try:
+        mqtt.reload_config(cfg['mqtt'])
+        result = modem.reload_config(cfg['insteon'])
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.exception("Config reload failed")
+        on_done(False, "Config reload failed: %s" % e, None)
+        return
+
+    msg = "Config reloaded: %d added, %d removed, %d renamed" % (
+        len(result['added']), len(result['removed']), len(result['renamed']))
+    LOG.ui(msg)
+    on_done(True, msg, result)
+
+
+#===========================================================================
+def parse_devices(data):
+    """Parse the device definitions from the insteon devices config.
+
+    Raises:
+      Exception if a device type or address is invalid.
+
+    Args:
+      data (dict):  The insteon.devices configuration dictionary.
+
+    Returns:
+      dict:  Returns a map of Address.id to the (device type, config value,
+      name, config_extra) of each device.
+    """
+    entries = {}
+    for device_type in data:
+        values = data[device_type]
+        if not values:
+            continue
+
+        dev_class = find(device_type)[0]
+        for value in values:
+            for addr, name, extra in dev_class.parse_config([value]):
+                entries[Address(addr).id] = (device_type, value, name, extra)
+
+    return entries
+
+
 #===========================================================================
 def find(name):
     """Find a device class from a description.
@@ -218,7 +476,7 @@ def find(name):
         raise Exception("Unknown device name '%s'.  Valid names are "
                         "%s." % (name, devices.keys()))
 
-    return dev
+    return (getattr(device, dev[0]), dev[1])
 
 
 #===========================================================================
@@ -226,6 +484,10 @@ def find(name):
 # https://davidchall.github.io/yaml-includes.html (with no license so I'm
 # assuming it's in the public domain).
 class Loader(yaml.Loader):
+    # List of the file names that have been loaded or None to not track
+    # them.  Used by load_validated() to find the !include files.
+    files = None
+
     def __init__(self, file):
         """Constructor
 
@@ -238,6 +500,9 @@ class Loader(yaml.Loader):
         super().__init__(file)
         self._base_dir = os.path.split(file.name)[0]
 
+        if Loader.files is not None:
+            Loader.files.append(file.name)
+
     #-----------------------------------------------------------------------
     def include(self, node):
         """!include file command.  Supports:
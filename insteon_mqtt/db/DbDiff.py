@@ -3,12 +3,31 @@
 # Device database difference tracker
 #
 #===========================================================================
+import hashlib
 
 
 class DbDiff:
     """TODO: doc
     """
 
+    @staticmethod
+    def hash_entries(entries):
+        """Return a hash of the link records that diff() compares.
+
+        Only the address, group, controller flag, and data are used.  Memory
+        locations are ignored so a config database and a device database
+        with the same links have the same hash.
+
+        Args:
+          entries:  Iterable of DeviceEntry or ModemEntry objects.
+
+        Returns:
+          (str) Returns the hex digest of the records.
+        """
+        records = sorted((e.addr.id, e.group, bool(e.is_controller),
+                          bytes(e.data)) for e in entries)
+        return hashlib.sha1(repr(records).encode()).hexdigest()
+
     def __init__(self, addr):
         """TODO: doc
         """
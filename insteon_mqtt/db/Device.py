@@ -384,6 +384,103 @@ class Device:
         else:
             self._add_using_new(addr, group, is_controller, data, on_done)
 
+    #-----------------------------------------------------------------------
+    def update_on_device(self, old_entry, entry, on_done=None):
+        """Overwrite an entry on the Insteon device with a different link.
+
+        The record at the memory location of old_entry is replaced with the
+        link values from entry.  This takes one write instead of deleting
+        old_entry and then adding entry.
+
+        IMPORTANT: Multiple calls to this method are NOT possible.  You must
+        chain calls together using a CommandSeq object to insure that the
+        first call finishes before another one is made.
+
+        Args:
+          old_entry:     (DeviceEntry) The entry to overwrite.
+          entry:         (DeviceEntry) The link to write.  Only the address,
+                         group, controller flag, and data are used.
+          on_done:       Optional callback which will be called when the
+                         command completes.
+        """
+        on_done = util.make_callback(on_done)
+        LOG.info("Device %s updating db at mem %#06x: %s grp %s %s D: %s",
+                 self.addr, old_entry.mem_loc, entry.addr, entry.group,
+                 util.ctrl_str(entry.is_controller), entry.data.hex())
+
+        self._add_using_unused(entry.addr, entry.group, entry.is_controller,
+                               bytes(entry.data), on_done, old_entry.copy())
+
+    #-----------------------------------------------------------------------
+    def plan_sync(self, diff):
+        """Plan the writes needed to apply a diff to this database.
+
+        Applying a diff one entry at a time takes one write per deletion and
+        one to three writes per addition.  This plans the whole change set at
+        once:
+
+        - An addition that is identical to a deletion cancels it since the
+          record is already on the device.
+        - Each remaining deletion is paired with an addition which is written
+          over the deleted record in place.  Additions that change the data
+          of an existing link are paired with that link first.
+        - Updates and deletions are ordered by memory location.
+
+        Args:
+          diff:   (DbDiff) The changes needed in this database, from
+                  db_config.diff(db).
+
+        Returns:
+          Returns a tuple of (updates, deletes, adds).  updates is a list of
+          (old_entry, new_entry) pairs for update_on_device().  deletes is a
+          list of entries for delete_on_device().  adds is a list of entries
+          for add_on_device().
+        """
+        def key(entry):
+            return (entry.addr.id, entry.group, entry.is_controller,
+                    bytes(entry.data))
+
+        # Drop additions of records that are only being deleted because
+        # they're duplicates.
+        deletes = {}
+        for entry in diff.del_entries:
+            deletes.setdefault(key(entry), []).append(entry)
+
+        adds = []
+        for entry in diff.add_entries:
+            same = deletes.get(key(entry))
+            if same:
+                same.pop()
+            else:
+                adds.append(entry)
+
+        deletes = sorted((e for entries in deletes.values() for e in entries),
+                         key=lambda e: e.mem_loc, reverse=True)
+
+        # First pair additions with the deleted link they replace (same
+        # address, group, type, and local group).
+        updates = []
+        unpaired = []
+        for entry in adds:
+            old = None
+            for i, del_entry in enumerate(deletes):
+                if (del_entry == entry and
+                        del_entry.data[2] == entry.data[2]):
+                    old = deletes.pop(i)
+                    break
+
+            if old is None:
+                unpaired.append(entry)
+            else:
+                updates.append((old, entry))
+
+        # Then reuse the remaining deleted records in memory order.
+        while unpaired and deletes:
+            updates.append((deletes.pop(0), unpaired.pop(0)))
+
+        updates.sort(key=lambda pair: pair[0].mem_loc, reverse=True)
+        return updates, deletes, unpaired
+
     #-----------------------------------------------------------------------
     def delete_on_device(self, entry, on_done=None):
         """Delete an entry on the Insteon device.
@@ -429,6 +526,31 @@ class Device:
             # Send the message.
             self.device.send(msg, msg_handler)
 
+    #-----------------------------------------------------------------------
+    def get_msg(self, mem_loc=None, num_rec=0):
+        """Build a read database message for i2 and i2cs devices.
+
+        With no inputs, this requests the whole database.  Otherwise the
+        device sends num_rec records starting at mem_loc and moving down
+        (0 for all the records until the last one).  See p162 of the insteon
+        dev guide.  Use handler.DeviceDbGet to process the replies.
+
+        Args:
+          mem_loc:  (int) The memory location to start reading at.  None to
+                    read from the start of the database.
+          num_rec:  (int) The number of records to read.  0 for all.
+
+        Returns:
+          (Msg.OutExtended) Returns the message to send.
+        """
+        data = bytearray(14)  # D1 unused, D2 0x00 read records
+        if mem_loc is not None:
+            data[2] = mem_loc >> 8 & 0xff  # D3,D4 record memory location
+            data[3] = mem_loc & 0xff
+            data[4] = num_rec  # D5 number of records
+
+        return Msg.OutExtended.direct(self.addr, 0x2f, 0x00, bytes(data))
+
     #-----------------------------------------------------------------------
     def find_group(self, group):
         """Find all the database entries in a group.
@@ -519,6 +641,17 @@ class Device:
 
         return results
 
+    #-----------------------------------------------------------------------
+    def content_hash(self):
+        """Return a hash of the link records in the database.
+
+        See DbDiff.hash_entries for details.
+
+        Returns:
+          (str) Returns the hex digest of the records.
+        """
+        return DbDiff.hash_entries(self.entries.values())
+
     #-----------------------------------------------------------------------
     def diff(self, rhs):
         """Compare this database with another Device database.
@@ -668,6 +801,17 @@ class Device:
         if entry.db_flags.is_last_rec:
             self.last = entry
 
+        # If an active controller entry is being replaced by a different link,
+        # remove the old entry from the group map.
+        old = self.entries.get(entry.mem_loc)
+        if (old is not None and old is not entry and
+                old.db_flags.is_controller and old.group in self.groups):
+            responders = self.groups[old.group]
+            for i in range(len(responders)):
+                if responders[i].mem_loc == old.mem_loc:
+                    del responders[i]
+                    break
+
         # Entry is an active entry.
         if entry.db_flags.in_use:
             # NOTE: this relies on no-one keeping a handle to this entry
@@ -0,0 +1,252 @@
+#===========================================================================
+#
+# Device Refresh Manager for i2 and i2cs Devices
+#
+#===========================================================================
+import collections
+from .. import log
+from .. import util
+from .. import handler
+from .Device import START_MEM_LOC
+
+LOG = log.get_logger()
+
+# Metadata key used to save the point to resume a failed full download at.
+RESUME_META = "db_resume"
+
+
+class DeviceRefreshManager:
+    """Manager for updating an out of date i2/i2cs device link database.
+
+    When a refresh shows that the device database delta has changed, the
+    normal fix is to clear the database and download every record from the
+    device.  On devices with large databases (KeypadLincs) that can take
+    10-30 seconds of PLM time even though usually only one or two records
+    changed.
+
+    The delta is incremented by the device each time a record is written.
+    So if we have a current copy of the database, the number of changed
+    records is the difference in the delta values.  This class uses
+    targeted reads (read num_rec=1 records at a memory location) to probe
+    the records that are most likely to have changed:
+
+    - The last record.  If that is now in use, the database has grown and we
+      keep reading down until the new last record is found.
+    - The unused records, highest memory location first.  Those are re-used
+      first when adding new entries.
+    - The used records, lowest memory location (newest) first.  Those could
+      have been deleted or modified.
+
+    Once the number of changed records found matches the delta difference
+    (and the database growth has been read), the database shape matches and
+    the refresh is done.  If the probe limit is reached, a probe fails, or
+    there is no current database to compare against, a full download is
+    done instead.
+
+    If a full download times out part way through, the memory location of
+    the next record needed is saved in the database metadata along with the
+    delta being downloaded.  The next full download for the same delta
+    resumes at that location instead of starting over.
+    """
+    def __init__(self, device, device_db, delta, on_done=None, num_retry=3,
+                 max_probes=8):
+        """Constructor
+
+        Args
+          device:    (Device) The Insteon Device object.
+          device_db: (db.Device) The device database being updated.
+          delta:     (int) The current database delta reported by the
+                     device.
+          on_done:   Finished callback.  Will be called when the refresh
+                     operation is done.
+          num_retry: (int) The number of times to retry each message if the
+                     handler times out without returning Msg.FINISHED.
+                     This count does include the initial sending so a
+                     retry of 3 will send once and then retry 2 more times.
+          max_probes: (int) The maximum number of records to read one at a
+                      time before giving up and doing a full download.
+        """
+        self.device = device
+        self.db = device_db
+        self.delta = delta
+        self.on_done = util.make_callback(on_done)
+        self.max_probes = max_probes
+        self._num_retry = num_retry
+
+        # Memory locations left to read, the number of changed records we
+        # still expect to find, and the number of probes sent so far.
+        self._mem_locs = collections.deque()
+        self._changes = 0
+        self._num_probes = 0
+
+        # Memory location and expected (cached) bytes of the record being
+        # read.  None if we don't have a record at that location.
+        self._mem_loc = None
+        self._expected = None
+
+        # True while we're reading down past the old last record.
+        self._growing = False
+
+        # Full download handler and the memory location it started at.
+        self._handler = None
+        self._start_mem_loc = START_MEM_LOC
+
+    #-------------------------------------------------------------------
+    def start(self, force=False):
+        """Start the database refresh.
+
+        Args:
+          force:  (bool) If True, always do a full download.
+        """
+        if force or self.db.delta is None or not self.db.entries:
+            self.start_full(force)
+            return
+
+        self._changes = (self.delta - self.db.delta) % 256
+        LOG.info("Device %s probing for %d changed db records", self.db.addr,
+                 self._changes)
+
+        self._mem_locs.append(self.db.last.mem_loc)
+        for mem_loc in sorted(self.db.unused.keys(), reverse=True):
+            if mem_loc != self.db.last.mem_loc:
+                self._mem_locs.append(mem_loc)
+        self._mem_locs.extend(sorted(self.db.entries.keys()))
+
+        self._probe_next()
+
+    #-------------------------------------------------------------------
+    def start_full(self, force=False):
+        """Clear the database and download every record from the device.
+
+        If a previous download of the same delta failed part way through,
+        the download is resumed from where it stopped instead.
+
+        Args:
+          force:  (bool) If True, never resume a previous download.
+        """
+        mem_loc = None
+        resume = self.db.get_meta(RESUME_META)
+        if not force and resume and resume["delta"] == self.delta:
+            mem_loc = resume["mem_loc"]
+            LOG.ui("Device %s resuming db download at %#06x", self.db.addr,
+                   mem_loc)
+        else:
+            self.db.clear()
+
+        self._start_mem_loc = START_MEM_LOC if mem_loc is None else mem_loc
+
+        # Request that the device send us all of it's database records.
+        # These will be streamed as fast as possible to us and the handler
+        # will update the database.  We need a retry count here because
+        # battery powered devices don't always respond right away.
+        msg = self.db.get_msg(mem_loc)
+        self._handler = handler.DeviceDbGet(self.db, self._handle_full,
+                                            num_retry=self._num_retry,
+                                            mem_loc=mem_loc)
+        self.device.send(msg, self._handler)
+
+    #-------------------------------------------------------------------
+    def _handle_full(self, success, msg, entry):
+        """Callback for the full database download.
+
+        Saves the point to resume at if the download failed.
+
+        Args:
+          success:  (bool) True if the whole database was read.
+          msg:      (str) Message about the result.
+          entry:    (DeviceEntry) The last record that was read.
+        """
+        resume = None
+        next_mem_loc = self._handler.next_mem_loc
+        if not success and next_mem_loc != self._start_mem_loc:
+            LOG.info("Device %s db download stopped at %#06x", self.db.addr,
+                     next_mem_loc)
+            resume = {"delta": self.delta, "mem_loc": next_mem_loc}
+
+        # The handler always starts at the beginning or at the last resume
+        # point so don't lose the previous resume point if nothing was read.
+        if success or resume:
+            self.db.set_meta(RESUME_META, resume)
+
+        self.on_done(success, msg, entry)
+
+    #-------------------------------------------------------------------
+    def _probe_next(self):
+        """Read the next candidate record from the device.
+        """
+        if self._changes <= 0 and not self._growing:
+            LOG.info("Device %s db changes found after %d probes",
+                     self.db.addr, self._num_probes)
+            self.on_done(True, "Database received", None)
+            return
+
+        if not self._mem_locs or self._num_probes >= self.max_probes:
+            LOG.info("Device %s db changes not found after %d probes, "
+                     "downloading the full database", self.db.addr,
+                     self._num_probes)
+            self.start_full()
+            return
+
+        self._num_probes += 1
+        self._mem_loc = self._mem_locs.popleft()
+
+        # Save the bytes of what we think is at that location so we can tell
+        # if it changed.  The handler updates the db before calling us.
+        entry = self._find(self._mem_loc)
+        self._expected = entry.to_bytes() if entry else None
+
+        msg = self.db.get_msg(self._mem_loc, num_rec=1)
+        msg_handler = handler.DeviceDbGet(self.db, self._handle_probe,
+                                          num_retry=self._num_retry,
+                                          num_rec=1)
+        self.device.send(msg, msg_handler)
+
+    #-------------------------------------------------------------------
+    def _handle_probe(self, success, msg, entry):
+        """Callback for each targeted record read.
+
+        Args:
+          success:  (bool) True if the record was read.
+          msg:      (str) Message about the result.
+          entry:    (DeviceEntry) The record that was read.
+        """
+        if not success or entry is None or entry.mem_loc != self._mem_loc:
+            LOG.warning("Device %s db probe at %#06x failed: %s",
+                        self.db.addr, self._mem_loc, msg)
+            self.start_full()
+            return
+
+        if self._expected != entry.to_bytes():
+            LOG.info("Device %s db record changed: %s", self.db.addr, entry)
+            self._changes -= 1
+
+        # If a record at or below the old last record is in use, then the
+        # database grew.  Keep reading down until the last record is found.
+        self._growing = False
+        if (entry.db_flags.in_use and not entry.db_flags.is_last_rec and
+                entry.mem_loc <= self.db.last.mem_loc):
+            self._growing = True
+            self._mem_locs.appendleft(entry.mem_loc - 0x08)
+
+        self._probe_next()
+
+    #-------------------------------------------------------------------
+    def _find(self, mem_loc):
+        """Find the cached record at a memory location.
+
+        Args:
+          mem_loc:  (int) The memory location to find.
+
+        Returns:
+          (DeviceEntry) Returns the record or None if there isn't one.
+        """
+        if mem_loc in self.db.entries:
+            return self.db.entries[mem_loc]
+        elif mem_loc in self.db.unused:
+            return self.db.unused[mem_loc]
+        elif mem_loc == self.db.last.mem_loc:
+            return self.db.last
+
+        return None
+
+    #-------------------------------------------------------------------
@@ -391,6 +391,17 @@ class Modem:
         # Send the message.
         self.device.send(msg, msg_handler)
 
+    #-----------------------------------------------------------------------
+    def content_hash(self):
+        """Return a hash of the link records in the database.
+
+        See DbDiff.hash_entries for details.
+
+        Returns:
+          (str) Returns the hex digest of the records.
+        """
+        return DbDiff.hash_entries(self.entries)
+
     #-----------------------------------------------------------------------
     def diff(self, rhs):
         """Compare this database with another Modem database.
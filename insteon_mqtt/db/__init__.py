@@ -17,6 +17,7 @@ from .DbDiff import DbDiff
 from .Device import Device
 from .DeviceEntry import DeviceEntry
 from .DeviceModifyManagerI1 import DeviceModifyManagerI1
+from .DeviceRefreshManager import DeviceRefreshManager
 from .DeviceScanManagerI1 import DeviceScanManagerI1
 from .Modem import Modem
 from .ModemEntry import ModemEntry
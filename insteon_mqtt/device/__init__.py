@@ -26,19 +26,44 @@ first (hold the modem set button, then the device.
 
 #===========================================================================
 
-from .BatterySensor import BatterySensor
-from .Dimmer import Dimmer
-from .EZIO4O import EZIO4O
-from .FanLinc import FanLinc
-from .HiddenDoor import HiddenDoor
-from .IOLinc import IOLinc
-from .KeypadLinc import KeypadLinc
-from .KeypadLincDimmer import KeypadLincDimmer
-from .Leak import Leak
-from .MsgHistory import MsgHistory
-from .Motion import Motion
-from .Outlet import Outlet
-from .Remote import Remote
-from .SmokeBridge import SmokeBridge
-from .Switch import Switch
-from .Thermostat import Thermostat
+# The classes are imported the first time they're used.
+import typing as _typing
+from .. import util as _util
+
+_util.lazy_import(__name__, {
+    "BatterySensor" : (".BatterySensor", "BatterySensor"),
+    "Dimmer" : (".Dimmer", "Dimmer"),
+    "EZIO4O" : (".EZIO4O", "EZIO4O"),
+    "FanLinc" : (".FanLinc", "FanLinc"),
+    "HiddenDoor" : (".HiddenDoor", "HiddenDoor"),
+    "IOLinc" : (".IOLinc", "IOLinc"),
+    "KeypadLinc" : (".KeypadLinc", "KeypadLinc"),
+    "KeypadLincDimmer" : (".KeypadLincDimmer", "KeypadLincDimmer"),
+    "Leak" : (".Leak", "Leak"),
+    "MsgHistory" : (".MsgHistory", "MsgHistory"),
+    "Motion" : (".Motion", "Motion"),
+    "Outlet" : (".Outlet", "Outlet"),
+    "Remote" : (".Remote", "Remote"),
+    "SmokeBridge" : (".SmokeBridge", "SmokeBridge"),
+    "Switch" : (".Switch", "Switch"),
+    "Thermostat" : (".Thermostat", "Thermostat"),
+    })
+
+# Let pylint and other static tools see the lazy attributes.
+if _typing.TYPE_CHECKING:
+    from .BatterySensor import BatterySensor
+    from .Dimmer import Dimmer
+    from .EZIO4O import EZIO4O
+    from .FanLinc import FanLinc
+    from .HiddenDoor import HiddenDoor
+    from .IOLinc import IOLinc
+    from .KeypadLinc import KeypadLinc
+    from .KeypadLincDimmer import KeypadLincDimmer
+    from .Leak import Leak
+    from .MsgHistory import MsgHistory
+    from .Motion import Motion
+    from .Outlet import Outlet
+    from .Remote import Remote
+    from .SmokeBridge import SmokeBridge
+    from .Switch import Switch
+    from .Thermostat import Thermostat
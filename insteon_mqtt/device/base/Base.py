@@ -57,6 +57,31 @@ class Base:
           [cls]:  Returns a list of the created device instances.
         """
         devices = []
+        for addr, name, config_extra in cls.parse_config(values):
+            # Create the device using the class constructor.  Use kwargs
+            # syntax so any extra keyword args don't have to be at the end of
+            # the arg list.
+            device = cls(protocol=protocol, modem=modem, address=addr,
+                         name=name, config_extra=config_extra, **kwargs)
+            devices.append(device)
+
+        return devices
+
+    #-----------------------------------------------------------------------
+    @staticmethod
+    def parse_config(values):
+        """Parse the configuration entries for a specific type.
+
+        Entries without exactly one valid address are logged and skipped.
+
+        Args:
+          values (list):  The list of configuration entries this device type.
+
+        Returns:
+          list:  Returns a list of (address, name, config_extra) tuples for
+          each device.  name and config_extra are None if they aren't set.
+        """
+        entries = []
 
         # Loop over the configuration data.
         for config in values:
@@ -101,14 +126,9 @@ class Base:
             else:
                 addr = config
 
-            # Create the device using the class constructor.  Use kwargs
-            # syntax so any extra keyword args don't have to be at the end of
-            # the arg list.
-            device = cls(protocol=protocol, modem=modem, address=addr,
-                         name=name, config_extra=config_extra, **kwargs)
-            devices.append(device)
+            entries.append((addr, name, config_extra))
 
-        return devices
+        return entries
 
     #-----------------------------------------------------------------------
     def __init__(self, protocol, modem, address, name=None, config_extra=None):
@@ -720,22 +740,48 @@ class Base:
             seq.add(self.sync, dry_run, refresh=False, sequence=sequence)
         else:
             LOG.ui("Syncing %s device %s", self.label, dry_run_text)
-            # Perform diff after refresh if asked for
-            diff = self.db_config.diff(self.db)
-
-            if len(diff.del_entries) > 0 or len(diff.add_entries) > 0:
-                for entry in diff.del_entries:
-                    seq.add(self._sync_del, entry, dry_run)
-                for entry in diff.add_entries:
-                    seq.add(self._sync_add, entry, dry_run)
-            else:
-                LOG.ui("  No changes necessary.")
+            self._sync_diff(seq, dry_run)
 
         if sequence is None:
             seq.run()
         else:
             on_done(True, "Sync Complete", None)
 
+    #-----------------------------------------------------------------------
+    def _sync_diff(self, seq, dry_run):
+        """Add the changes needed to sync the device to a command sequence.
+
+        Used by sync() after the database has been refreshed.
+
+        Args:
+          seq (CommandSeq):  The sequence to add the changes to.
+          dry_run (bool):  If True, the changes are only logged.
+        """
+        # Skip the diff if the config and database are the same as the
+        # last time no changes were needed.
+        sync_key = self._sync_key()
+        if sync_key is not None and self.db.get_meta('sync') == sync_key:
+            LOG.ui("  No changes necessary.")
+            return
+
+        # Perform diff after refresh if asked for
+        diff = self.db_config.diff(self.db)
+
+        if len(diff.del_entries) > 0 or len(diff.add_entries) > 0:
+            # Plan the writes so deleted records are overwritten in place
+            # instead of deleting and then adding.
+            updates, deletes, adds = self.db.plan_sync(diff)
+            for old_entry, entry in updates:
+                seq.add(self._sync_update, old_entry, entry, dry_run)
+            for entry in deletes:
+                seq.add(self._sync_del, entry, dry_run)
+            for entry in adds:
+                seq.add(self._sync_add, entry, dry_run)
+        else:
+            LOG.ui("  No changes necessary.")
+            if sync_key is not None:
+                self.db.set_meta('sync', sync_key)
+
     #-----------------------------------------------------------------------
     def _sync_del(self, entry, dry_run, on_done=None):
         '''Deletes a link on the device with a Log UI Message
@@ -764,6 +810,38 @@ class Base:
                                   entry.is_controller, entry.data,
                                   on_done=on_done)
 
+    #-----------------------------------------------------------------------
+    def _sync_update(self, old_entry, entry, dry_run, on_done=None):
+        '''Overwrites a link on the device with a Log UI Message
+
+        Used by sync() so that messages are displayed in a logical fashion
+        '''
+        if dry_run:
+            LOG.ui("  Would Replace %s:", old_entry)
+            LOG.ui("    with %s:", entry)
+            on_done(True, None, None)
+        else:
+            LOG.ui("  Replacing %s:", old_entry)
+            LOG.ui("    with %s:", entry)
+            self.db.update_on_device(old_entry, entry, on_done=on_done)
+
+    #-----------------------------------------------------------------------
+    def _sync_key(self):
+        """Returns the Key Used to Skip Unchanged Syncs
+
+        The key is the hash of the scenes config links for this device and
+        the device database delta.  The delta changes whenever a link is
+        written to the device.
+
+        Returns:
+          (dict) The key or None if the database delta isn't known.
+        """
+        if self.db.delta is None or self.db_config is None:
+            return None
+
+        return {"config": self.db_config.content_hash(),
+                "delta": self.db.delta}
+
     #-----------------------------------------------------------------------
     def import_scenes(self, dry_run=True, save=True, on_done=None):
         """Imports Scenes Defined on the Device into the Scenes Config.
@@ -1105,6 +1183,23 @@ class Base:
             LOG.exception("Invalid command inputs to device %s'.  Input cmd "
                           "%s with args: %s", self.label, cmd, str(kwargs))
 
+    #-----------------------------------------------------------------------
+    def restore_state(self, is_on=None, level=None, group=None, reason=""):
+        """Restore a previously saved state.
+
+        This is used to set the state saved before a restart (see
+        StateCache).  It updates the internal state and emits the state
+        changed signals the same as a state change reported by the device.
+
+        Args:
+          is_on (bool):  True if the switch is on, False if it isn't.
+          level (int): The device level in the range [0,255].  0 is off.
+          group (int): The group to which this applies
+          reason (str):  This is optional and is used to identify why the
+                 state was set.  It is passed through to the output signal.
+        """
+        self._set_state(is_on=is_on, level=level, group=group, reason=reason)
+
     #-----------------------------------------------------------------------
     def _set_state(self, is_on=None, level=None, group=None,
                    mode=on_off.Mode.NORMAL, reason=""):
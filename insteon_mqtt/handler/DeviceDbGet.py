@@ -21,8 +21,19 @@ class DeviceDbGet(Base):
 
     Each reply is passed to the callback function set in the constructor
     which is usually a method on the device to update it's database.
+
+    The handler can also be used for a targeted read of num_rec records
+    starting at a memory location (see db.Device.get_msg()).  In that case
+    the handler finishes after that many records arrive even if none of them
+    is the last record.
+
+    As records arrive, the handler tracks the next memory location after the
+    last contiguous record received (next_mem_loc).  If the handler times out
+    part way through the download, the retry is a targeted read starting at
+    that location so records that were already received aren't sent again.
     """
-    def __init__(self, device_db, on_done, num_retry=3, time_out=5):
+    def __init__(self, device_db, on_done, num_retry=3, time_out=5,
+                 num_rec=0, mem_loc=None):
         """Constructor
 
         The on_done callback has the signature on_done(success, msg, entry)
@@ -39,10 +50,9 @@ class DeviceDbGet(Base):
                     This count does include the initial sending so a
                     retry of 3 will send once and then retry 2 more times.
                     Retries only apply to the initial get request and the ack
-                    of that request.  The subsequent messages are streamed from
-                    the device without further requests.  If the handler times
-                    out after the initial request, there is no way to recover,
-                    besides starting the request over again.
+                    of that request.  If the handler times out after some
+                    records have been received, the download is resumed at
+                    next_mem_loc instead.
           time_out (int): Timeout in seconds.  The regular timeout applies to
                           the initial request.  The subsequent messages are
                           streamed from the device without further action.
@@ -51,9 +61,52 @@ class DeviceDbGet(Base):
                           nothing we can do from this end if a message fails to
                           arrive, so we keep the network as quiet as possible
                           by doubling the timeout.
+          num_rec (int):  The number of records requested.  0 to read
+                  records until the last record is received.
+          mem_loc (int):  The memory location of the first record requested.
+                  None if the read starts at the beginning of the database.
         """
         super().__init__(on_done, num_retry, time_out)
         self.db = device_db
+        self.num_rec = num_rec
+        self._num_recv = 0
+        self._device_ack = False
+
+        # Memory location of the next record we expect.  Records are sent
+        # from high to low memory locations, 8 bytes apart starting at
+        # db.Device.START_MEM_LOC.
+        self.start_mem_loc = 0x0fff if mem_loc is None else mem_loc
+        self.next_mem_loc = self.start_mem_loc
+
+    #-----------------------------------------------------------------------
+    def is_expired(self, protocol, t):
+        """See if the time out time has been exceeded.
+
+        If records have been received since the last request was sent,
+        switch the message to retry to a read that resumes at the next memory
+        location we need.  Each resume is allowed one more send so the
+        download keeps going as long as records are arriving.
+
+        Args:
+          protocol (Protocol):  The Insteon Protocol object.
+          t (float):  Current time tag as a Unix clock time.
+
+        Returns:
+          bool:  Returns True if the message has timed out or False otherwise.
+        """
+        if (t >= self._expire_time and self._msg and
+                self.next_mem_loc < self.start_mem_loc):
+            LOG.info("%s resuming db download at %#06x", self.db.addr,
+                     self.next_mem_loc)
+            num_rec = 0
+            if self.num_rec:
+                num_rec = self.num_rec - self._num_recv
+
+            self._msg = self.db.get_msg(self.next_mem_loc, num_rec)
+            self.start_mem_loc = self.next_mem_loc
+            self._num_retry = self._num_sent
+
+        return super().is_expired(protocol, t)
 
     #-----------------------------------------------------------------------
     def msg_received(self, protocol, msg):
@@ -72,10 +125,6 @@ class DeviceDbGet(Base):
           Msg.CONTINUE if we handled the message and expect more.
           Msg.FINISHED if we handled the message and are done.
         """
-        # Import here - at file scope this makes a circular import which is
-        # ok in Python>=3.5 but not 3.4.
-        from .. import db  # pylint: disable=import-outside-toplevel
-
         if not self._PLM_sent:
             # If PLM hasn't sent our message yet, this can't be for us
             return Msg.UNKNOWN
@@ -99,32 +148,7 @@ class DeviceDbGet(Base):
             if msg.from_addr != self.db.addr or msg.cmd1 != 0x2f:
                 return Msg.UNKNOWN
 
-            if msg.flags.type == Msg.Flags.Type.DIRECT_ACK:
-                LOG.info("%s device ACK response", msg.from_addr)
-                # From here on out, the device is the only one talking. So
-                # remove any remaining retries, and double the timeout.
-                self._num_retry = 0
-                self._time_out = 2 * self._time_out
-                return Msg.CONTINUE
-
-            elif msg.flags.type == Msg.Flags.Type.DIRECT_NAK:
-                if msg.cmd2 == msg.NakType.PRE_NAK:
-                    # This is a "Pre NAK in case database search takes
-                    # too long".  This happens when the device database is
-                    # large.  Just ignore it, add more wait time and wait.
-                    LOG.warning("%s Pre-NAK: %s, Message: %s", msg.from_addr,
-                                msg.nak_str(), msg)
-                    return Msg.CONTINUE
-                else:
-                    LOG.error("%s device NAK error: %s, Message: %s",
-                              msg.from_addr, msg.nak_str(), msg)
-                    self.on_done(False, "Database command NAK. " +
-                                 msg.nak_str(), None)
-                    return Msg.FINISHED
-
-            else:
-                LOG.warning("%s device unexpected msg: %s", msg.from_addr, msg)
-                return Msg.UNKNOWN
+            return self._device_reply(msg)
 
         # Process the real reply.  Database reply is an extended messages.
         elif isinstance(msg, Msg.InpExtended) and self._PLM_ACK:
@@ -132,24 +156,91 @@ class DeviceDbGet(Base):
             if msg.from_addr != self.db.addr or msg.cmd1 != 0x2f:
                 return Msg.UNKNOWN
 
-            # Convert the message to a database device entry.
-            entry = db.DeviceEntry.from_bytes(msg.data, db=self.db)
-            LOG.ui("Entry: %s", entry)
+            return self._record_reply(msg)
 
-            # Skip entries w/ a null memory location.
-            if entry.mem_loc:
-                self.db.add_entry(entry)
+        return Msg.UNKNOWN
 
-            # Note that if the entry is a null entry (all zeros), then
-            # is_last_rec will be True as well.
-            if entry.db_flags.is_last_rec:
-                self.on_done(True, "Database received", entry)
-                return Msg.FINISHED
+    #-----------------------------------------------------------------------
+    def _device_reply(self, msg):
+        """Handle the device ACK/NAK of the get command.
 
-            # Otherwise keep processing records as they arrive.
-            else:
+        Args:
+          msg (InpStandard):  The device reply message.
+
+        Returns:
+          Msg.UNKNOWN if we can't handle this message.
+          Msg.CONTINUE if we handled the message and expect more.
+          Msg.FINISHED if we handled the message and are done.
+        """
+        if msg.flags.type == Msg.Flags.Type.DIRECT_ACK:
+            LOG.info("%s device ACK response", msg.from_addr)
+            # From here on out, the device is the only one talking.  So
+            # remove any remaining retries, and double the timeout.  A time
+            # out after records arrive is handled in is_expired().
+            self._num_retry = 0
+            if not self._device_ack:
+                self._device_ack = True
+                self._time_out = 2 * self._time_out
+            return Msg.CONTINUE
+
+        elif msg.flags.type == Msg.Flags.Type.DIRECT_NAK:
+            if msg.cmd2 == msg.NakType.PRE_NAK:
+                # This is a "Pre NAK in case database search takes too
+                # long".  This happens when the device database is large.
+                # Just ignore it, add more wait time and wait.
+                LOG.warning("%s Pre-NAK: %s, Message: %s", msg.from_addr,
+                            msg.nak_str(), msg)
                 return Msg.CONTINUE
+            else:
+                LOG.error("%s device NAK error: %s, Message: %s",
+                          msg.from_addr, msg.nak_str(), msg)
+                self.on_done(False, "Database command NAK. " + msg.nak_str(),
+                             None)
+                return Msg.FINISHED
 
+        LOG.warning("%s device unexpected msg: %s", msg.from_addr, msg)
         return Msg.UNKNOWN
 
     #-----------------------------------------------------------------------
+    def _record_reply(self, msg):
+        """Handle a database record sent by the device.
+
+        Args:
+          msg (InpExtended):  The database record message.
+
+        Returns:
+          Msg.CONTINUE if we handled the message and expect more.
+          Msg.FINISHED if we handled the message and are done.
+        """
+        # Import here - at file scope this makes a circular import which is
+        # ok in Python>=3.5 but not 3.4.
+        from .. import db  # pylint: disable=import-outside-toplevel
+
+        # Convert the message to a database device entry.
+        entry = db.DeviceEntry.from_bytes(msg.data, db=self.db)
+        LOG.ui("Entry: %s", entry)
+
+        # Skip entries w/ a null memory location.
+        if entry.mem_loc:
+            self.db.add_entry(entry)
+
+        # Checkpoint the download if this is the next contiguous record.
+        if entry.mem_loc == self.next_mem_loc:
+            self.next_mem_loc -= 0x08
+
+        # Note that if the entry is a null entry (all zeros), then
+        # is_last_rec will be True as well.
+        self._num_recv += 1
+        if entry.db_flags.is_last_rec:
+            self.on_done(True, "Database received", entry)
+            return Msg.FINISHED
+
+        # Targeted read - finished once all the requested records arrive.
+        elif self.num_rec and self._num_recv >= self.num_rec:
+            self.on_done(True, "Database records received", entry)
+            return Msg.FINISHED
+
+        # Otherwise keep processing records as they arrive.
+        return Msg.CONTINUE
+
+    #-----------------------------------------------------------------------
@@ -7,7 +7,6 @@ from .. import log
 from .. import message as Msg
 from .. import db
 from .Base import Base
-from .DeviceDbGet import DeviceDbGet
 
 
 LOG = log.get_logger()
@@ -103,11 +102,8 @@ class DeviceRefresh(Base):
                            "refreshing", self.addr, msg.cmd1,
                            self.device.db.delta)
 
-                    # Clear the current database values.
-                    self.device.db.clear()
-
-                    # When the update message below ends, update the db delta
-                    # w/ the current value and save the database.
+                    # When the update below ends, update the db delta w/ the
+                    # current value and save the database.
                     def on_done(success, message, data):
                         if success:
                             self.device.db.delta = msg.cmd1
@@ -116,23 +112,27 @@ class DeviceRefresh(Base):
                                    self.addr, self.device.db)
                         self.on_done(success, message, data)
 
-                    # Request that the device send us all of it's database
+                    # Request that the device send us the changed database
                     # records.  These will be streamed as fast as possible to
                     # us and the handler will update the database.  We need a
                     # retry count here because battery powered devices don't
                     # always respond right away.
                     if self.device.db.engine == 0:
+                        # Clear the current database values.
+                        self.device.db.clear()
                         scan_manager = db.DeviceScanManagerI1(self.device,
                                                               self.device.db,
                                                               on_done=on_done,
                                                               num_retry=3)
                         scan_manager.start_scan()
                     else:
-                        db_msg = Msg.OutExtended.direct(self.addr, 0x2f, 0x00,
-                                                        bytes(14))
-                        msg_handler = DeviceDbGet(self.device.db, on_done,
-                                                  num_retry=3)
-                        self.device.send(db_msg, msg_handler)
+                        # i2 devices support reading individual records so
+                        # try to only read the records that changed.  This
+                        # falls back to a full download if needed.
+                        refresh_manager = db.DeviceRefreshManager(
+                            self.device, self.device.db, msg.cmd1,
+                            on_done=on_done, num_retry=3)
+                        refresh_manager.start(self.force)
                 # Either way - this transaction is complete.
                 return Msg.FINISHED
 
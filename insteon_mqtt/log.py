@@ -3,8 +3,14 @@
 # Logging utilities
 #
 #===========================================================================
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
 import logging
 import logging.handlers
+import queue
 
 # Add a custom logging level.  This lets us do some filtering for sending
 # user interface messages to the command line tool about command status and
@@ -12,6 +18,20 @@ import logging.handlers
 UI_LEVEL = 21
 logging.addLevelName(UI_LEVEL, "UI")
 
+# The UI callback for the command session that is currently running.  This
+# is a context variable so each remote command gets its own callback.  The
+# Protocol and TimedCall classes save the callback when a message or call
+# is queued and restore it when the replies are processed so the UI
+# messages are sent to the session that started the command.
+_UI_CALLBACK = contextvars.ContextVar("ui_callback", default=None)
+
+# Background thread that writes the queued logging records when the queue
+# is enabled.  See initialize().
+_LISTENER = None
+
+# Formats exception tracebacks for the queued records.
+_EXC_FORMATTER = logging.Formatter()
+
 
 #===========================================================================
 def get_logger(name="insteon_mqtt"):
@@ -47,12 +67,27 @@ def initialize(level=None, screen=None, file=None, config=None):
       config:  Config object to read logging information from.  This read from
                the yaml file and the 'logging' key is extracted to configure
                the inputs.
+
+    The logging config can also contain:
+    - queue_size (int):  If set, records are put in a queue of this size
+                  and written to the screen and file by a background thread
+                  so slow output doesn't block the main loop.  Records are
+                  dropped if the queue is full.
+    - format (str):  'text' (default) or 'json' to write one JSON object
+              per record.
     """
+    global _LISTENER  # pylint: disable=global-statement
+
+    queue_size = 0
+    fmt_type = "text"
+
     # Config variables are used if the config is input and if a direct input
     # variable is not set.
     if config:
         # Read the logging config and initialize the library logger.
         data = config.get("logging", {})
+        queue_size = data.get("queue_size", queue_size)
+        fmt_type = data.get("format", fmt_type)
 
         if level is None:
             level = data.get("level", None)
@@ -71,23 +106,98 @@ def initialize(level=None, screen=None, file=None, config=None):
     log_obj.setLevel(level)
 
     # Add handlers for the optional screen and file output.
-    fmt = '%(asctime)s.%(msecs)03d %(levelname)s %(module)s: %(message)s'
-    datefmt = '%Y-%m-%d %H:%M:%S'
-    formatter = logging.Formatter(fmt, datefmt)
-
+    if fmt_type == "json":
+        formatter = JsonFormatter()
+    else:
+        fmt = '%(asctime)s.%(msecs)03d %(levelname)s %(module)s: %(message)s'
+        datefmt = '%Y-%m-%d %H:%M:%S'
+        formatter = logging.Formatter(fmt, datefmt)
+
+    handlers = []
     if screen:
         handler = logging.StreamHandler()
         handler.setFormatter(formatter)
-        log_obj.addHandler(handler)
+        handlers.append(handler)
 
     if file:
         # Use a watched file handler - that way LINUX system log
         # rotation works properly.
         handler = logging.handlers.WatchedFileHandler(file)
         handler.setFormatter(formatter)
+        handlers.append(handler)
+
+    stop_queue()
+    if queue_size and handlers:
+        # The UI handler isn't queued - it has to run in the context of the
+        # command session.
+        _LISTENER = logging.handlers.QueueListener(queue.Queue(queue_size),
+                                                   *handlers)
+        _LISTENER.start()
+        handlers = [DropQueueHandler(_LISTENER.queue)]
+
+    for handler in handlers:
         log_obj.addHandler(handler)
 
 
+#===========================================================================
+def stop_queue():
+    """Stop the logging queue thread.
+
+    The queued records are written before this returns.  Nothing is done
+    if the queue isn't enabled.
+    """
+    global _LISTENER  # pylint: disable=global-statement
+
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
+
+
+# Write any queued records at exit.
+atexit.register(stop_queue)
+
+
+#===========================================================================
+def get_ui_callback():
+    """Get the UI callback for the current command session.
+
+    Returns:
+      Returns the callback function or None if there is no session.
+    """
+    return _UI_CALLBACK.get()
+
+
+#===========================================================================
+@contextlib.contextmanager
+def ui_callback(callback):
+    """Context manager to run code for a command session.
+
+    UI messages logged inside the context are passed to the callback.  The
+    previous callback is restored when the context exits.
+
+    Args:
+      callback:  The callback function to use.  None for no session.
+    """
+    get_logger().addHandler(_UI_HANDLER)
+    token = _UI_CALLBACK.set(callback)
+    try:
+        yield
+    finally:
+        _UI_CALLBACK.reset(token)
+
+
+#===========================================================================
+def _ui_dispatch(record):
+    """Pass a UI logging record to the current session callback.
+
+    Args:
+      record:  The logging record.
+    """
+    callback = _UI_CALLBACK.get()
+    if callback is not None:
+        callback(record)
+
+
 #===========================================================================
 class Logger(logging.getLoggerClass()):
     """Custom logging class.
@@ -95,18 +205,9 @@ class Logger(logging.getLoggerClass()):
     This allows us to have a custom ui() function for logging.  The ui level
     can set a callback function which is run when UI messages are logged.
     This let's us send back specific user interface messages to the remote
-    command line tool for a nicer interface.
+    command line tool for a nicer interface.  The callback is set for a
+    single command session with the ui_callback() context manager.
     """
-    def __init__(self, name):
-        """Constructor
-
-        Args:
-          name (str):  The logging objecst name.
-        """
-        super().__init__(name)
-        self._ui_handler = None
-
-    #-----------------------------------------------------------------------
     def ui(self, msg, *args, **kwargs):
         """Log a UI level message.
 
@@ -121,26 +222,6 @@ class Logger(logging.getLoggerClass()):
             self._log(UI_LEVEL, msg, args, **kwargs)
 
     #-----------------------------------------------------------------------
-    def set_ui_callback(self, callback):
-        """Add a callback for UI messages.
-
-        The callback will be passed the logging module Record object to
-        process when a UI message is logged.  Only one UI callback can be
-        added at a time.
-
-        Args:
-          callback:  The callback function to use.
-        """
-        self._ui_handler = CallbackHandler(callback)
-        self.addHandler(self._ui_handler)
-
-    #-----------------------------------------------------------------------
-    def del_ui_callback(self):
-        """Remove the UI callback handler.
-        """
-        self.removeHandler(self._ui_handler)
-
-    #-----------------------------------------------------------------------
 
 #===========================================================================
 
@@ -169,4 +250,108 @@ class CallbackHandler(logging.Handler):
         """
         self.callback(record)
 
+
+#===========================================================================
+class DropQueueHandler(logging.handlers.QueueHandler):
+    """Logging handler that puts records in a bounded queue.
+
+    When the queue is full, the record is dropped instead of blocking the
+    caller.  The number of dropped records is logged with the next record
+    that fits in the queue.
+    """
+    def __init__(self, record_queue):
+        """Constructor
+
+        Args:
+          record_queue (queue.Queue):  The bounded queue to use.
+        """
+        super().__init__(record_queue)
+
+        # Total number of dropped records and the number already reported.
+        self.dropped = 0
+        self._reported = 0
+
+    #-----------------------------------------------------------------------
+    def prepare(self, record):
+        """Prepare a record to be queued.
+
+        The message is merged with the arguments so they don't have to be
+        pickled or kept alive.  The base class also merges the exception
+        traceback into the message which means a formatter can't output it
+        separately (see JsonFormatter) so this formats the traceback into
+        exc_text instead.
+
+        Args:
+           record:  The logging record.
+
+        Returns:
+          Returns the copy of the record to queue.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(
+                    record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    #-----------------------------------------------------------------------
+    def enqueue(self, record):
+        """Put a record in the queue or drop it if the queue is full.
+
+        Args:
+           record:  The logging record.
+        """
+        try:
+            if self.dropped != self._reported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name" : record.name,
+                    "levelno" : logging.WARNING,
+                    "levelname" : logging.getLevelName(logging.WARNING),
+                    "module" : "log",
+                    "msg" : "Logging queue full, dropped %d messages",
+                    "args" : (self.dropped - self._reported,),
+                    }))
+                self._reported = self.dropped
+
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+#===========================================================================
+class JsonFormatter(logging.Formatter):
+    """Logging formatter that writes each record as a JSON object.
+
+    The output is one line per record with the time stamp, level, module,
+    and message fields so it can be parsed by log processing tools.
+    """
+    def format(self, record):
+        """Format a logging record.
+
+        Args:
+           record:  The logging record.
+
+        Returns:
+          str:  Returns the JSON string.
+        """
+        data = {
+            "time" : round(record.created, 3),
+            "level" : record.levelname,
+            "module" : record.module,
+            "msg" : record.getMessage(),
+            }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+
+        return json.dumps(data)
+
+
 #===========================================================================
+# Single handler that sends UI messages to the current session callback.
+_UI_HANDLER = CallbackHandler(_ui_dispatch)
@@ -11,6 +11,9 @@ class Base:
     message is fixed length, set fixed_msg_size, otherwise implement
     msg_size().
     """
+    # Empty so derived classes can use __slots__ if they want to.
+    __slots__ = ()
+
     msg_code = None  # set to the message ID byte.
 
     # Read message size (including ack/nak byte).  Derived types should set
@@ -48,6 +48,25 @@ class Flags:
         max_hops = (b & 0b00000011) >> 0
         return Flags(type, bool(is_ext), hops_left, max_hops)
 
+    #-----------------------------------------------------------------------
+    @classmethod
+    def from_byte(cls, b):
+        """Look up the shared, read only Flags object for a flag byte.
+
+        Inbound messages are parsed constantly and there are only 256
+        possible flag bytes so this returns a precomputed object from
+        Flags.TABLE instead of building a new one.  The returned object is
+        shared between messages so it must not be modified (i.e. don't call
+        set_hops() on it).  Use from_bytes() to get a private copy.
+
+        Args:
+          b (int):  The flag byte to look up.
+
+        Returns:
+          Returns the shared Flags object for that byte.
+        """
+        return cls.TABLE[b]
+
     #-----------------------------------------------------------------------
     def __init__(self, type, is_ext, hops_left=3, max_hops=3):
         """Constructor
@@ -120,3 +139,9 @@ class Flags:
                                      self.max_hops, self.hops_left)
 
     #-----------------------------------------------------------------------
+#===========================================================================
+
+
+# Precomputed flags objects for every possible flag byte.  See
+# Flags.from_byte().
+Flags.TABLE = tuple(Flags.from_bytes(bytes([i])) for i in range(256))
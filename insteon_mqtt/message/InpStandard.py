@@ -24,6 +24,17 @@ class InpStandard(Base):
     msg_code = 0x50
     fixed_msg_size = 11
 
+    # Messages are created for every inbound packet (including duplicates
+    # that are dropped right away) so use slots to keep them small and fast
+    # to build.
+    __slots__ = ('_raw', '_from_addr', '_to_addr', 'flags', 'cmd1', 'cmd2',
+                 'group', 'read_time')
+
+    # Seconds per hop used to compute expire_time.  87 msec is empirical and
+    # was found to be an OK value to use with standard length messages in
+    # other Insteon software (misterhouse?)
+    hop_time = 0.087
+
     # NAK types
     class NakType(enum.IntEnum):
         SENDER_NOT_IN_DB = 0xFF
@@ -49,17 +60,14 @@ class InpStandard(Base):
         assert len(raw) >= InpStandard.fixed_msg_size
         assert raw[0] == 0x02 and raw[1] == InpStandard.msg_code
 
-        # Read the message flags first to see if we have an extended message.
-        # If we do, make sure we have enough bytes.
-        from_addr = Address.from_bytes(raw, 2)
-        to_addr = Address.from_bytes(raw, 5)
-        flags = Flags.from_bytes(raw, 8)
-        cmd1 = raw[9]
-        cmd2 = raw[10]
-        return InpStandard(from_addr, to_addr, flags, cmd1, cmd2)
+        # The addresses are decoded from the raw bytes only when they are
+        # used.  Flags come from the shared lookup table.
+        obj = cls.__new__(cls)
+        obj._init_raw(bytes(raw[:cls.fixed_msg_size]))
+        return obj
 
     #-----------------------------------------------------------------------
-    def __init__(self, from_addr, to_addr, flags, cmd1, cmd2):
+    def __init__(self, from_addr, to_addr, flags, cmd1, cmd2, read_time=None):
         """Constructor
 
         Args:
@@ -68,16 +76,21 @@ class InpStandard(Base):
           flags (Flags):  The message flags.
           cmd1 (int):  The command 1 byte.
           cmd2 (int):  The command 2 byte.
+          read_time (float):  The time the message was read from the link.
+                    If this is None, the time the message is first used is
+                    used instead.
         """
         super().__init__()
 
         assert isinstance(flags, Flags)
 
-        self.from_addr = from_addr
-        self.to_addr = to_addr
+        self._raw = None
+        self._from_addr = from_addr
+        self._to_addr = to_addr
         self.flags = flags
         self.cmd1 = cmd1
         self.cmd2 = cmd2
+        self.read_time = read_time
         self.group = None
         if self.flags.is_broadcast:
             self.group = self.to_addr.ids[2]
@@ -88,11 +101,69 @@ class InpStandard(Base):
             # with caution.
             self.group = self.cmd2
 
-        # This is the time by which the final hop would arrive, used to
-        # detect duplicates.  87 msec is empirical and was found to be an OK
-        # value to use with standard length messages in other Insteon
-        # software (misterhouse?)
-        self.expire_time = time.time() + self.flags.hops_left * 0.087
+    #-----------------------------------------------------------------------
+    def _init_raw(self, raw):
+        """Initialize the message from the raw message bytes.
+
+        Args:
+          raw (bytes):  The message bytes starting w/ the 0x02 byte.
+        """
+        self._raw = raw
+        self._from_addr = None
+        self._to_addr = None
+        self.flags = flags = Flags.from_byte(raw[8])
+        self.cmd1 = raw[9]
+        self.cmd2 = raw[10]
+        self.read_time = None
+        self.group = None
+        if flags.is_broadcast:
+            self.group = raw[7]
+        elif (flags.type == Flags.Type.ALL_LINK_CLEANUP or
+              flags.type == Flags.Type.CLEANUP_ACK):
+            # See the comment in __init__ about CLEANUP_ACK.
+            self.group = self.cmd2
+
+    #-----------------------------------------------------------------------
+    @property
+    def from_addr(self):
+        """The from device Address.  Decoded from the message on first use.
+        """
+        if self._from_addr is None:
+            self._from_addr = Address.from_bytes(self._raw, 2)
+        return self._from_addr
+
+    @from_addr.setter
+    def from_addr(self, addr):
+        self._from_addr = addr
+
+    #-----------------------------------------------------------------------
+    @property
+    def to_addr(self):
+        """The to device Address.  Decoded from the message on first use.
+        """
+        if self._to_addr is None:
+            self._to_addr = Address.from_bytes(self._raw, 5)
+        return self._to_addr
+
+    @to_addr.setter
+    def to_addr(self, addr):
+        self._to_addr = addr
+
+    #-----------------------------------------------------------------------
+    @property
+    def expire_time(self):
+        """The time by which the final hop would arrive.
+
+        This is used to detect duplicates and is computed from the time the
+        message was read from the link and the number of hops left.
+        """
+        if self.read_time is None:
+            self.read_time = time.time()
+        return self.read_time + self.flags.hops_left * self.hop_time
+
+    @expire_time.setter
+    def expire_time(self, t):
+        self.read_time = t - self.flags.hops_left * self.hop_time
 
     #-----------------------------------------------------------------------
     def nak_str(self):
@@ -153,11 +224,12 @@ class InpStandard(Base):
         if not isinstance(rhs, InpStandard):
             return False
 
-        return (self.from_addr == rhs.from_addr and
+        return (self.cmd1 == rhs.cmd1 and
+                self.cmd2 == rhs.cmd2 and
                 self.flags == rhs.flags and
                 self.group == rhs.group and
-                self.cmd1 == rhs.cmd1 and
-                self.cmd2 == rhs.cmd2)
+                _from_key(self._from_addr, self._raw) ==
+                _from_key(rhs._from_addr, rhs._raw))
 
     #-----------------------------------------------------------------------
 
@@ -175,6 +247,15 @@ class InpExtended(Base):
     msg_code = 0x51
     fixed_msg_size = 25
 
+    # See InpStandard for details on the slots and lazy address decoding.
+    __slots__ = ('_raw', '_from_addr', '_to_addr', 'flags', 'cmd1', 'cmd2',
+                 'data', 'group', 'read_time')
+
+    # Seconds per hop used to compute expire_time.  183 msec is empirical
+    # and was found to be an OK value to use with extended length messages
+    # in other Insteon software (misterhouse?)
+    hop_time = 0.183
+
     #-----------------------------------------------------------------------
     @classmethod
     def from_bytes(cls, raw):
@@ -192,16 +273,13 @@ class InpExtended(Base):
         assert len(raw) >= InpExtended.fixed_msg_size
         assert raw[0] == 0x02 and raw[1] == InpExtended.msg_code
 
-        from_addr = Address.from_bytes(raw, 2)
-        to_addr = Address.from_bytes(raw, 5)
-        flags = Flags.from_bytes(raw, 8)
-        cmd1 = raw[9]
-        cmd2 = raw[10]
-        data = raw[11:25]
-        return InpExtended(from_addr, to_addr, flags, cmd1, cmd2, data)
+        obj = cls.__new__(cls)
+        obj._init_raw(bytes(raw[:cls.fixed_msg_size]))
+        return obj
 
     #-----------------------------------------------------------------------
-    def __init__(self, from_addr, to_addr, flags, cmd1, cmd2, data):
+    def __init__(self, from_addr, to_addr, flags, cmd1, cmd2, data,
+                 read_time=None):
         """Constructor
 
         Args:
@@ -211,17 +289,22 @@ class InpExtended(Base):
           cmd1 (int):  The command 1 byte.
           cmd2 (int):  The command 2 byte.
           data (bytes):  14 byte extended data array.
+          read_time (float):  The time the message was read from the link.
+                    If this is None, the time the message is first used is
+                    used instead.
         """
         super().__init__()
 
         assert len(data) == 14
 
-        self.from_addr = from_addr
-        self.to_addr = to_addr
+        self._raw = None
+        self._from_addr = from_addr
+        self._to_addr = to_addr
         self.flags = flags
         self.cmd1 = cmd1
         self.cmd2 = cmd2
         self.data = data
+        self.read_time = read_time
         self.group = None
         if self.flags.is_broadcast:
             self.group = self.to_addr.ids[2]
@@ -229,11 +312,33 @@ class InpExtended(Base):
               self.flags.type == Flags.Type.CLEANUP_ACK):
             self.group = self.cmd2
 
-        # This is the time by which the final hop would arrive, used to
-        # detect duplicates.  183 msec is empirical and was found to be an OK
-        # value to use with extended length messages in other Insteon
-        # software (misterhouse?)
-        self.expire_time = time.time() + self.flags.hops_left * 0.183
+    #-----------------------------------------------------------------------
+    def _init_raw(self, raw):
+        """Initialize the message from the raw message bytes.
+
+        Args:
+          raw (bytes):  The message bytes starting w/ the 0x02 byte.
+        """
+        self._raw = raw
+        self._from_addr = None
+        self._to_addr = None
+        self.flags = flags = Flags.from_byte(raw[8])
+        self.cmd1 = raw[9]
+        self.cmd2 = raw[10]
+        self.data = raw[11:25]
+        self.read_time = None
+        self.group = None
+        if flags.is_broadcast:
+            self.group = raw[7]
+        elif (flags.type == Flags.Type.ALL_LINK_CLEANUP or
+              flags.type == Flags.Type.CLEANUP_ACK):
+            self.group = self.cmd2
+
+    # The lazy address and expiration time accessors are identical to the
+    # standard message ones.
+    from_addr = InpStandard.from_addr
+    to_addr = InpStandard.to_addr
+    expire_time = InpStandard.expire_time
 
     #-----------------------------------------------------------------------
     def __str__(self):
@@ -267,13 +372,32 @@ class InpExtended(Base):
         if not isinstance(rhs, InpExtended):
             return False
 
-        return (self.from_addr == rhs.from_addr and
+        return (self.cmd1 == rhs.cmd1 and
+                self.cmd2 == rhs.cmd2 and
                 self.flags == rhs.flags and
                 self.group == rhs.group and
-                self.cmd1 == rhs.cmd1 and
-                self.cmd2 == rhs.cmd2 and
-                self.data == rhs.data)
+                self.data == rhs.data and
+                _from_key(self._from_addr, self._raw) ==
+                _from_key(rhs._from_addr, rhs._raw))
 
     #-----------------------------------------------------------------------
 
 #===========================================================================
+
+
+def _from_key(from_addr, raw):
+    """Returns the from address bytes of a message w/o decoding the address.
+
+    Args:
+      from_addr (Address):  The decoded from address or None if it hasn't
+                been decoded yet.
+      raw (bytes):  The raw message bytes.
+
+    Returns:
+      bytes:  The 3 byte from address.
+    """
+    if from_addr is None:
+        return raw[2:5]
+    return Address(from_addr).bytes
+
+#===========================================================================
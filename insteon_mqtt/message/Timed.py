@@ -3,6 +3,7 @@
 # Timed message class
 #
 #===========================================================================
+from .. import log
 
 
 class Timed:
@@ -36,6 +37,9 @@ class Timed:
         self.high_priority = high_priority
         self.time = after
 
+        # UI callback of the command session that queued the message.
+        self.ui_callback = log.get_ui_callback()
+
     #-----------------------------------------------------------------------
     def is_active(self, t):
         """Return True if the message should be sent.
@@ -52,6 +56,7 @@ class Timed:
         Args:
           protocol (Protocol):  The Protocol class to use.
         """
-        protocol.send(self.msg, self.msg_handler, self.high_priority)
+        with log.ui_callback(self.ui_callback):
+            protocol.send(self.msg, self.msg_handler, self.high_priority)
 
 #===========================================================================
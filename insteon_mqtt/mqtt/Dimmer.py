@@ -89,7 +89,8 @@ class Dimmer(topic.StateTopic, topic.SceneTopic, topic.ManualTopic,
 
         # Level changing command messages.
         topic_str = self.msg_level.render_topic(self.base_template_data())
-        link.subscribe(topic_str, qos, self._input_set_level)
+        link.subscribe(topic_str, qos, self._input_set_level,
+                       topic_filter=self.msg_level.topic_filter())
 
         self.scene_subscribe(link, qos)
 
@@ -121,13 +121,15 @@ class FanLinc(Dimmer):
         if topic:
             handler = functools.partial(self._input_set_fan_speed,
                                         is_speed=False)
-            link.subscribe(topic, qos, handler)
+            link.subscribe(topic, qos, handler,
+                           topic_filter=self.msg_fan_on_off.topic_filter())
 
         topic = self.msg_fan_speed.render_topic(data)
         if topic:
             handler = functools.partial(self._input_set_fan_speed,
                                         is_speed=True)
-            link.subscribe(topic, qos, handler)
+            link.subscribe(topic, qos, handler,
+                           topic_filter=self.msg_fan_speed.topic_filter())
 
     #-----------------------------------------------------------------------
     def unsubscribe(self, link):
@@ -85,13 +85,15 @@ class KeypadLincDimmer(KeypadLinc):
         if topic_switch == topic_dimmer:
             data = self.base_template_data(button=1)
             topic_dimmer = self.msg_dimmer_level.render_topic(data)
-            link.subscribe(topic_dimmer, qos, self._input_set_level)
+            link.subscribe(topic_dimmer, qos, self._input_set_level,
+                           topic_filter=self.msg_dimmer_level.topic_filter())
         else:
             self.set_subscribe(link, qos, group=1)
             # Create the topic names for button 1.
             data = self.base_template_data(button=1)
             topic_dimmer = self.msg_dimmer_level.render_topic(data)
-            link.subscribe(topic_dimmer, qos, self._input_set_level)
+            link.subscribe(topic_dimmer, qos, self._input_set_level,
+                           topic_filter=self.msg_dimmer_level.topic_filter())
 
         # Add the Scene Topic
         self.scene_subscribe(link, qos, group=1)
@@ -29,6 +29,13 @@ class Modem(topic.SceneTopic, topic.DiscoveryTopic):
                          scene_payload='{ "cmd" : "{{json.cmd.lower()}}",'
                                        '"group" : {{json.group}} }')
 
+        # Startup refresh progress.
+        self.msg_refresh = MsgTemplate(
+            topic='insteon/modem/refresh',
+            payload='{ "done" : {{done}}, "total" : {{total}}, '
+                    '"deferred" : {{deferred}} }')
+        modem.signal_refresh_progress.connect(self._insteon_refresh)
+
         # This defines the default discovery_class for these devices
         self.default_discovery_cls = "modem"
 
@@ -49,6 +56,8 @@ class Modem(topic.SceneTopic, topic.DiscoveryTopic):
             return
 
         self.load_scene_data(data, qos)
+        self.msg_refresh.load_config(data, 'refresh_topic', 'refresh_payload',
+                                     qos)
 
         # Load Discovery Data, Modem uses a slightly different process than
         # all other devices.  It only uses a single template, but needs to
@@ -175,3 +184,24 @@ class Modem(topic.SceneTopic, topic.DiscoveryTopic):
                                            retain=False)
 
     #-----------------------------------------------------------------------
+    def _insteon_refresh(self, device, done, total, deferred):
+        """Startup refresh progress callback.
+
+        This is triggered via signal after each device refresh finishes
+        during the startup refresh.  It will publish an MQTT message with the
+        progress.
+
+        Args:
+          device (Modem):  The Insteon modem.
+          done (int):  The number of devices that have been refreshed.
+          total (int):  The number of devices to refresh.
+          deferred (int):  The number of battery devices that will be
+                   refreshed when they wake up.
+        """
+        data = self.base_template_data()
+        data["done"] = done
+        data["total"] = total
+        data["deferred"] = deferred
+        self.msg_refresh.publish(self.mqtt, data, retain=False)
+
+    #-----------------------------------------------------------------------
@@ -3,12 +3,16 @@
 # MQTT main interface
 #
 #===========================================================================
+import collections
 import functools
 import json
 import logging
 from .. import log
+from ..ScenePlanner import ScenePlanner
 from . import config
 from .MsgTemplate import MsgTemplate
+from .OfflineBuffer import OfflineBuffer
+from .PacedPublisher import PacedPublisher
 from .Reply import Reply
 
 LOG = log.get_logger()
@@ -56,6 +60,7 @@ class Mqtt:
         # modem.  We'll use it to create a corresponding MQTT device.
         self.modem = modem
         self.modem.signal_new_device.connect(self.handle_new_device)
+        self.modem.signal_remove_device.connect(self.handle_remove_device)
 
         # Callback for when we're connected to the broker so we can subscribe
         # to the various topics we need to monitor.
@@ -68,6 +73,12 @@ class Mqtt:
         # The command topic template (MstTemplate) to use.
         self._cmd_topic = None
 
+        # The bulk command topic to use.  None if not enabled.  If
+        # bulk_scenes is True, bulk on/off commands are replaced by modem
+        # scenes when possible.
+        self._bulk_topic = None
+        self.bulk_scenes = False
+
         # Enable discovery service
         self.discovery_enabled = False
 
@@ -83,10 +94,28 @@ class Mqtt:
         # The discovery base topic, None if not enabled
         self.discovery_topic_base = None
 
+        # Rate limited publisher for the discovery entities.
+        self.discovery_pacer = PacedPublisher(self)
+
         # MQTT message parameters.  These get loaded via the config.
         self.qos = 1
         self.retain = True
 
+        # If True, retained messages that are the same as the last message
+        # on the topic aren't published again.  Templates with a config key
+        # in suppress_exclude are always published.  _last_pub is a map of
+        # topic to the (payload hash, retain flag) last published there.
+        self.suppress_retained = False
+        self.suppress_exclude = set()
+        self.suppressed = 0
+        self._last_pub = {}
+
+        # Messages published while the broker is disconnected and the rate
+        # limited publisher used to send them after connecting.
+        self.offline_buffer = OfflineBuffer()
+        self._flush_pacer = PacedPublisher(self, queue=self.offline_buffer,
+                                           publish=self._send)
+
         # Loaded config object.
         self._config = None
 
@@ -107,6 +136,8 @@ class Mqtt:
         - retain:      (bool) Retain sent messages (Default True)
         - cmd_topic:   (str) The MQTT topic prefix to subscribe to for
                        system commands.
+        - bulk_cmd_topic:  (str) Optional MQTT topic to subscribe to for
+                           commands to multiple devices.
 
         Args:
           data (dict):  Configuration data to load.
@@ -115,11 +146,108 @@ class Mqtt:
         # connection to the broker.
         self.link.load_config(data)
 
+        # The link uses the availability topic for the will and the online
+        # messages so like the link settings, it isn't changed by a reload.
+        if 'availability_topic' in data:
+            self.availability_topic = data['availability_topic']
+
+        self._load_settings(data)
+
+        # Subscribe to the new topics.
+        if self.link.connected:
+            self._startup()
+
+    #-----------------------------------------------------------------------
+    def reload_config(self, data):
+        """Apply a changed configuration without reconnecting.
+
+        The templates of every MQTT device are loaded again.  Only the
+        devices and system topics whose subscription topics changed are
+        unsubscribed and subscribed again.  The broker connection settings
+        can't be changed while connected so a warning is logged if they
+        changed.
+
+        Args:
+          data (dict):  Configuration data to load.
+        """
+        LOG.info("Reloading MQTT configuration data")
+        old_data = self._config or {}
+        for key in ['broker', 'port', 'username', 'password', 'id',
+                    'keep_alive', 'availability_topic', 'encryption',
+                    'wildcard_subscribe', 'io_thread']:
+            if old_data.get(key) != data.get(key):
+                LOG.warning("Config setting mqtt.%s changed - restart to use "
+                            "the new value", key)
+
+        connected = self.link.connected
+        old_system = self._system_topics()
+        old_topics = {}
+        for addr_id, device in self.devices.items():
+            old_topics[addr_id] = _TopicRecorder.topics(device, self.qos)
+
+        self._load_settings(data)
+
+        if connected:
+            self._resubscribe_system(old_system)
+
+        for addr_id, device in self.devices.items():
+            device.load_config(data, self.qos)
+            if connected:
+                self._resubscribe_device(device, old_topics[addr_id])
+
+    #-----------------------------------------------------------------------
+    def _resubscribe_system(self, old_system):
+        """Update the system topic subscriptions after a reload.
+
+        Args:
+          old_system (dict):  The system topics before the reload.  Keys are
+                         the topics and values are the callbacks.
+        """
+        new_system = self._system_topics()
+        for topic in old_system:
+            if new_system.get(topic) != old_system[topic]:
+                self.link.unsubscribe(topic)
+
+        for topic, callback in new_system.items():
+            if old_system.get(topic) != callback:
+                self.link.subscribe(topic, self.qos, callback)
+
+    #-----------------------------------------------------------------------
+    def _resubscribe_device(self, device, old_topics):
+        """Update the subscriptions of a device after a reload.
+
+        Args:
+          device:  The MQTT device object whose config was reloaded.
+          old_topics (list):  The topics the device subscribed to before the
+                     reload.
+        """
+        # Subscribing again to an unchanged topic updates the callback so
+        # only the topics that are gone are unsubscribed.
+        topics = _TopicRecorder.topics(device, self.qos)
+        if topics != old_topics:
+            for topic in old_topics:
+                if topic not in topics:
+                    self.link.unsubscribe(topic)
+            device.subscribe(self.link, self.qos)
+
+        # Templates may have changed.  Unchanged retained messages are
+        # skipped if suppress_retained is on.
+        self._publish_device_discovery(device)
+
+    #-----------------------------------------------------------------------
+    def _load_settings(self, data):
+        """Load the configuration settings that don't affect the link.
+
+        Args:
+          data (dict):  Configuration data to load.
+        """
         # Create a template for prcessing messages on the command topic.
         self._cmd_topic = MsgTemplate.clean_topic(data['cmd_topic'])
 
-        if 'availability_topic' in data:
-            self.availability_topic = data['availability_topic']
+        self._bulk_topic = None
+        if data.get('bulk_cmd_topic'):
+            self._bulk_topic = MsgTemplate.clean_topic(data['bulk_cmd_topic'])
+        self.bulk_scenes = data.get('bulk_scenes', False)
 
         # Create a template for prcessing HomeAssistant status messages.
         if 'discovery_ha_status' in data:
@@ -141,21 +269,39 @@ class Mqtt:
         if not self.discovery_enabled:
             LOG.debug("Discovery disabled via config setting.")
 
+        # Maximum discovery messages per second, 0 for no limit.
+        self.discovery_pacer.set_rate(data.get('discovery_rate', 0))
+
         # MQTT message parameters.
         self.qos = data.get('qos', self.qos)
         self.retain = data.get('retain', self.retain)
 
+        self.suppress_retained = data.get('suppress_retained', False)
+        self.suppress_exclude = set(data.get('suppress_retained_exclude',
+                                             []))
+        self._last_pub = {}
+
+        # Buffer size in bytes and the flush rate in messages per second.
+        self.offline_buffer.max_bytes = data.get('offline_buffer', 0)
+        self._flush_pacer.set_rate(data.get('offline_flush_rate', 0))
+
         # Save the config for later passing to devices when they are created.
         self._config = data
 
-        # Subscribe to the new topics.
-        if self.link.connected:
-            self._startup()
-
     #-----------------------------------------------------------------------
-    def publish(self, topic, payload, qos=None, retain=None):
+    def publish(self, topic, payload, qos=None, retain=None, topic_key=None):
         """Publish a message out.
 
+        If the broker is disconnected and offline_buffer is enabled, the
+        message is buffered and published after the connection is made.
+        Messages are also buffered until the buffer has been flushed after
+        connecting so they are published in order and a buffered state
+        can't replace a newer one.
+
+        If suppress_retained is enabled, a retained message with the same
+        payload as the last message on the topic is not published again.
+        The broker already has that message.
+
         Args:
           topic (str):  The MQTT topic to publish with.
           payload (str):  The MQTT payload to send.
@@ -163,10 +309,44 @@ class Mqtt:
               to use.
           retain (bool):  None to use the class retain flag.  Otherwise
                  the retain flag to use.
+          topic_key (str):  The config key of the topic template that made
+                    the message (e.g. 'state_topic').  Messages from keys
+                    in suppress_exclude are always published.
         """
         qos = self.qos if qos is None else qos
         retain = self.retain if retain is None else retain
 
+        if self.offline_buffer.max_bytes and (not self.link.connected or
+                                              len(self.offline_buffer)):
+            self.offline_buffer.add(topic, payload, qos, retain)
+            return
+
+        self._send(topic, payload, qos, retain, topic_key)
+
+    #-----------------------------------------------------------------------
+    def _send(self, topic, payload, qos, retain, topic_key=None):
+        """Publish a message to the link without buffering it.
+
+        See publish() for details.
+
+        Args:
+          topic (str):  The MQTT topic to publish with.
+          payload (str):  The MQTT payload to send.
+          qos (int):  The QOS level to use.
+          retain (bool):  The retain flag to use.
+          topic_key (str):  The config key of the topic template that made
+                    the message.
+        """
+        if self.suppress_retained and topic_key not in self.suppress_exclude:
+            last = (hash(payload), retain)
+            if retain and self._last_pub.get(topic) == last:
+                self.suppressed += 1
+                LOG.debug("Suppressed unchanged retained message %s %s "
+                          "(%d total)", topic, payload, self.suppressed)
+                return
+
+            self._last_pub[topic] = last
+
         # Pass the message to the network link.
         self.link.publish(topic, payload, qos, retain)
 
@@ -194,6 +374,7 @@ class Mqtt:
         """
         if self.link.connected:
             self._startup()
+            self._flush_offline()
 
     #-----------------------------------------------------------------------
     def handle_new_device(self, modem, device):
@@ -231,6 +412,25 @@ class Mqtt:
             obj.subscribe(self.link, self.qos)
             self._publish_device_discovery(obj)
 
+    #-----------------------------------------------------------------------
+    def handle_remove_device(self, modem, device):
+        """Removed Insteon device callback.
+
+        This is called when the Insteon modem removes a device (from a
+        config reload).  The MQTT device is unsubscribed, disconnected from
+        the Insteon device signals, and deleted.  The topics are unsubscribed
+        even if the broker isn't connected so the message callbacks are
+        removed.
+
+        Args:
+          modem (Modem):  The Insteon modem device.
+          device (device.Base):  The Insteon device that was removed.
+        """
+        obj = self.devices.pop(device.addr.id, None)
+        if obj is not None:
+            obj.unsubscribe(self.link)
+            obj.close()
+
     #-----------------------------------------------------------------------
     def handle_cmd(self, client, userdata, message):
         """MQTT command message callback.
@@ -268,25 +468,39 @@ class Mqtt:
         # so the remote client can get status upates.  Obviously the remote
         # client and this code have to match what they expect the session
         # topic to be.
+        reply_cb = None
         end_reply = lambda *x: None
         if "session" in data:
             # Turn the session into a topic.
             reply_topic = "%s/session/%s" % (message.topic,
                                              data.pop("session"))
 
-            # Push the handle_reply callback to the logging object.  This way
-            # any call to LOG.UI() will send out a message.  This allows the
+            # Run the command with the handle_reply callback as the UI
+            # callback of the session.  This way any call to LOG.UI() made
+            # for this command will send out a message.  This allows the
             # server code to use the regular logging API to send out UI
             # messages to the remote client with out changing any of the
-            # code.
+            # code.  The callback is saved with each message and timed call
+            # the command queues so several sessions can run at once.
             reply_cb = functools.partial(self.handle_reply, topic=reply_topic)
-            LOG.set_ui_callback(reply_cb)
 
             # end_reply is called when the command is done and passes
             # record=None to indicate the command is finished.
             end_reply = functools.partial(self.handle_reply, None,
                                           topic=reply_topic)
 
+        with log.ui_callback(reply_cb):
+            self._run_cmd(message, data, end_reply)
+
+    #-----------------------------------------------------------------------
+    def _run_cmd(self, message, data, end_reply):
+        """Run a command from the command topic.
+
+        Args:
+          message:  MQTT message - has attrs: topic, payload, qos, retain.
+          data (dict):  The decoded command payload.
+          end_reply:  Function to call when the command is finished.
+        """
         # Extract the device name/address from the topic and use it to find
         # the device object to handle the command.
         device_id = message.topic.split("/")[-1]
@@ -318,12 +532,16 @@ class Mqtt:
 
         # Set up a callback to handle when finished.  This will send out the
         # finaly reply to the session topic to insure the remote client knows
-        # what happened.
+        # what happened.  The session is restored in case the command
+        # finishes from a call that didn't save it.
+        ui_cb = log.get_ui_callback()
+
         def on_done(success, msg, data):
-            if success:
-                LOG.ui(msg)
-            else:
-                LOG.error(msg)
+            with log.ui_callback(ui_cb):
+                if success:
+                    LOG.ui(msg)
+                else:
+                    LOG.error(msg)
             end_reply()
 
         try:
@@ -335,6 +553,249 @@ class Mqtt:
                           device.label)
             end_reply()
 
+    #-----------------------------------------------------------------------
+    def handle_bulk_cmd(self, client, userdata, message):
+        """MQTT bulk command message callback.
+
+        This runs commands on multiple devices from a single message.  The
+        payload is a json dictionary that contains these keys:
+
+        - session: Optional string to identify this command session.  A
+          single reply with the results of all the commands is published to
+          the session topic when every command has finished.
+
+        - commands: List of command dictionaries.  Each one has the device
+          name or address in the 'device' key, the command in the 'cmd' key,
+          and optionally a 'priority' key.  The rest of the keys are passed
+          to the command like the keys on the command topic.
+
+        All the devices and commands are found before anything is run so an
+        unknown device or command doesn't leave the batch half done.
+        Duplicate commands to the same device are merged and the arguments
+        of the last one are used.  Commands are run from the highest
+        priority to the lowest (default 0) and in the input order within a
+        priority.  If bulk_scenes is enabled, on/off commands are replaced
+        by modem scenes that set the same devices to the same states.  A
+        scene runs at the highest priority of the commands it replaces.
+
+        Args:
+          client (paho.Client):  The paho mqtt client (self.link).
+          data:  Optional user data (unused).
+          message:  MQTT message - has attrs: topic, payload, qos, retain.
+        """
+        LOG.info("MQTT message %s %s", message.topic, message.payload)
+
+        try:
+            data = json.loads(message.payload.decode("utf-8"))
+        except:
+            LOG.exception("Error decoding bulk command payload: %s",
+                          message.payload)
+            return
+
+        if not isinstance(data, dict):
+            LOG.error("Invalid bulk command payload: %s", message.payload)
+            return
+
+        reply_topic = None
+        if "session" in data:
+            reply_topic = "%s/session/%s" % (message.topic, data["session"])
+
+        # Find all the devices and command functions first.  Invalid entries
+        # are reported in the reply instead of raising out of the paho
+        # callback.
+        cmds, errors = self._bulk_resolve(data.get("commands", []))
+        LOG.info("Bulk command with %d commands, %d errors", len(cmds),
+                 len(errors))
+
+        results = []
+        num_cmds = len(cmds)
+
+        def on_done(device, cmd, success, msg, data):
+            results.append((success, "%s %s: %s" % (device.label, cmd, msg)))
+            if len(results) == num_cmds:
+                self._bulk_reply(reply_topic, results, errors)
+
+        def on_scene_done(items, success, msg, data):
+            for item in items:
+                on_done(item[1], item[2], success, msg, data)
+
+        if not cmds:
+            self._bulk_reply(reply_topic, results, errors)
+            return
+
+        def run_scene(group, is_on, items):
+            callback = functools.partial(on_scene_done, items)
+            self.modem.scene(is_on, group, on_done=callback)
+
+        def run_cmd(device, cmd, cmd_func, args):
+            callback = functools.partial(on_done, device, cmd)
+            try:
+                cmd_func(on_done=callback, **args)
+            except:
+                LOG.exception("Error running command %s on device %s", cmd,
+                              device.label)
+                callback(False, "Command error", None)
+
+        # Jobs are (-priority, position, function).  cmds is already in run
+        # order so the position is the index there.  Scenes use the highest
+        # priority and the first position of the commands they replace.
+        position = {id(item): i for i, item in enumerate(cmds)}
+        jobs = []
+        if self.bulk_scenes:
+            scenes, cmds = self._plan_scenes(cmds)
+            for group, is_on, items in scenes:
+                jobs.append((-max(i[0] for i in items),
+                             min(position[id(i)] for i in items),
+                             functools.partial(run_scene, group, is_on,
+                                               items)))
+
+        for item in cmds:
+            jobs.append((-item[0], position[id(item)],
+                         functools.partial(run_cmd, *item[1:])))
+
+        jobs.sort(key=lambda x: x[:2])
+        for job in jobs:
+            job[2]()
+
+    #-----------------------------------------------------------------------
+    def _bulk_resolve(self, commands):
+        """Find the devices and command functions of bulk command entries.
+
+        Duplicate commands to the same device are merged and the arguments
+        of the last one are used.
+
+        Args:
+          commands (list):  The command dictionaries from the bulk command
+                   payload.
+
+        Returns:
+          (list, list):  Returns the commands as (priority, device, cmd,
+          cmd_func, args) tuples sorted in run order and the error messages
+          for the invalid entries.
+        """
+        # Key is (device id, cmd), value is (priority, device, cmd,
+        # cmd_func, args).
+        batch = {}
+        errors = []
+        if not isinstance(commands, list):
+            errors.append("Invalid commands list '%s'" % commands)
+            commands = []
+
+        for entry in commands:
+            if not isinstance(entry, dict):
+                errors.append("Invalid command '%s'" % entry)
+                continue
+
+            entry = dict(entry)
+            device_id = entry.pop("device", None)
+            cmd = entry.pop("cmd", None)
+            priority = entry.pop("priority", 0)
+            if not isinstance(priority, int):
+                errors.append("Invalid priority '%s' for device %s" %
+                              (priority, device_id))
+                continue
+
+            device = None
+            if isinstance(device_id, str):
+                device = self.modem.find(device_id)
+            if not device:
+                errors.append("Unknown Insteon device '%s'" % device_id)
+                continue
+
+            cmd_func = None
+            if isinstance(cmd, str):
+                cmd_func = device.cmd_map.get(cmd, None)
+            if not cmd_func:
+                errors.append("Unknown command '%s' for device %s" %
+                              (cmd, device.label))
+                continue
+
+            batch[(id(device), cmd)] = (priority, device, cmd, cmd_func, entry)
+
+        # Sort is stable so the input order is kept within a priority.
+        cmds = sorted(batch.values(), key=lambda x: -x[0])
+        return cmds, errors
+
+    #-----------------------------------------------------------------------
+    def _plan_scenes(self, cmds):
+        """Find the modem scenes that can replace bulk on/off commands.
+
+        Only plain on/off commands (optional integer group and level
+        arguments) to devices with a single command in the batch are
+        replaced.
+
+        Args:
+          cmds (list):  The (priority, device, cmd, cmd_func, args) commands.
+
+        Returns:
+          (list, list):  Returns the (modem group, is_on, [commands]) scenes
+          and the commands that still need to be sent directly.
+        """
+        counts = collections.Counter(id(i[1]) for i in cmds)
+        targets = []
+        items = {}
+        for item in cmds:
+            _, device, cmd, _, args = item
+            if (cmd not in ("on", "off") or counts[id(device)] > 1 or
+                    not set(args) <= {"group", "level"} or
+                    not hasattr(device, "group_cmd_on_off")):
+                continue
+
+            # Other values are left for the command to check.
+            group = args.get("group", 0x01)
+            level = args.get("level", None)
+            if (not isinstance(group, int) or
+                    not isinstance(level, (int, type(None)))):
+                continue
+
+            targets.append((device, group, cmd == "on", level))
+            items[id(device)] = item
+
+        if len(targets) < 2:
+            return [], cmds
+
+        planner = ScenePlanner(self.modem)
+        scenes = planner.plan(targets)[0]
+
+        used = set()
+        result = []
+        for group, is_on, scene_targets in scenes:
+            scene_items = [items[id(i[0])] for i in scene_targets]
+            used.update(id(i) for i in scene_items)
+            result.append((group, is_on, scene_items))
+            LOG.info("Bulk command using modem scene %s for %d devices",
+                     group, len(scene_items))
+
+        return result, [i for i in cmds if id(i) not in used]
+
+    #-----------------------------------------------------------------------
+    def _bulk_reply(self, topic, results, errors):
+        """Publish the results of a bulk command.
+
+        Args:
+          topic (str):  The session topic to publish the reply to.  None if
+                the command had no session.
+          results (list):  The (success, message) results of the commands.
+          errors (list):  The error messages for commands that couldn't be
+                 run.
+        """
+        failed = errors + [msg for success, msg in results if not success]
+        for msg in failed:
+            LOG.error(msg)
+
+        if topic is None:
+            return
+
+        lines = ["%d of %d commands succeeded" %
+                 (len(results) + len(errors) - len(failed),
+                  len(results) + len(errors))]
+        lines.extend(errors)
+        lines.extend(msg for success, msg in results)
+
+        type = Reply.Type.ERROR if failed else Reply.Type.MESSAGE
+        self.link.publish(topic, Reply(type, "\n".join(lines)).to_json())
+        self.link.publish(topic, Reply(Reply.Type.END).to_json())
+
     #-----------------------------------------------------------------------
     def handle_reply(self, record, topic):
         """: Session logging reply.
@@ -343,16 +804,15 @@ class Mqtt:
         messages to the remote client.  The API is defined by the logging
         system.
 
-        If record is None, that indicates the command is done.  We'll remove
-        ourselves as a callback on the logging system in that case.
+        If record is None, that indicates the command is done and an END
+        reply is sent.
 
         Args:
           record:  Logging record.  None if the command is finished.
           topic (str):  The session topic to publish the log message to.
         """
-        # Command is finished.  Cleanup and send an END reply.
+        # Command is finished.  Send an END reply.
         if record is None:
-            LOG.del_ui_callback()
             reply = Reply(Reply.Type.END)
 
         # Normal reply.  Convert the logging object to a Reply object to send.
@@ -419,18 +879,54 @@ class Mqtt:
         It will also subscribe to the HomeAssistant status topic and trigger
         all devices to publish their discovery entities
         """
-        if self._cmd_topic:
-            self.link.subscribe(self._cmd_topic + "/+", self.qos,
-                                self.handle_cmd)
+        # The broker may not have the retained messages any more.
+        self._last_pub = {}
 
-        if self._ha_status_topic:
-            self.link.subscribe(self._ha_status_topic, self.qos,
-                                self.handle_ha_status)
+        for topic, callback in self._system_topics().items():
+            self.link.subscribe(topic, self.qos, callback)
 
         for device in self.devices.values():
             device.subscribe(self.link, self.qos)
             self._publish_device_discovery(device)
 
+    #-----------------------------------------------------------------------
+    def _system_topics(self):
+        """Return the command and status topics to subscribe to.
+
+        Returns:
+          dict:  Returns a map of topic to message callback.
+        """
+        topics = {}
+        if self._cmd_topic:
+            topics[self._cmd_topic + "/+"] = self.handle_cmd
+
+        if self._bulk_topic:
+            topics[self._bulk_topic] = self.handle_bulk_cmd
+
+        if self._ha_status_topic:
+            topics[self._ha_status_topic] = self.handle_ha_status
+
+        return topics
+
+    #-----------------------------------------------------------------------
+    def _flush_offline(self):
+        """Publish the messages buffered while the broker was disconnected.
+
+        The messages are sent at the offline_flush_rate so the broker isn't
+        flooded right after connecting.
+        """
+        if not len(self.offline_buffer):
+            return
+
+        LOG.info("Publishing %d messages buffered while disconnected, %d "
+                 "were dropped", len(self.offline_buffer),
+                 self.offline_buffer.dropped)
+        self.offline_buffer.dropped = 0
+
+        # The pacer sends the messages straight from the buffer.  New
+        # messages are added to the buffer until it's empty.
+        self._flush_pacer.start()
+
     #-----------------------------------------------------------------------
     def _shutdown(self):
         """Unsubscribe to the command and set topics.
@@ -440,9 +936,42 @@ class Mqtt:
         if self._cmd_topic:
             self.link.unsubscribe(self._cmd_topic + "/+")
 
+        if self._bulk_topic:
+            self.link.unsubscribe(self._bulk_topic)
+
         for device in self.devices.values():
             device.unsubscribe(self.link)
 
     #-----------------------------------------------------------------------
 
+
+#===========================================================================
+class _TopicRecorder:
+    """Fake MQTT link that records the topics a device subscribes to.
+    """
+    def __init__(self):
+        self.recorded = []
+
+    #-----------------------------------------------------------------------
+    @staticmethod
+    def topics(device, qos):
+        """Return the topics an MQTT device subscribes to.
+
+        Args:
+          device:  The MQTT device.
+          qos (int):  The quality of service to use.
+
+        Returns:
+          list:  Returns the subscription topics.
+        """
+        recorder = _TopicRecorder()
+        device.subscribe(recorder, qos)
+        return recorder.recorded
+
+    #-----------------------------------------------------------------------
+    def subscribe(self, topic, qos=0, callback=None, topic_filter=None):
+        self.recorded.append(topic)
+
+    #-----------------------------------------------------------------------
+
 #===========================================================================
@@ -6,16 +6,27 @@
 import json
 import jinja2
 from .. import log
+from . import util
 
 LOG = log.get_logger()
 
+# Marks a missing variable in the topic cache key.
+_MISSING = object()
+
 
 class MsgTemplate:
     """MQTT message template helper.
 
     This class stores a topic and payload jinja2 template for use in
     formatting and parsing MQTT messages.
+
+    Topic templates that only use the variables in STATIC_TOPIC_VARS render
+    the same topic every time for a device (and button) so the rendered
+    topics are cached by those values.
     """
+    #: Variables from BaseTopic.base_template_data() that never change for a
+    #: device and button.
+    STATIC_TOPIC_VARS = frozenset(["name", "address", "button"])
 
     @staticmethod
     def clean_topic(topic):
@@ -50,12 +61,17 @@ class MsgTemplate:
         self.qos = qos
         self.retain = retain
 
+        # The config key the topic was loaded from.  Passed to
+        # Mqtt.publish() to control suppression of unchanged messages.
+        self.topic_key = None
+
         # Keep the original string around for better log and error messages.
-        self.topic_str = topic
-        self.topic = None if topic is None else jinja2.Template(topic)
+        self._set_topic(topic)
 
         self.payload_str = payload
-        self.payload = None if payload is None else jinja2.Template(payload)
+        self.payload = None if payload is None else util.template(payload)
+        self._payload_fast = None if payload is None else \
+            util.fast_template(payload)
 
     #-----------------------------------------------------------------------
     def load_config(self, config, topic, payload, qos=None):
@@ -76,15 +92,16 @@ class MsgTemplate:
         if qos is not None:
             self.qos = qos
 
+        self.topic_key = topic
         template = config.get(topic, None)
         if template is not None:
-            self.topic_str = template
-            self.topic = jinja2.Template(template)
+            self._set_topic(template)
 
         template = config.get(payload, None)
         if template is not None:
             self.payload_str = template
-            self.payload = jinja2.Template(template)
+            self.payload = util.template(template)
+            self._payload_fast = util.fast_template(template)
 
     #-----------------------------------------------------------------------
     def render_topic(self, data, silent=False):
@@ -99,8 +116,21 @@ class MsgTemplate:
           str:  Returns the rendered topic.  This may be None if the
           constructor or config topic data was None.
         """
+        key = None
+        if self._topic_vars is not None:
+            key = tuple(data.get(name, _MISSING) for name in self._topic_vars)
+            try:
+                ret = self._topic_cache.get(key)
+            except TypeError:
+                # Unhashable template data.
+                key = ret = None
+
+            if ret is not None:
+                return ret
+
         try:
-            ret = self._render(self.topic_str, self.topic, data, silent)
+            ret = self._render(self.topic_str, self.topic, data, silent,
+                               self._topic_fast)
         except jinja2.exceptions.UndefinedError as exc:
             if not silent:
                 LOG.error("Error rendering topic: %s", exc)
@@ -108,6 +138,9 @@ class MsgTemplate:
                           self.topic_str.strip())
                 LOG.error("Data passed was: %s", data)
             ret = None
+
+        if key is not None and ret is not None:
+            self._topic_cache[key] = ret
         return ret
 
     #-----------------------------------------------------------------------
@@ -124,7 +157,8 @@ class MsgTemplate:
           constructor or config topic data was None.
         """
         try:
-            ret = self._render(self.payload_str, self.payload, data, silent)
+            ret = self._render(self.payload_str, self.payload, data, silent,
+                               self._payload_fast)
         except jinja2.exceptions.UndefinedError as exc:
             if not silent:
                 LOG.error("Error rendering payload: %s", exc)
@@ -134,6 +168,33 @@ class MsgTemplate:
             ret = None
         return ret
 
+    #-----------------------------------------------------------------------
+    def topic_filter(self):
+        """Return an MQTT wildcard filter that matches the rendered topics.
+
+        Each topic level that uses a template variable is replaced with the
+        '+' wildcard.  So 'insteon/{{address}}/set' returns 'insteon/+/set'
+        which matches the set topic of every device using this template.
+
+        Returns:
+          str:  Returns the topic filter or None if the topic template has
+          logic or expressions that span topic levels.
+        """
+        if self.topic_str is None:
+            return None
+
+        topic = self.clean_topic(self.topic_str)
+        if "{%" in topic or "{#" in topic:
+            return None
+
+        levels = []
+        for level in topic.split("/"):
+            if level.count("{{") != level.count("}}"):
+                return None
+            levels.append("+" if "{{" in level else level)
+
+        return "/".join(levels)
+
     #-----------------------------------------------------------------------
     def publish(self, mqtt, data, retain=None):
         """Publish a message.
@@ -152,7 +213,8 @@ class MsgTemplate:
         retain = retain if retain is not None else self.retain
 
         if topic and payload:
-            mqtt.publish(topic, payload, self.qos, retain)
+            mqtt.publish(topic, payload, self.qos, retain,
+                         topic_key=self.topic_key)
 
     #-----------------------------------------------------------------------
     def to_json(self, payload, silent=False):
@@ -199,7 +261,33 @@ class MsgTemplate:
             return None
 
     #-----------------------------------------------------------------------
-    def _render(self, raw, template, data, silent=False):
+    def _set_topic(self, topic):
+        """Set the topic template.
+
+        This clears the cache of rendered topics.
+
+        Args:
+          topic (str):  The topic template to use.  May be None.
+        """
+        self.topic_str = topic
+        self.topic = None
+        self._topic_fast = None
+
+        # Sorted names of the topic variables if the topic can be cached
+        # (else None) and the rendered topic for each tuple of their values.
+        self._topic_vars = None
+        self._topic_cache = {}
+
+        if topic is not None:
+            self.topic = util.template(topic)
+            self._topic_fast = util.fast_template(topic)
+
+            names = util.template_variables(topic)
+            if names <= self.STATIC_TOPIC_VARS:
+                self._topic_vars = tuple(sorted(names))
+
+    #-----------------------------------------------------------------------
+    def _render(self, raw, template, data, silent=False, fast=None):
         """Render a template and return None if it Fails.
 
         Args:
@@ -207,6 +295,8 @@ class MsgTemplate:
           template:  The Jinja template object to use.
           data (dict):  The data dictionary to pass to the template.
           silent (bool):  True to silence error logs.
+          fast:  Optional util.fast_template() function for the template.
+                 If it can't render the data, the Jinja template is used.
 
         Returns:
           str:  Returns the rendered value or None if if fails.
@@ -214,6 +304,11 @@ class MsgTemplate:
         if template is None:
             return None
 
+        if fast is not None:
+            ret = fast(data)
+            if ret is not None:
+                return ret
+
         return template.render(data)
 
     #-----------------------------------------------------------------------
@@ -0,0 +1,135 @@
+#===========================================================================
+#
+# Buffer for messages published while the broker is disconnected
+#
+#===========================================================================
+import collections
+from .. import log
+
+LOG = log.get_logger()
+
+
+class OfflineBuffer:
+    """Bounded buffer of MQTT messages waiting for the broker connection.
+
+    Retained messages are state so only the latest message on each topic is
+    kept.  Non-retained messages are events and are kept in order.  The
+    total size of the topics and payloads is limited to max_bytes.  When
+    the limit is reached, the oldest events are dropped first and then the
+    oldest states.
+    """
+    def __init__(self, max_bytes=0):
+        """Constructor
+
+        Args:
+          max_bytes (int):  The maximum size of the buffered messages.  0 to
+                    disable buffering.
+        """
+        self.max_bytes = max_bytes
+
+        # Topic -> (topic, payload, qos, retain) for retained messages in
+        # the order they were last updated.
+        self._states = collections.OrderedDict()
+
+        # (topic, payload, qos, retain) non-retained messages.
+        self._events = collections.deque()
+
+        # Current size of the buffered messages and the number of messages
+        # dropped because of the size limit.
+        self.num_bytes = 0
+        self.dropped = 0
+
+    #-----------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of buffered messages.
+        """
+        return len(self._states) + len(self._events)
+
+    #-----------------------------------------------------------------------
+    def add(self, topic, payload, qos, retain):
+        """Add a message to the buffer.
+
+        Args:
+          topic (str):  The MQTT topic to publish with.
+          payload (str):  The MQTT payload to send.
+          qos (int):  The QOS level to use.
+          retain (bool):  The retain flag to use.
+        """
+        msg = (topic, payload, qos, retain)
+        if retain:
+            old = self._states.pop(topic, None)
+            if old is not None:
+                self.num_bytes -= self._size(old)
+            self._states[topic] = msg
+        else:
+            self._events.append(msg)
+
+        self.num_bytes += self._size(msg)
+
+        while self.num_bytes > self.max_bytes and len(self):
+            if self._events:
+                old = self._events.popleft()
+            else:
+                old = self._states.popitem(last=False)[1]
+
+            self.num_bytes -= self._size(old)
+            self.dropped += 1
+            LOG.debug("Offline buffer full, dropped %s (%d total)", old[0],
+                      self.dropped)
+
+    #-----------------------------------------------------------------------
+    def append(self, msg):
+        """Add a (topic, payload, qos, retain) message to the buffer.
+
+        This lets the buffer be used as a PacedPublisher queue.
+
+        Args:
+          msg (tuple):  The message to add.
+        """
+        self.add(*msg)
+
+    #-----------------------------------------------------------------------
+    def popleft(self):
+        """Remove and return the next message to publish.
+
+        States are first followed by the events in the order they were
+        added.
+
+        Returns:
+          tuple:  Returns the (topic, payload, qos, retain) message.
+        """
+        if self._states:
+            msg = self._states.popitem(last=False)[1]
+        else:
+            msg = self._events.popleft()
+
+        self.num_bytes -= self._size(msg)
+        return msg
+
+    #-----------------------------------------------------------------------
+    def pop_all(self):
+        """Remove and return all the buffered messages.
+
+        Returns:
+          list:  Returns the (topic, payload, qos, retain) messages.  States
+          are first followed by the events in the order they were added.
+        """
+        msgs = list(self._states.values()) + list(self._events)
+        self._states.clear()
+        self._events.clear()
+        self.num_bytes = 0
+        return msgs
+
+    #-----------------------------------------------------------------------
+    def _size(self, msg):
+        """Return the approximate size of a message.
+
+        Args:
+          msg (tuple):  The (topic, payload, qos, retain) message.
+
+        Returns:
+          int:  Returns the size of the topic and payload.
+        """
+        return len(msg[0]) + len(msg[1])
+
+    #-----------------------------------------------------------------------
@@ -0,0 +1,126 @@
+#===========================================================================
+#
+# Rate limited MQTT publisher
+#
+#===========================================================================
+import collections
+import time
+from .. import log
+
+LOG = log.get_logger()
+
+
+class PacedPublisher:
+    """Token bucket rate limiter for MQTT publishing.
+
+    Publishing the discovery entities for every device at once puts
+    thousands of messages into the MQTT client in a single event loop pass
+    which floods the broker and delays everything else.  This class queues
+    the messages and publishes them at a fixed rate instead.
+
+    Tokens are added to the bucket at rate per second up to a maximum of
+    burst tokens.  Each message uses one token.  When the bucket is empty,
+    the rest of the queue is published later using the modem timed call
+    link.  A rate of 0 disables the pacing and publishes right away.
+    """
+    def __init__(self, mqtt, rate=0, burst=None, queue=None, publish=None):
+        """Constructor
+
+        Args:
+          mqtt (mqtt.Mqtt):  The MQTT main interface to publish to.
+          rate (float):  The maximum number of messages per second.  0 to
+               publish without any limit.
+          burst (int):  The maximum number of messages to publish at once.
+                If None, this is the same as rate.
+          queue:  Optional message queue to use.  It needs append(),
+                popleft(), and len().  Messages added to it directly are
+                sent by the next run or by start().
+          publish:  Optional function to send the messages with.  The
+                  default is mqtt.publish.
+        """
+        self.mqtt = mqtt
+        self.rate = 0
+        self.burst = 0
+        self.set_rate(rate, burst)
+
+        # Queued (topic, payload, qos, retain) messages.
+        self._queue = collections.deque() if queue is None else queue
+        self._publish = mqtt.publish if publish is None else publish
+
+        # Current number of tokens and the time they were last updated.
+        self._tokens = self.burst
+        self._time = time.time()
+
+        # True if a _run call is scheduled.
+        self._scheduled = False
+
+    #-----------------------------------------------------------------------
+    def set_rate(self, rate, burst=None):
+        """Set the publishing rate.
+
+        Args:
+          rate (float):  The maximum number of messages per second.  0 to
+               publish without any limit.
+          burst (int):  The maximum number of messages to publish at once.
+                If None, this is the same as rate.
+        """
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+
+    #-----------------------------------------------------------------------
+    def publish(self, topic, payload, qos=None, retain=None):
+        """Queue a message to be published.
+
+        Args:
+          topic (str):  The MQTT topic to publish with.
+          payload (str):  The MQTT payload to send.
+          qos (int):  None to use the MQTT class QOS. Otherwise the QOS level
+              to use.
+          retain (bool):  None to use the MQTT class retain flag.  Otherwise
+                 the retain flag to use.
+        """
+        if self.rate <= 0 and not self._queue:
+            self._publish(topic, payload, qos, retain)
+            return
+
+        self._queue.append((topic, payload, qos, retain))
+        self.start()
+
+    #-----------------------------------------------------------------------
+    def start(self):
+        """Start publishing the queued messages if that isn't scheduled.
+        """
+        if not self._scheduled:
+            self._run()
+
+    #-----------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of queued messages.
+        """
+        return len(self._queue)
+
+    #-----------------------------------------------------------------------
+    def _run(self):
+        """Publish as many queued messages as the bucket allows.
+
+        If there are messages left, this schedules itself to run again when
+        the next token is available.
+        """
+        self._scheduled = False
+
+        now = time.time()
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._time) * self.rate)
+        self._time = now
+
+        while self._queue and (self._tokens >= 1 or self.rate <= 0):
+            self._tokens -= 1
+            self._publish(*self._queue.popleft())
+
+        if self._queue:
+            LOG.debug("Paced publish, %d messages waiting", len(self._queue))
+            delay = (1 - self._tokens) / self.rate
+            self._scheduled = True
+            self.mqtt.modem.timed_call.add(now + delay, self._run)
+
+    #-----------------------------------------------------------------------
@@ -170,16 +170,20 @@ class Thermostat(topic.DiscoveryTopic):
         """
         data = self.template_data()
         rendered_topic = self.mode_command.render_topic(data)
-        link.subscribe(rendered_topic, qos, self._input_mode)
+        link.subscribe(rendered_topic, qos, self._input_mode,
+                       topic_filter=self.mode_command.topic_filter())
 
         rendered_topic = self.fan_command.render_topic(data)
-        link.subscribe(rendered_topic, qos, self._input_fan)
+        link.subscribe(rendered_topic, qos, self._input_fan,
+                       topic_filter=self.fan_command.topic_filter())
 
         rendered_topic = self.heat_sp_command.render_topic(data)
-        link.subscribe(rendered_topic, qos, self._input_heat_setpoint)
+        link.subscribe(rendered_topic, qos, self._input_heat_setpoint,
+                       topic_filter=self.heat_sp_command.topic_filter())
 
         rendered_topic = self.cool_sp_command.render_topic(data)
-        link.subscribe(rendered_topic, qos, self._input_cool_setpoint)
+        link.subscribe(rendered_topic, qos, self._input_cool_setpoint,
+                       topic_filter=self.cool_sp_command.topic_filter())
 
     #-----------------------------------------------------------------------
     def unsubscribe(self, link):
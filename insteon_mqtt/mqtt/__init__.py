@@ -18,23 +18,55 @@ MQTT messages.
 
 #===========================================================================
 
-from .BatterySensor import BatterySensor
-from .Dimmer import Dimmer
-from .EZIO4O import EZIO4O
-from .FanLinc import FanLinc
-from .HiddenDoor import HiddenDoor
-from .IOLinc import IOLinc
-from .KeypadLinc import KeypadLinc
-from .KeypadLincDimmer import KeypadLincDimmer
-from .Leak import Leak
-from .Modem import Modem
-from .Motion import Motion
-from .Mqtt import Mqtt
-from .MsgTemplate import MsgTemplate
-from .Outlet import Outlet
-from .Remote import Remote
-from .Reply import Reply
-from .SmokeBridge import SmokeBridge
-from .Switch import Switch
-from .Thermostat import Thermostat
-from . import util
+# The classes are imported the first time they're used.
+import typing as _typing
+from .. import util as _util
+
+_util.lazy_import(__name__, {
+    "BatterySensor" : (".BatterySensor", "BatterySensor"),
+    "Dimmer" : (".Dimmer", "Dimmer"),
+    "EZIO4O" : (".EZIO4O", "EZIO4O"),
+    "FanLinc" : (".FanLinc", "FanLinc"),
+    "HiddenDoor" : (".HiddenDoor", "HiddenDoor"),
+    "IOLinc" : (".IOLinc", "IOLinc"),
+    "KeypadLinc" : (".KeypadLinc", "KeypadLinc"),
+    "KeypadLincDimmer" : (".KeypadLincDimmer", "KeypadLincDimmer"),
+    "Leak" : (".Leak", "Leak"),
+    "Modem" : (".Modem", "Modem"),
+    "Motion" : (".Motion", "Motion"),
+    "Mqtt" : (".Mqtt", "Mqtt"),
+    "MsgTemplate" : (".MsgTemplate", "MsgTemplate"),
+    "OfflineBuffer" : (".OfflineBuffer", "OfflineBuffer"),
+    "Outlet" : (".Outlet", "Outlet"),
+    "PacedPublisher" : (".PacedPublisher", "PacedPublisher"),
+    "Remote" : (".Remote", "Remote"),
+    "Reply" : (".Reply", "Reply"),
+    "SmokeBridge" : (".SmokeBridge", "SmokeBridge"),
+    "Switch" : (".Switch", "Switch"),
+    "Thermostat" : (".Thermostat", "Thermostat"),
+    "util" : (".util", None),
+    })
+
+# Let pylint and other static tools see the lazy attributes.
+if _typing.TYPE_CHECKING:
+    from .BatterySensor import BatterySensor
+    from .Dimmer import Dimmer
+    from .EZIO4O import EZIO4O
+    from .FanLinc import FanLinc
+    from .HiddenDoor import HiddenDoor
+    from .IOLinc import IOLinc
+    from .KeypadLinc import KeypadLinc
+    from .KeypadLincDimmer import KeypadLincDimmer
+    from .Leak import Leak
+    from .Modem import Modem
+    from .Motion import Motion
+    from .Mqtt import Mqtt
+    from .MsgTemplate import MsgTemplate
+    from .OfflineBuffer import OfflineBuffer
+    from .Outlet import Outlet
+    from .PacedPublisher import PacedPublisher
+    from .Remote import Remote
+    from .Reply import Reply
+    from .SmokeBridge import SmokeBridge
+    from .Switch import Switch
+    from .Thermostat import Thermostat
@@ -5,6 +5,7 @@
 #===========================================================================
 import time
 from ... import log
+from ...Signal import Signal
 
 LOG = log.get_logger()
 
@@ -36,6 +37,17 @@ class BaseTopic:
         # only the default state topics and command topics will be generated
         self.extra_topic_nums = []
 
+    #-----------------------------------------------------------------------
+    def close(self):
+        """Disconnect from the Insteon device signals.
+
+        This is called when the Insteon device is removed so the Insteon
+        device no longer calls this object and it can be deleted.
+        """
+        for value in list(vars(self.device).values()):
+            if isinstance(value, Signal):
+                value.disconnect_object(self)
+
     #-----------------------------------------------------------------------
     def base_template_data(self, **kwargs):
         """Create the Jinja templating data variables for use in topics.
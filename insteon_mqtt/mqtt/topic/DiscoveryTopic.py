@@ -10,6 +10,7 @@ import jinja2
 from ... import log
 from ...catalog import Category
 from ..MsgTemplate import MsgTemplate
+from .. import util
 from .BaseTopic import BaseTopic
 
 LOG = log.get_logger()
@@ -42,6 +43,11 @@ class DiscoveryTopic(BaseTopic):
         # be overriden later if needed
         self.device_info_template = copy.deepcopy(mqtt.device_info_template)
 
+        # Rendered discovery messages and the device values they were
+        # rendered with.  See _discovery_messages().
+        self._disc_cache = None
+        self._disc_cacheable = False
+
     #-----------------------------------------------------------------------
     def load_discovery_data(self, config, qos=None):
         """Load values from a configuration data object.
@@ -53,6 +59,10 @@ class DiscoveryTopic(BaseTopic):
           config (dict):  The mqtt section of the config dict.
           qos (int):  The default quality of service level to use.
         """
+        # The config is changing so the rendered messages are out of date.
+        self._disc_cache = None
+        self._disc_cacheable = False
+
         # Skip if discovery not enabled
         if not self.mqtt.discovery_enabled:
             return
@@ -61,7 +71,44 @@ class DiscoveryTopic(BaseTopic):
         if not self.device.config_extra.get('discoverable', True):
             return
 
-        # Get the device specific discovery class(es)
+        base_class, override_classes = self._discovery_classes()
+
+        # handle base_class first, which must provide entities
+        entities = self._base_entities(config, base_class)
+        if entities is None:
+            return
+
+        # handle override classes
+        for override_class in override_classes:
+            class_config = config.get(override_class, None)
+            if class_config is None:
+                LOG.error("%s - Unable to find discovery class %s",
+                          self.device.label, override_class)
+                return
+            disc_overrides = class_config.get('discovery_overrides', None)
+            if (disc_overrides and
+                    not self._apply_discovery_overrides(entities,
+                                                        disc_overrides)):
+                return
+
+        # handle overrides from device
+        disc_overrides = self.device.config_extra.get('discovery_overrides',
+                                                      None)
+        if (disc_overrides and
+                not self._apply_discovery_overrides(entities, disc_overrides)):
+            return
+
+        self._add_disc_templates(entities, qos)
+        self._disc_cacheable = self._is_disc_cacheable()
+
+    #-----------------------------------------------------------------------
+    def _discovery_classes(self):
+        """Get the discovery classes for the device.
+
+        Returns:
+          (str, list):  Returns the base class name and the list of override
+          class names.
+        """
         disc_class = self.device.config_extra.get('discovery_class',
                                                   self.default_discovery_cls)
         if isinstance(disc_class, list):
@@ -80,50 +127,51 @@ class DiscoveryTopic(BaseTopic):
             else:
                 override_classes.append(dev_over_classes)
 
-        # handle base_class first, which must provide entities
+        return base_class, override_classes
+
+    #-----------------------------------------------------------------------
+    def _base_entities(self, config, base_class):
+        """Get a copy of the discovery entities of the base class.
+
+        Args:
+          config (dict):  The mqtt section of the config dict.
+          base_class (str):  The base discovery class name.
+
+        Returns:
+          dict:  Returns the entity name to entity config or None if there
+          is an error.
+        """
         class_config = config.get(base_class, None)
         if class_config is None:
             LOG.error("%s - Unable to find discovery class %s",
                       self.device.label, base_class)
-            return
+            return None
         entities = class_config.get('discovery_entities', None)
         if entities is None:
             LOG.error("%s - No discovery_entities defined",
                       self.device.label)
-            return
+            return None
         if isinstance(entities, list):
             # convert old-style (unnamed) entity list to new-style (named)
             # names are 'entity' plus the 0-based index in the list
-            entities = {'entity' + str(i): e for i, e in enumerate(entities)}
+            return {'entity' + str(i): e for i, e in enumerate(entities)}
         elif not isinstance(entities, dict):
             LOG.error("%s - discovery_entities must be a mapping - %s",
                       self.device.label, entities)
-            return
-        else:
-            # a copy of the entities dictionary is needed, so that overrides
-            # applied later do not modify the original in the base class
-            entities = copy.deepcopy(entities)
+            return None
 
-        # handle override classes
-        for override_class in override_classes:
-            class_config = config.get(override_class, None)
-            if class_config is None:
-                LOG.error("%s - Unable to find discovery class %s",
-                          self.device.label, override_class)
-                return
-            disc_overrides = class_config.get('discovery_overrides', None)
-            if disc_overrides:
-                if not self._apply_discovery_overrides(entities,
-                                                       disc_overrides):
-                    return
+        # a copy of the entities dictionary is needed, so that overrides
+        # applied later do not modify the original in the base class
+        return copy.deepcopy(entities)
 
-        # handle overrides from device
-        disc_overrides = self.device.config_extra.get('discovery_overrides',
-                                                      None)
-        if disc_overrides:
-            if not self._apply_discovery_overrides(entities, disc_overrides):
-                return
+    #-----------------------------------------------------------------------
+    def _add_disc_templates(self, entities, qos):
+        """Create the discovery message templates for the entities.
 
+        Args:
+          entities (dict):  The entity name to entity config.
+          qos (int):  The default quality of service level to use.
+        """
         # Loop all of the discovery entities and append them to
         # self.rendered_topic_map
         for entity in entities.values():
@@ -173,6 +221,25 @@ class DiscoveryTopic(BaseTopic):
                                                    qos=qos,
                                                    retain=False))
 
+    #-----------------------------------------------------------------------
+    def _is_disc_cacheable(self):
+        """See if the rendered discovery messages can be cached.
+
+        The timestamp changes every time so templates using it can't be
+        cached.
+
+        Returns:
+          bool:  Returns True if the messages can be cached.
+        """
+        try:
+            sources = [json.dumps(self.device_info_template, indent=2)]
+            for entry in self.disc_templates:
+                sources.extend([entry.topic_str, entry.payload_str])
+            return not any("timestamp" in util.template_variables(i)
+                           for i in sources)
+        except jinja2.exceptions.TemplateError:
+            return False
+
     #-----------------------------------------------------------------------
     def discovery_template_data(self, **kwargs):
         """Create the Jinja templating data variables for discovery messages.
@@ -246,7 +313,7 @@ class DiscoveryTopic(BaseTopic):
 
         # Finally, render the device_info_template
         try:
-            device_info_template = jinja2.Template(
+            device_info_template = util.template(
                 json.dumps(self.device_info_template, indent=2)
             )
             data['device_info'] = device_info_template.render(data)
@@ -277,10 +344,45 @@ class DiscoveryTopic(BaseTopic):
         LOG.info("Publishing discovery for %s kwargs: %s",
                  self.device.label, kwargs)
 
+        for topic, payload, qos in self._discovery_messages(**kwargs):
+            self.mqtt.discovery_pacer.publish(topic, payload, qos,
+                                              retain=False)
+
+    #-----------------------------------------------------------------------
+    def _discovery_messages(self, **kwargs):
+        """Render the discovery messages.
+
+        The rendered messages are cached.  They only change if the device
+        model, firmware, engine, or name changes or the config is reloaded.
+
+        Args:
+          kwargs (dict): The arguments to pass to discovery_template_data
+
+        Returns:
+          list:  Returns a list of (topic, payload, qos) tuples.
+        """
+        key = None
+        if self._disc_cacheable and not kwargs:
+            db = self.device.db
+            key = (db.desc, db.firmware, getattr(db, 'engine', None),
+                   self.device.name, self.device.name_user_case,
+                   self.mqtt.availability_topic)
+            if self._disc_cache is not None and self._disc_cache[0] == key:
+                return self._disc_cache[1]
+
         data = self.discovery_template_data(**kwargs)
 
+        msgs = []
         for entry in self.disc_templates:
-            entry.publish(self.mqtt, data, retain=False)
+            topic = entry.render_topic(data)
+            payload = entry.render_payload(data)
+            if topic and payload:
+                msgs.append((topic, payload, entry.qos))
+
+        if key is not None:
+            self._disc_cache = (key, msgs)
+
+        return msgs
 
     #-----------------------------------------------------------------------
     def _get_unique_id(self, config):
@@ -302,7 +404,7 @@ class DiscoveryTopic(BaseTopic):
         ret = None
         # First render template
         try:
-            config_template = jinja2.Template(config)
+            config_template = util.template(config)
             config_rendered = config_template.render(data)
         except jinja2.exceptions.TemplateError as exc:
             LOG.error("Error rendering config template: %s", exc)
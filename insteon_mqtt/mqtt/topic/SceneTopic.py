@@ -96,7 +96,8 @@ class SceneTopic(BaseTopic):
         else:
             handler = self._input_scene
             topic = self.msg_scene.render_topic(self.base_template_data())
-        link.subscribe(topic, qos, handler)
+        link.subscribe(topic, qos, handler,
+                       topic_filter=self.msg_scene.topic_filter())
 
     #-----------------------------------------------------------------------
     def scene_unsubscribe(self, link, group=None):
@@ -92,7 +92,8 @@ class SetTopic(BaseTopic):
         topic = self.msg_set.render_topic(
             self.base_template_data(button=group)
         )
-        link.subscribe(topic, qos, handler)
+        link.subscribe(topic, qos, handler,
+                       topic_filter=self.msg_set.topic_filter())
 
     #-----------------------------------------------------------------------
     def set_unsubscribe(self, link, group=None):
@@ -3,13 +3,142 @@
 # MQTT utilities
 #
 #===========================================================================
+import functools
+import re
+import jinja2
+import jinja2.meta
 from .. import on_off
 from .. import log
 
 
 LOG = log.get_logger()
 
+#: Maximum number of compiled templates to keep in the template() cache.
+TEMPLATE_CACHE_SIZE = 1024
 
+#: Shared jinja2 environment used to compile all the MQTT templates.
+ENV = jinja2.Environment()
+
+
+#===========================================================================
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def template(source):
+    """Compile a jinja2 template string.
+
+    Every device of the same type uses the same template strings from the
+    config so the compiled templates are cached by source and shared.
+    Templates are never modified after they are compiled so this is safe.
+
+    Args:
+      source (str):  The template string.
+
+    Returns:
+      jinja2.Template:  Returns the compiled template.
+    """
+    return ENV.from_string(source)
+
+
+#===========================================================================
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def template_variables(source):
+    """Return the names of the variables a jinja2 template string uses.
+
+    Args:
+      source (str):  The template string.
+
+    Returns:
+      frozenset:  Returns the set of variable names.
+    """
+    return frozenset(jinja2.meta.find_undeclared_variables(ENV.parse(source)))
+
+
+#===========================================================================
+# Expression allowed in a fast template: a variable with optional dotted
+# dictionary keys and an optional upper/lower method call or filter.
+_FAST_EXPR = re.compile(r"^\s*([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)"
+                        r"(?:\.(upper|lower)\(\)|\s*\|\s*(upper|lower))?\s*$")
+
+# Returned by the lookup when the data can't be handled by the fast path.
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def fast_template(source):
+    """Compile a trivial jinja2 template string into a Python function.
+
+    Most templates are plain variable substitutions like
+    'insteon/{{address}}/state' or '{{on_str.upper()}}'.  Rendering those
+    with a format string is much faster than running the jinja template.
+    Templates with any other logic return None and must be rendered with
+    jinja.
+
+    The returned function takes the template data dictionary and returns
+    the rendered string.  It returns None if the data would cause the
+    jinja template to do something other than simple substitution (missing
+    variables, method calls on non-strings).  The caller should then render
+    the jinja template which will handle it exactly as before.
+
+    Args:
+      source (str):  The template string.
+
+    Returns:
+      Returns the render function or None if the template isn't trivial.
+    """
+    if "{%" in source or "{#" in source or "\r" in source:
+        return None
+
+    # jinja removes a single trailing newline from the template.
+    if source.endswith("\n"):
+        source = source[:-1]
+
+    # Split returns literal, expression, literal, ..., literal.
+    parts = re.split(r"\{\{(.*?)\}\}", source, flags=re.DOTALL)
+    fmt = []
+    exprs = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            if "{{" in part:
+                return None
+            fmt.append(part.replace("{", "{{").replace("}", "}}"))
+            continue
+
+        match = _FAST_EXPR.match(part)
+        if not match:
+            return None
+
+        path = match.group(1).split(".")
+        method = match.group(2) or match.group(3)
+        exprs.append((path[0], path[1:], method))
+        fmt.append("{}")
+
+    fmt = "".join(fmt)
+
+    def render(data):
+        values = []
+        for name, keys, method in exprs:
+            value = data.get(name, _MISSING)
+            for key in keys:
+                # jinja tries attributes before dictionary keys.
+                if (not isinstance(value, dict) or key not in value or
+                        hasattr(value, key)):
+                    return None
+                value = value[key]
+
+            if value is _MISSING:
+                return None
+            elif method:
+                if not isinstance(value, str):
+                    return None
+                value = value.upper() if method == "upper" else value.lower()
+
+            values.append(str(value))
+
+        return fmt.format(*values)
+
+    return render
+
+
+#===========================================================================
 def parse_on_off(data, have_mode=True):
     """Parse on/off JSON data from an input message payload.
 
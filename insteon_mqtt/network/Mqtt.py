@@ -3,12 +3,16 @@
 # Network link to an MQTT client class
 #
 #===========================================================================
+import collections
+import functools
+import socket
 import ssl
 import sys
 import paho.mqtt.client as paho
 from .. import log
 from ..Signal import Signal
 from .Link import Link
+from .TopicTrie import TopicTrie
 
 LOG = log.get_logger(__name__)
 
@@ -28,6 +32,14 @@ class Mqtt(Link):
 
     Input fields can be set via the constructor or by loading a configuration
     file (see load_config for details).
+
+    If io_thread is enabled, the paho client runs its own network thread
+    (loop_start) so TLS, slow brokers, and large bursts of messages don't
+    delay the PLM reads and timers in the main event loop.  The paho
+    callbacks are put in a queue and a byte is written to a socket pair to
+    wake up the event loop which then runs the callbacks in the main
+    thread.  The manager watches the socket pair instead of the broker
+    socket.
     """
 
     # map for Paho acceptable TLS cert request options
@@ -98,6 +110,26 @@ class Mqtt(Link):
         self._reconnect_dt = reconnect_dt
         self._fd = None
 
+        # If True, subscriptions that provide a topic filter subscribe to the
+        # filter and the messages are routed to the callbacks using _routes
+        # (topic -> (filter, callback)).  _filters is the number of routed
+        # topics using each filter and _filters_sent are the filters that
+        # have been sent to the broker in this connection.
+        self.wildcard_subscribe = False
+        self._routes = TopicTrie()
+        self._filters = {}
+        self._filters_sent = set()
+
+        # Threaded mode settings.  _threaded is True while the paho thread
+        # is running.  _calls are the (func, args) callbacks from the paho
+        # thread waiting to run and _wake is the (read, write) socket pair
+        # used to wake up the event loop.
+        self.io_thread = False
+        self._threaded = False
+        self._closing = False
+        self._calls = collections.deque()
+        self._wake = None
+
         self.setup_client()
 
     #-----------------------------------------------------------------------
@@ -138,6 +170,9 @@ class Mqtt(Link):
         self.port = config['port']
         self.availability_topic = config['availability_topic']
         self.keep_alive = config.get("keep_alive", self.keep_alive)
+        self.wildcard_subscribe = config.get("wildcard_subscribe",
+                                             self.wildcard_subscribe)
+        self.io_thread = config.get("io_thread", self.io_thread)
 
         id = config.get("id")
         if id is not None:
@@ -206,13 +241,13 @@ class Mqtt(Link):
           retain (bool):  True to mark the message as retained.
         """
         self.client.publish(topic, payload, qos, retain)
-        self.signal_needs_write.emit(self, True)
+        self._needs_write()
 
         LOG.debug("MQTT publish %s %s qos=%s ret=%s", topic, payload, qos,
                   retain)
 
     #-----------------------------------------------------------------------
-    def subscribe(self, topic, qos=0, callback=None):
+    def subscribe(self, topic, qos=0, callback=None, topic_filter=None):
         """Subscribe the client to a topic.
 
         If a callback is supplied, then that callback will be used for all
@@ -220,19 +255,34 @@ class Mqtt(Link):
         will be sent for that message.  The callback signature is:
           func(client, user_data, message)
 
+        If wildcard_subscribe is enabled and a topic filter is supplied that
+        matches the topic, the client subscribes to the filter instead.
+        Every device of the same type uses the same filter so only a few
+        subscriptions are sent to the broker.  Incoming messages are routed
+        to the callback by topic.
+
         Args:
           topic (str):  The topic to subscribe to.
           qos (int): The quality of service level to use (0,1,2).
           callback:  Optional message callback.
+          topic_filter (str):  Optional wildcard filter that matches the
+                       topic and all the similar topics of other devices.
         """
+        if (self.wildcard_subscribe and callback and topic_filter and
+                paho.topic_matches_sub(topic_filter, topic)):
+            self._route(topic, qos, callback, topic_filter)
+            return
+
         # Tell the client about it and then notify the manager that we have
         # messages to send.
         self.client.subscribe(topic, qos)
 
         if callback:
+            if self._threaded:
+                callback = functools.partial(self._post, callback)
             self.client.message_callback_add(topic, callback)
 
-        self.signal_needs_write.emit(self, True)
+        self._needs_write()
 
         LOG.debug("MQTT subscribe %s qos=%s", topic, qos)
 
@@ -243,13 +293,54 @@ class Mqtt(Link):
         Args:
           topic (str):  The topic to unsubscribe from.
         """
+        route = self._routes.remove(topic)
+        if route is not None:
+            # Only unsubscribe the filter when no topics use it.
+            topic_filter = route[0]
+            self._filters[topic_filter] -= 1
+            if self._filters[topic_filter] > 0:
+                return
+
+            del self._filters[topic_filter]
+            self._filters_sent.discard(topic_filter)
+            topic = topic_filter
+        else:
+            # The client holds a reference to the callback so remove it.
+            self.client.message_callback_remove(topic)
+
         # Tell the client about it and then notify the manager that we have
         # messages to send.
         self.client.unsubscribe(topic)
-        self.signal_needs_write.emit(self, True)
+        self._needs_write()
 
         LOG.debug("MQTT unsubscribe %s", topic)
 
+    #-----------------------------------------------------------------------
+    def _route(self, topic, qos, callback, topic_filter):
+        """Route a topic to a callback using a wildcard subscription.
+
+        Args:
+          topic (str):  The topic to route.
+          qos (int): The quality of service level to use (0,1,2).
+          callback:  The message callback.
+          topic_filter (str):  The wildcard filter to subscribe to.
+        """
+        old = self._routes.get(topic)
+        if old is not None and old[0] != topic_filter:
+            self.unsubscribe(topic)
+            old = None
+
+        self._routes.add(topic, (topic_filter, callback))
+        if old is None:
+            self._filters[topic_filter] = self._filters.get(topic_filter,
+                                                            0) + 1
+
+        if topic_filter not in self._filters_sent:
+            self._filters_sent.add(topic_filter)
+            self.client.subscribe(topic_filter, qos)
+            self._needs_write()
+            LOG.debug("MQTT subscribe %s qos=%s", topic_filter, qos)
+
     #-----------------------------------------------------------------------
     def fileno(self):
         """Return the file descriptor to watch for this link.
@@ -276,6 +367,10 @@ class Mqtt(Link):
             passed in so that all clients receive the same "current" time
             instead of each calling time.time() and getting a different value.
         """
+        # The paho thread handles this in threaded mode.
+        if self._threaded:
+            return
+
         # This is required to handle keepalive messages and detect
         # disconnections.
         rc = self.client.loop_misc()
@@ -302,6 +397,9 @@ class Mqtt(Link):
           bool:  Returns True if the connection was successful or False it
           it failed.
         """
+        if self.io_thread:
+            return self._connect_thread()
+
         try:
             self.client.connect(self.host, self.port,
                                 keepalive=self.keep_alive)
@@ -336,6 +434,10 @@ class Mqtt(Link):
            int:  Return -1 if the link should be closed.  Or any other
            integer to indicate success.
         """
+        if self._threaded:
+            self._run_calls()
+            return 1
+
         # Tell the MQTT client that it ca read.
         status = self.client.loop_read()
 
@@ -382,7 +484,20 @@ class Mqtt(Link):
                             retain=True)
 
         self.client.disconnect()
-        self.signal_needs_write.emit(self, True)
+
+        if self._threaded:
+            # Wait for the paho thread to send the messages and finish.
+            self._closing = True
+            self.client.loop_stop()
+            self._threaded = False
+            self._closing = False
+            self._calls.clear()
+
+            self.connected = False
+            self.signal_closing.emit(self)
+            return
+
+        self._needs_write()
 
     #-----------------------------------------------------------------------
     def _on_connect(self, client, data, flags, result):
@@ -399,6 +514,8 @@ class Mqtt(Link):
                  authorized.
         """
         if result == 0:
+            # Routed filters need to be subscribed again.
+            self._filters_sent = set()
             self.connected = True
             self.signal_connected.emit(self, True)
             self.client.publish(self.availability_topic, payload="online",
@@ -423,6 +540,13 @@ class Mqtt(Link):
         LOG.info("MQTT disconnection %s %s", self.host, self.port)
 
         self.connected = False
+
+        # In threaded mode, the paho thread reconnects by itself.
+        if self._threaded:
+            if not self._closing:
+                self.signal_connected.emit(self, False)
+            return
+
         self.signal_closing.emit(self)
 
     #-----------------------------------------------------------------------
@@ -437,6 +561,15 @@ class Mqtt(Link):
           message:  MQTT message - has attrs: topic, payload, qos, retain.
         """
         LOG.info("MQTT message %s %s", message.topic, message.payload)
+
+        # Messages from wildcard subscriptions.
+        if self._routes:
+            routes = self._routes.find(message.topic)
+            if routes:
+                for _, callback in routes:
+                    callback(client, data, message)
+                return
+
         self.signal_message.emit(self, message)
 
     #-----------------------------------------------------------------------
@@ -461,6 +594,85 @@ class Mqtt(Link):
         else:
             LOG.log(5, buf)
 
+    #-----------------------------------------------------------------------
+    def _needs_write(self):
+        """Tell the manager that the client has data to write.
+
+        The paho thread does the writing in threaded mode.
+        """
+        if not self._threaded:
+            self.signal_needs_write.emit(self, True)
+
+    #-----------------------------------------------------------------------
+    def _connect_thread(self):
+        """Start the paho network thread.
+
+        The connection is made by the paho thread which also reconnects
+        automatically.  The manager watches the wake up socket instead.
+
+        Returns:
+          bool:  Returns True if the thread was started.
+        """
+        if self._wake is None:
+            self._wake = socket.socketpair()
+            for sock in self._wake:
+                sock.setblocking(False)
+
+        # Run the callbacks from the paho thread in the event loop.
+        self.client.on_connect = functools.partial(self._post,
+                                                   self._on_connect)
+        self.client.on_disconnect = functools.partial(self._post,
+                                                      self._on_disconnect)
+        self.client.on_message = functools.partial(self._post,
+                                                   self._on_message)
+
+        try:
+            self.client.connect_async(self.host, self.port,
+                                      keepalive=self.keep_alive)
+            self.client.loop_start()
+        except:
+            LOG.exception("MQTT thread start error to %s %s", self.host,
+                          self.port)
+            return False
+
+        self._threaded = True
+        self._fd = self._wake[0].fileno()
+        LOG.info("MQTT thread started %s %s with keepalive=%s", self.host,
+                 self.port, self.keep_alive)
+        return True
+
+    #-----------------------------------------------------------------------
+    def _post(self, func, *args):
+        """Queue a call to run in the event loop thread.
+
+        This is called from the paho thread.  The deque append is atomic so
+        no lock is needed.
+
+        Args:
+          func:  The function to call.
+          args:  The arguments to pass to the function.
+        """
+        self._calls.append((func, args))
+        try:
+            self._wake[1].send(b"\0")
+        except OSError:
+            # The socket buffer is full of wake up bytes already.
+            pass
+
+    #-----------------------------------------------------------------------
+    def _run_calls(self):
+        """Run the calls queued by the paho thread.
+        """
+        try:
+            while self._wake[0].recv(4096):
+                pass
+        except OSError:
+            pass
+
+        while self._calls:
+            func, args = self._calls.popleft()
+            func(*args)
+
     #-----------------------------------------------------------------------
     def __str__(self):
         return "MQTT %s:%d" % (self.host, self.port)
@@ -70,7 +70,8 @@ class TimedCall:
             if self.calls[0].time < t:
                 entry = self.calls.pop(0)
                 try:
-                    entry.func(*entry.args, **entry.kwargs)
+                    with log.ui_callback(entry.ui_callback):
+                        entry.func(*entry.args, **entry.kwargs)
                 except:
                     LOG.error("Error in executing TimedCall function")
 
@@ -132,3 +133,6 @@ class CallObject:
         self.func = func
         self.args = args
         self.kwargs = kwargs
+
+        # UI callback of the command session that added the call.
+        self.ui_callback = log.get_ui_callback()
@@ -0,0 +1,145 @@
+#===========================================================================
+#
+# MQTT topic trie.
+#
+#===========================================================================
+
+
+class TopicTrie:
+    """Map of MQTT topics to values with fast lookups.
+
+    Topics are split into levels on '/' and stored in a tree of levels so
+    finding the values for a topic takes one dictionary lookup per level
+    instead of comparing the topic against every stored topic.  Stored
+    topics may use the MQTT '+' (one level) and '#' (all remaining levels)
+    wildcards.
+    """
+    def __init__(self):
+        # Each node is [dict of level -> child node, value].  A value of
+        # None means no topic ends at the node.
+        self._root = [{}, None]
+        self._len = 0
+
+    #-----------------------------------------------------------------------
+    def __len__(self):
+        """Return the number of stored topics.
+        """
+        return self._len
+
+    #-----------------------------------------------------------------------
+    def add(self, topic, value):
+        """Add a topic.
+
+        If the topic already exists, the value is replaced.
+
+        Args:
+          topic (str):  The topic or topic filter to store.
+          value:  The value to store.  Must not be None.
+        """
+        node = self._root
+        for level in topic.split("/"):
+            node = node[0].setdefault(level, [{}, None])
+
+        if node[1] is None:
+            self._len += 1
+        node[1] = value
+
+    #-----------------------------------------------------------------------
+    def remove(self, topic):
+        """Remove a topic.
+
+        Args:
+          topic (str):  The topic or topic filter to remove.
+
+        Returns:
+          Returns the removed value or None if the topic wasn't stored.
+        """
+        path = [self._root]
+        levels = topic.split("/")
+        for level in levels:
+            node = path[-1][0].get(level)
+            if node is None:
+                return None
+            path.append(node)
+
+        value = path[-1][1]
+        if value is None:
+            return None
+
+        path[-1][1] = None
+        self._len -= 1
+
+        # Remove the nodes that are no longer used.
+        for i in range(len(levels), 0, -1):
+            node = path[i]
+            if node[0] or node[1] is not None:
+                break
+            del path[i - 1][0][levels[i - 1]]
+
+        return value
+
+    #-----------------------------------------------------------------------
+    def get(self, topic):
+        """Return the value stored for an exact topic.
+
+        Wildcards are not matched.
+
+        Args:
+          topic (str):  The topic to find.
+
+        Returns:
+          Returns the value or None if the topic isn't stored.
+        """
+        node = self._root
+        for level in topic.split("/"):
+            node = node[0].get(level)
+            if node is None:
+                return None
+
+        return node[1]
+
+    #-----------------------------------------------------------------------
+    def find(self, topic):
+        """Find the values for all the stored topics that match a topic.
+
+        Args:
+          topic (str):  The topic of a message.
+
+        Returns:
+          list:  Returns the matching values.
+        """
+        matches = []
+        self._find(self._root, topic.split("/"), 0, matches)
+        return matches
+
+    #-----------------------------------------------------------------------
+    def _find(self, node, levels, index, matches):
+        """Recursively find the values that match a topic.
+
+        Args:
+          node (list):  The current trie node.
+          levels (list):  The topic levels.
+          index (int):  The index of the level to match in node.
+          matches (list):  The list to append matching values to.
+        """
+        children = node[0]
+
+        # '#' matches this level and every level after it (and the parent).
+        child = children.get("#")
+        if child is not None and child[1] is not None:
+            matches.append(child[1])
+
+        if index == len(levels):
+            if node[1] is not None:
+                matches.append(node[1])
+            return
+
+        child = children.get(levels[index])
+        if child is not None:
+            self._find(child, levels, index + 1, matches)
+
+        child = children.get("+")
+        if child is not None:
+            self._find(child, levels, index + 1, matches)
+
+    #-----------------------------------------------------------------------
@@ -18,16 +18,31 @@ for maximum robustness.
 
 #===========================================================================
 
-from .Link import Link
-from .Serial import Serial
-from .Hub import Hub
-from .Stack import Stack
-from .Mqtt import Mqtt
-from .TimedCall import TimedCall
-
-# Use Poll on non-windows systems - For windows we have to use select.
+# The classes are imported the first time they're used so the serial,
+# requests, and paho modules are only loaded if they are needed.
 import platform  # pylint: disable=wrong-import-order
-if platform.system() != 'Windows':
+import typing as _typing
+from .. import util as _util
+
+_util.lazy_import(__name__, {
+    "Link" : (".Link", "Link"),
+    "Serial" : (".Serial", "Serial"),
+    "Hub" : (".Hub", "Hub"),
+    "Stack" : (".Stack", "Stack"),
+    "Mqtt" : (".Mqtt", "Mqtt"),
+    "TimedCall" : (".TimedCall", "TimedCall"),
+    "TopicTrie" : (".TopicTrie", "TopicTrie"),
+    "Manager" : (".poll" if platform.system() != 'Windows' else ".select",
+                 "Manager"),
+    })
+
+# Let pylint and other static tools see the lazy attributes.
+if _typing.TYPE_CHECKING:
+    from .Link import Link
+    from .Serial import Serial
+    from .Hub import Hub
+    from .Stack import Stack
+    from .Mqtt import Mqtt
+    from .TimedCall import TimedCall
+    from .TopicTrie import TopicTrie
     from .poll import Manager
-else:
-    from .select import Manager
@@ -15,6 +15,8 @@ REASON_SCENE = "scene"
 REASON_COMMAND = "command"
 # Device state from a refresh command.
 REASON_REFRESH = "refresh"
+# Device state restored from the saved state cache at startup.
+REASON_CACHE = "cache"
 
 
 #===========================================================================
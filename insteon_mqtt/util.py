@@ -4,7 +4,11 @@
 #
 #===========================================================================
 import binascii
+import importlib
+import importlib.util
 import io
+import sys
+import types
 from . import log
 
 LOG = log.get_logger()
@@ -316,3 +320,87 @@ def input_float(inputs, field):
     except ValueError:
         msg = "Invalid %s input.  Valid inputs are float values." % field
         LOG.exception(msg)
+
+
+#===========================================================================
+def lazy_import(name, attrs):
+    """Load the attributes of a package the first time they are used.
+
+    This is called at the end of a package __init__ so importing the
+    package doesn't import every module (and their third party
+    dependencies) in it.
+
+    Args:
+      name (str):  The package __name__.
+      attrs (dict):  Attribute name to (module, class) where module is the
+            module to import relative to the package and class is the
+            attribute in the module to use.  If class is None, the module
+            itself is used.
+    """
+    package = sys.modules[name]
+    package.__class__ = LazyModule
+    package.__dict__["_lazy_attrs"] = attrs
+
+
+#===========================================================================
+class LazyModule(types.ModuleType):
+    """Package module that imports its attributes on first use.
+
+    See lazy_import() for details.
+    """
+    def __getattr__(self, name):
+        """Import a lazy attribute.
+
+        This is only called if the attribute doesn't exist yet.
+
+        Args:
+          name (str):  The attribute name.
+
+        Returns:
+          Returns the attribute value.
+        """
+        attrs = self.__dict__.get("_lazy_attrs", {})
+        module, cls = attrs.get(name, ("." + name, None))
+
+        # Any other sub-module of the package can also be used as an
+        # attribute the same way as when the package imported everything.
+        if name not in attrs:
+            if (name.startswith("__") or
+                    importlib.util.find_spec(self.__name__ + module) is None):
+                raise AttributeError("module '%s' has no attribute '%s'" %
+                                     (self.__name__, name))
+
+        value = importlib.import_module(module, self.__name__)
+        if cls is not None:
+            value = getattr(value, cls)
+
+        self.__dict__[name] = value
+        return value
+
+    #-----------------------------------------------------------------------
+    def __setattr__(self, name, value):
+        """Set an attribute.
+
+        The import system sets every loaded module as an attribute of its
+        package.  Most of the classes have the same name as their module
+        so a module is never allowed to replace a lazy class attribute.
+
+        Args:
+          name (str):  The attribute name.
+          value:  The attribute value.
+        """
+        attrs = self.__dict__.get("_lazy_attrs", {})
+        if (isinstance(value, types.ModuleType) and name in attrs and
+                attrs[name][1] is not None):
+            return
+
+        super().__setattr__(name, value)
+
+    #-----------------------------------------------------------------------
+    def __dir__(self):
+        """Return the attribute names including the lazy attributes.
+        """
+        attrs = self.__dict__.get("_lazy_attrs", {})
+        return sorted(set(super().__dir__()) | set(attrs))
+
+#===========================================================================
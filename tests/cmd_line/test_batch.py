@@ -0,0 +1,49 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/cmd_line/batch.py
+#
+#===========================================================================
+import json
+import insteon_mqtt as IM
+from insteon_mqtt.cmd_line.main import parse_args
+import helpers
+from .test_util import MockClient
+
+
+class Test_batch:
+    def test_run(self, mocker, tmpdir, capsys):
+        clients = []
+
+        def new_client():
+            clients.append(MockClient())
+            return clients[-1]
+
+        mocker.patch('insteon_mqtt.cmd_line.util.mqtt.Client', new_client)
+        config = {"mqtt" : {"broker" : "broker", "port" : 1883}}
+
+        path = tmpdir.join("cmds.txt")
+        path.write("# Comment\n"
+                   "on aa.bb.cc -l 128\n"
+                   "\n"
+                   "off kitchen\n"
+                   "not-a-command\n"
+                   "start\n")
+        args = helpers.Data(config="config.yaml", topic="insteon/command",
+                            file=str(path), jobs=2, quiet=True,
+                            parse_args=parse_args)
+
+        status = IM.cmd_line.batch.run(args, config)
+
+        # Bad lines are reported and the status shows the failure.
+        assert status == -1
+        out, _err = capsys.readouterr()
+        assert "line 5" in out
+        assert "line 6" in out
+
+        # Both commands used the same connection.
+        assert len(clients) == 1
+        client = clients[0]
+        assert client.connects == 1
+        pub = [(t, json.loads(p)["cmd"]) for t, p in client.pub]
+        assert pub == [("insteon/command/aa.bb.cc", "on"),
+                       ("insteon/command/kitchen", "off")]
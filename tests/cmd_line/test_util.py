@@ -73,9 +73,82 @@ class Test_util:
         assert text in out
 
     #-----------------------------------------------------------------------
+    def test_client_jobs(self, mocker):
+        mocker.patch('insteon_mqtt.cmd_line.util.mqtt.Client', MockClient)
+        config = {"mqtt" : {"broker" : "broker", "port" : 1883}}
+
+        client = IM.cmd_line.util.Client(config, jobs=2)
+        s1 = client.send("insteon/command/a", {"cmd" : "on"}, True)
+        s2 = client.send("insteon/command/b", {"cmd" : "on"}, True)
+        assert len(client.client.pub) == 2
+        assert client.client.loops == 0
+
+        # The third command waits for one of the first two to finish.
+        s3 = client.send("insteon/command/c", {"cmd" : "on"}, True)
+        assert client.client.loops == 1
+        assert s1["done"] is True and s2["done"] is True
+        assert s3["done"] is False
+
+        client.wait()
+        assert s3["done"] is True
+        assert client.active == {}
+        assert len(client.client.unsub) == 3
+
+    #-----------------------------------------------------------------------
+    def test_batch_send(self, mocker):
+        mocker.patch('insteon_mqtt.cmd_line.util.mqtt.Client', MockClient)
+        config = {"mqtt" : {"broker" : "broker", "port" : 1883}}
+
+        with IM.cmd_line.util.batch(config, 4) as client:
+            for i in range(3):
+                session = IM.cmd_line.util.send(config, "insteon/command/a",
+                                                {"cmd" : "on"}, True)
+                assert session["done"] is False
+
+        assert len(client.sessions) == 3
+        assert all(i["done"] for i in client.sessions)
+        assert client.client.connects == 1
+        assert IM.cmd_line.util._BATCH_CLIENT is None
 
 
 #===========================================================================
+class MockClient:
+    """Mock paho client.  Each loop() call replies END to every command."""
+    def __init__(self, *args, **kwargs):
+        self.pub = []
+        self.unsub = []
+        self.cb = {}
+        self.loops = 0
+        self.connects = 0
+
+    def connect(self, host, port):
+        self.connects += 1
+
+    def disconnect(self):
+        pass
+
+    def subscribe(self, topic):
+        pass
+
+    def unsubscribe(self, topic):
+        self.unsub.append(topic)
+
+    def message_callback_add(self, topic, callback):
+        self.cb[topic] = callback
+
+    def message_callback_remove(self, topic):
+        self.cb.pop(topic, None)
+
+    def publish(self, topic, payload, qos=0):
+        self.pub.append((topic, payload))
+
+    def loop(self, timeout=1.0):
+        self.loops += 1
+        end = IM.mqtt.Reply(IM.mqtt.Reply.Type.END).to_json()
+        for topic, callback in list(self.cb.items()):
+            callback(self, None, MockMessage(topic, end))
+
+
 class MockMessage:
     def __init__(self, topic, msg):
         self.topic = topic
@@ -130,6 +130,17 @@ class Test_Device:
         assert len(obj2._meta) == 1
         assert obj2.get_meta('test') == 2
 
+    #-----------------------------------------------------------------------
+    def test_get_msg(self):
+        obj = IM.db.Device(IM.Address(0x01, 0x02, 0x03))
+
+        msg = obj.get_msg()
+        assert msg.to_addr == obj.addr
+        assert msg.cmd1 == 0x2f
+        assert msg.data == bytes(14)
+
+        msg = obj.get_msg(0x0fe7, num_rec=1)
+        assert msg.data[:5] == bytes([0x00, 0x00, 0x0f, 0xe7, 0x01])
 
     #-----------------------------------------------------------------------
     def test_add_multi_group(self):
@@ -272,6 +283,75 @@ class Test_Device:
         assert len(db.unused) == 1
         assert db.find_mem_loc(0x0fff) == new_entry
 
+    #-----------------------------------------------------------------------
+    def test_plan_sync(self):
+        db = IM.db.Device(IM.Address(0x01, 0x02, 0x03))
+
+        def entry(mem_loc, addr, group, data):
+            flags = Msg.DbFlags(in_use=True, is_controller=False,
+                                is_last_rec=False)
+            return IM.db.DeviceEntry(IM.Address(0x50, 0x51, addr), group,
+                                     mem_loc, flags, bytes(data), db=db)
+
+        diff = IM.db.DbDiff(db.addr)
+        # Changed on level of an existing link.
+        old1 = entry(0x0fff, 0x01, 0x01, [0xff, 0x00, 0x01])
+        new1 = entry(0, 0x01, 0x01, [0x80, 0x00, 0x01])
+        # Duplicate record deleted and the same link added back.
+        old2 = entry(0x0ff7, 0x02, 0x01, [0xff, 0x00, 0x01])
+        new2 = entry(0, 0x02, 0x01, [0xff, 0x00, 0x01])
+        # Unrelated delete and adds.
+        old3 = entry(0x0fef, 0x03, 0x01, [0xff, 0x00, 0x01])
+        new3 = entry(0, 0x04, 0x01, [0xff, 0x00, 0x01])
+        new4 = entry(0, 0x05, 0x01, [0xff, 0x00, 0x01])
+        for e in (old3, old1, old2):
+            diff.remove(e)
+        for e in (new2, new3, new1, new4):
+            diff.add(e)
+
+        updates, deletes, adds = db.plan_sync(diff)
+        assert updates == [(old1, new1), (old3, new3)]
+        assert updates[0][0].mem_loc == 0x0fff
+        assert updates[1][0].mem_loc == 0x0fef
+        assert deletes == []
+        assert adds == [new4]
+
+        # More deletes than adds - highest memory location first.
+        diff = IM.db.DbDiff(db.addr)
+        for e in (old3, old1, old2):
+            diff.remove(e)
+        diff.add(new3)
+        updates, deletes, adds = db.plan_sync(diff)
+        assert updates == [(old1, new3)]
+        assert [e.mem_loc for e in deletes] == [0x0ff7, 0x0fef]
+        assert adds == []
+
+    #-----------------------------------------------------------------------
+    def test_update_on_device(self):
+        device = MockDevice()
+        db = IM.db.Device(IM.Address(0x01, 0x02, 0x03), device=device)
+
+        flags = Msg.DbFlags(in_use=True, is_controller=True,
+                            is_last_rec=False)
+        old = IM.db.DeviceEntry(IM.Address(0x12, 0x34, 0x56), 0x01, 0x0fff,
+                                flags, bytes([0x03, 0x00, 0x01]), db=db)
+        db.add_entry(old, save=False)
+        assert len(db.groups[0x01]) == 1
+
+        new = IM.db.DeviceEntry(IM.Address(0x50, 0x51, 0x52), 0x02, 0,
+                                flags, bytes([0x03, 0x00, 0x02]), db=db)
+        db.update_on_device(old, new)
+
+        # One write at the old memory location.
+        assert len(device.sent) == 1
+        written = new.copy()
+        written.mem_loc = 0x0fff
+        assert device.sent[0].msg.data == written.to_bytes()
+        assert db.find_mem_loc(0x0fff) == written
+        assert len(db.entries) == 1
+        assert db.groups[0x01] == []
+        assert db.groups[0x02] == [written]
+
 #===========================================================================
 class MockDevice:
     """Mock insteon_mqtt/Device class
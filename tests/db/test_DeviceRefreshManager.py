@@ -0,0 +1,203 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/db/DeviceRefreshManager.py
+#
+#===========================================================================
+import insteon_mqtt as IM
+import insteon_mqtt.message as Msg
+
+
+class Test_DeviceRefreshManager:
+    #-----------------------------------------------------------------------
+    def test_full(self):
+        device = MockDevice()
+        device_db = IM.db.Device(IM.Address(0x01, 0x02, 0x03))
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x05)
+
+        # No current db - full download.
+        manager.start()
+        assert len(device.msgs) == 1
+        assert device.msgs[0].data == bytes(14)
+        assert device.handlers[0].num_rec == 0
+
+        # Force is always a full download.
+        device_db = make_db(2)
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x05)
+        manager.start(force=True)
+        assert device.msgs[1].data == bytes(14)
+        assert len(device_db) == 0
+
+    #-----------------------------------------------------------------------
+    def test_modified(self):
+        device = MockDevice()
+        device_db = make_db(3)
+        calls = []
+
+        def callback(success, msg, data):
+            calls.append(success)
+
+        # One change - probes the last record first, then unused, then
+        # the used records from the lowest memory location.
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x06,
+                                             on_done=callback)
+        manager.start()
+        assert mem_loc(device.msgs[0]) == 0x0fe7
+        assert device.handlers[0].num_rec == 1
+
+        # Last record is unchanged.
+        reply(device, device_db.last)
+        assert mem_loc(device.msgs[1]) == 0x0fef
+
+        # Lowest record is unchanged.
+        reply(device, device_db.entries[0x0fef])
+        assert mem_loc(device.msgs[2]) == 0x0ff7
+
+        # Next record had the data changed.
+        entry = device_db.entries[0x0ff7].copy()
+        entry.data = bytes([0x10, 0x20, 0x30])
+        reply(device, entry)
+        assert calls == [True]
+        assert len(device.msgs) == 3
+        assert device_db.entries[0x0ff7].data == bytes([0x10, 0x20, 0x30])
+        assert len(device_db) == 3
+
+    #-----------------------------------------------------------------------
+    def test_grow(self):
+        device = MockDevice()
+        device_db = make_db(2)
+        calls = []
+
+        def callback(success, msg, data):
+            calls.append(success)
+
+        # New entry plus a new last record = 2 changes.
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x07,
+                                             on_done=callback)
+        manager.start()
+        assert mem_loc(device.msgs[0]) == 0x0fef
+
+        # Old last record is now in use - keeps reading down.
+        reply(device, make_entry(0x0fef, 0x33))
+        assert mem_loc(device.msgs[1]) == 0x0fe7
+
+        flags = Msg.DbFlags(in_use=False, is_controller=False,
+                            is_last_rec=True)
+        last = IM.db.DeviceEntry(IM.Address(0, 0, 0), 0, 0x0fe7, flags, None)
+        reply(device, last)
+        assert calls == [True]
+        assert len(device_db) == 3
+        assert device_db.last.mem_loc == 0x0fe7
+
+    #-----------------------------------------------------------------------
+    def test_fallback(self):
+        device = MockDevice()
+        device_db = make_db(2)
+
+        # Probe limit reached - full download.
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x06,
+                                             max_probes=1)
+        manager.start()
+        reply(device, device_db.last)
+        assert device.msgs[1].data == bytes(14)
+        assert len(device_db) == 0
+
+        # Failed probe - full download.
+        device = MockDevice()
+        device_db = make_db(2)
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x06)
+        manager.start()
+        device.handlers[0].on_done(False, "Command timed out", None)
+        assert device.msgs[1].data == bytes(14)
+
+    #-----------------------------------------------------------------------
+    def test_resume(self):
+        device = MockDevice()
+        device_db = IM.db.Device(IM.Address(0x01, 0x02, 0x03))
+        calls = []
+
+        def callback(success, msg, data):
+            calls.append(success)
+
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x05,
+                                             on_done=callback)
+        manager.start()
+
+        # Two records arrive and then the download times out.
+        reply(device, make_entry(0x0fff, 0x01), Msg.CONTINUE)
+        reply(device, make_entry(0x0ff7, 0x02), Msg.CONTINUE)
+        device.handlers[0].on_done(False, "Command timed out", None)
+        assert calls == [False]
+        assert device_db.get_meta("db_resume") == {"delta": 0x05,
+                                                   "mem_loc": 0x0fef}
+
+        # Next refresh for the same delta resumes.
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x05,
+                                             on_done=callback)
+        manager.start()
+        assert mem_loc(device.msgs[1]) == 0x0fef
+        assert device.msgs[1].data[4] == 0x00
+        assert len(device_db) == 2
+
+        # Nothing arrives - the resume point is kept.
+        device.handlers[1].on_done(False, "Command timed out", None)
+        assert device_db.get_meta("db_resume")["mem_loc"] == 0x0fef
+
+        # A new delta starts over.
+        manager = IM.db.DeviceRefreshManager(device, device_db, 0x06,
+                                             on_done=callback)
+        manager.start()
+        assert device.msgs[2].data == bytes(14)
+        assert len(device_db) == 0
+
+        # Finishing clears the resume point.
+        flags = Msg.DbFlags(in_use=False, is_controller=False,
+                            is_last_rec=True)
+        last = IM.db.DeviceEntry(IM.Address(0, 0, 0), 0, 0x0fff, flags, None)
+        reply(device, last)
+        assert calls[-1] is True
+        assert device_db.get_meta("db_resume") is None
+
+
+#===========================================================================
+def make_entry(mem_loc, addr):
+    flags = Msg.DbFlags(in_use=True, is_controller=False, is_last_rec=False)
+    return IM.db.DeviceEntry(IM.Address(0x44, 0x55, addr), 0x01, mem_loc,
+                             flags, bytes([0xff, 0x00, 0x01]))
+
+
+def make_db(num):
+    device_db = IM.db.Device(IM.Address(0x01, 0x02, 0x03))
+    device_db.delta = 0x05
+    device_db.engine = 2
+    for i in range(num):
+        device_db.add_entry(make_entry(0x0fff - i * 8, i), save=False)
+    device_db.last.mem_loc = 0x0fff - num * 8
+    return device_db
+
+
+def mem_loc(msg):
+    return (msg.data[2] << 8) + msg.data[3]
+
+
+def reply(device, entry, status=Msg.FINISHED):
+    # Send the db record reply to the last handler.
+    handler = device.handlers[-1]
+    handler._PLM_sent = True
+    handler._PLM_ACK = True
+
+    addr = device.handlers[-1].db.addr
+    data = bytearray(entry.to_bytes())
+    data[1] = 0x01
+    flags = Msg.Flags(Msg.Flags.Type.DIRECT, True)
+    msg = Msg.InpExtended(addr, addr, flags, 0x2f, 0x00, bytes(data))
+    assert handler.msg_received(None, msg) == status
+
+
+class MockDevice:
+    def __init__(self):
+        self.msgs = []
+        self.handlers = []
+
+    def send(self, msg, handler, high_priority=False, after=None):
+        self.msgs.append(msg)
+        self.handlers.append(handler)
@@ -248,12 +248,50 @@ class Test_Base_Config():
         test_device.db_config.add_entry(test_entry_2)
         with mock.patch.object(IM.CommandSeq, 'add') as mocked:
             test_device.sync(dry_run=True, refresh=False)
-            assert mocked.call_count == 2
+            # The deleted record is overwritten with the new link.
+            assert mocked.call_count == 1
             call_args = mocked.call_args_list
-            assert call_args[0].args == (test_device._sync_del, test_entry_1,
-                                         True)
-            assert call_args[1].args == (test_device._sync_add, test_entry_2,
-                                         True)
+            assert call_args[0].args == (test_device._sync_update,
+                                         test_entry_1, test_entry_2, True)
+
+    def test_sync_skip(self, test_device, test_entry_1, test_entry_2):
+        # Device in sync - the sync key is saved.
+        test_device.db.add_entry(test_entry_1)
+        test_device.db.delta = 0x05
+        test_device.db_config = IM.db.Device(test_device.addr, None,
+                                             test_device)
+        test_device.db_config.add_entry(test_entry_1.copy())
+        test_device.sync(dry_run=True, refresh=False)
+        key = test_device.db.get_meta('sync')
+        assert key == {"config": test_device.db_config.content_hash(),
+                       "delta": 0x05}
+
+        # Same config and delta - no diff.
+        with mock.patch.object(IM.db.Device, 'diff') as mocked:
+            test_device.sync(dry_run=True, refresh=False)
+            assert mocked.call_count == 0
+
+        # Config changed - diffed again.
+        test_device.db_config.add_entry(test_entry_2)
+        with mock.patch.object(IM.CommandSeq, 'add') as mocked:
+            test_device.sync(dry_run=True, refresh=False)
+            assert mocked.call_count == 1
+        assert test_device.db.get_meta('sync') == key
+
+    def test_sync_update(self, test_device, test_entry_1, test_entry_2):
+        calls = []
+
+        def on_done(success, msg, data):
+            calls.append(success)
+        test_device._sync_update(test_entry_1, test_entry_2, True,
+                                 on_done=on_done)
+        assert calls == [True]
+
+        with mock.patch.object(IM.db.Device, 'update_on_device') as mocked:
+            test_device._sync_update(test_entry_1, test_entry_2, False,
+                                     on_done=on_done)
+            assert mocked.call_count == 1
+            assert mocked.call_args.args == (test_entry_1, test_entry_2)
 
     def test_sync_del_dry(self, test_device, test_entry_1):
         def on_done(success, msg, data):
@@ -414,6 +452,7 @@ class Test_Base_Config():
     def test_update_linked_devices(self, test_device, test_entry_1,
                                    test_entry_2, test_device_2, caplog):
         test_device.db.add_entry(test_entry_1)
+        test_entry_2.mem_loc = 9
         test_device.db.add_entry(test_entry_2)
         test_device.modem.add(test_device_2)
         test_device.db_config = IM.db.Device(test_device.addr, None,
@@ -118,7 +118,85 @@ class Test_DeviceDbGet:
         assert r == Msg.CONTINUE
         assert handler._PLM_ACK
 
+    #-----------------------------------------------------------------------
+    def test_num_rec(self):
+        proto = None
+        calls = []
+
+        def callback(success, msg, value):
+            calls.append(msg)
+
+        addr = IM.Address('0a.12.34')
+        db = Mockdb(addr)
+        handler = IM.handler.DeviceDbGet(db, callback, num_rec=2)
+        handler._PLM_sent = True
+        handler._PLM_ACK = True
+
+        flags = Msg.Flags(Msg.Flags.Type.DIRECT, True)
+        data = bytes([0x01, 0, 0, 0, 0, 0xFF, 0, 0x01, 0, 0, 0, 0, 0, 0])
+        msg = Msg.InpExtended(addr, addr, flags, 0x2f, 0x00, data)
+
+        # Finished after the requested number of records.
+        r = handler.msg_received(proto, msg)
+        assert r == Msg.CONTINUE
+        r = handler.msg_received(proto, msg)
+        assert r == Msg.FINISHED
+        assert calls == ["Database records received"]
+
+    #-----------------------------------------------------------------------
+    def test_resume(self):
+        proto = MockProto()
+        calls = []
+
+        def callback(success, msg, value):
+            calls.append(success)
+
+        addr = IM.Address('0a.12.34')
+        db = IM.db.Device(addr)
+        handler = IM.handler.DeviceDbGet(db, callback, num_retry=3)
+        msg = db.get_msg()
+        handler.sending_message(msg)
+        handler._PLM_ACK = True
+        assert handler.next_mem_loc == 0x0fff
+
+        # Device ACK removes the retries of the request.
+        flags = Msg.Flags(Msg.Flags.Type.DIRECT_ACK, False)
+        msg = Msg.InpStandard(addr, addr, flags, 0x2f, 0x00)
+        assert handler.msg_received(proto, msg) == Msg.CONTINUE
+        assert handler._num_retry == 0
+
+        # Records arrive in order - checkpoint moves down.
+        flags = Msg.Flags(Msg.Flags.Type.DIRECT, True)
+        for mem_loc in (0x0fff, 0x0ff7, 0x0fe7):
+            data = bytes([0x01, 0x01, mem_loc >> 8, mem_loc & 0xff, 0, 0xa2,
+                          0x01, 0x44, 0x55, 0x66, 0, 0, 0, 0])
+            msg = Msg.InpExtended(addr, addr, flags, 0x2f, 0x00, data)
+            assert handler.msg_received(proto, msg) == Msg.CONTINUE
+
+        # 0x0fef is missing so the checkpoint stops there.
+        assert handler.next_mem_loc == 0x0fef
+        assert len(db) == 3
+
+        # Time out resends a read starting at the checkpoint.
+        assert handler.is_expired(proto, handler._expire_time + 1)
+        assert len(proto.sent) == 1
+        assert proto.sent[0].data[2:5] == bytes([0x0f, 0xef, 0x00])
+        assert calls == []
+
+        # Another time out without new records ends the handler.
+        handler.sending_message(proto.sent[0])
+        assert handler.is_expired(proto, handler._expire_time + 1)
+        assert len(proto.sent) == 1
+        assert calls == [False]
+
+
+#===========================================================================
+class MockProto:
+    def __init__(self):
+        self.sent = []
 
+    def send(self, msg, handler, high_priority=False, after=None):
+        self.sent.append(msg)
 
 
 #===========================================================================
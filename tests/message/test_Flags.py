@@ -71,3 +71,15 @@ class Test_DbFlags:
         assert obj.max_hops == 1
 
     #-----------------------------------------------------------------------
+    def test_from_byte(self):
+        for i in range(256):
+            obj = Msg.Flags.from_byte(i)
+            assert obj is Msg.Flags.from_byte(i)
+            assert obj.to_bytes()[0] == i
+            assert obj == Msg.Flags.from_bytes(bytes([i]))
+
+        # from_bytes still returns a new object that can be modified.
+        b = bytes([0x0f])
+        assert Msg.Flags.from_bytes(b) is not Msg.Flags.from_bytes(b)
+
+    #-----------------------------------------------------------------------
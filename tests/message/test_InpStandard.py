@@ -150,5 +150,38 @@ class Test_InpStandard:
         nak_str = obj.nak_str()
         assert len(nak_str) == 0
 
+    #-----------------------------------------------------------------------
+    def test_lazy(self):
+        b = bytearray([0x02, 0x50,  # code
+                       0x3e, 0xe2, 0xc4,  # from addr
+                       0x23, 0x9b, 0x65,  # to addr
+                       0x6b,  # flags 3 max_hops and 2 hops_left
+                       0x11, 0x01])  # cmd1, cmd2
+        obj = Msg.InpStandard.from_bytes(b)
+
+        # Changing the input buffer doesn't change the message.
+        b[2] = 0xff
+
+        assert obj._from_addr is None
+        assert obj._to_addr is None
+        assert obj.from_addr == IM.Address(0x3e, 0xe2, 0xc4)
+        assert obj.from_addr is obj.from_addr
+        assert obj.to_addr == IM.Address(0x23, 0x9b, 0x65)
+
+        # Flags are shared from the lookup table.
+        assert obj.flags is Msg.Flags.from_byte(0x6b)
+
+        # Expire time is computed from the read time.
+        obj.read_time = 100
+        assert obj.expire_time == 100 + 2 * 0.087
+
+        # Raw and constructed messages compare equal.
+        obj2 = Msg.InpStandard(IM.Address(0x3e, 0xe2, 0xc4),
+                               IM.Address(0x23, 0x9b, 0x65),
+                               Msg.Flags(Msg.Flags.Type.CLEANUP_ACK, False),
+                               0x11, 0x01)
+        assert obj == obj2
+        assert obj2 == obj
+
 
 #===========================================================================
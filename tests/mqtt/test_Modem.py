@@ -96,6 +96,26 @@ class Test_Modem:
         # test error payload
         link.publish(topic, b'asdf', qos, False)
 
+    #-----------------------------------------------------------------------
+    def test_refresh(self, setup):
+        mdev, link = setup.getAll(['mdev', 'link'])
+        modem = mdev.device
+
+        modem.signal_refresh_progress.emit(modem, 1, 3, 2)
+        assert len(link.client.pub) == 1
+        assert link.client.pub[0] == dict(
+            topic='insteon/modem/refresh',
+            payload='{ "done" : 1, "total" : 3, "deferred" : 2 }', qos=0,
+            retain=False)
+        link.client.clear()
+
+        config = {'modem' : {'refresh_topic' : 'foo/refresh',
+                             'refresh_payload' : '{{done}}/{{total}}'}}
+        mdev.load_config(config, qos=1)
+        modem.signal_refresh_progress.emit(modem, 3, 3, 0)
+        assert link.client.pub[0] == dict(
+            topic='foo/refresh', payload='3/3', qos=1, retain=False)
+
     #-----------------------------------------------------------------------
     def test_discovery(self, setup):
         mdev, link = setup.getAll(['mdev', 'link'])
@@ -4,7 +4,9 @@
 #
 # pylint: disable=redefined-outer-name
 #===========================================================================
+import functools
 import logging
+import time
 from unittest import mock
 import pytest
 import insteon_mqtt as IM
@@ -89,6 +91,359 @@ class Test_Mqtt:
             mqtt._publish_device_discovery(device)
             mocked.assert_called_once()
 
+    #-----------------------------------------------------------------------
+    def test_suppress_retained(self, setup, config):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['suppress_retained'] = True
+        config['suppress_retained_exclude'] = ['manual_state_topic']
+        mqtt.load_config(config)
+        link.client.clear()
+
+        mqtt.publish("a/state", "ON", retain=True)
+        mqtt.publish("a/state", "ON", retain=True)
+        assert len(link.client.pub) == 1
+        assert mqtt.suppressed == 1
+
+        # Changed payload, non-retained, and excluded messages always go.
+        mqtt.publish("a/state", "OFF", retain=True)
+        mqtt.publish("a/state", "OFF", retain=False)
+        mqtt.publish("a/state", "OFF", retain=False)
+        mqtt.publish("a/state", "OFF", retain=True)
+        mqtt.publish("a/manual", "UP", retain=True,
+                     topic_key='manual_state_topic')
+        mqtt.publish("a/manual", "UP", retain=True,
+                     topic_key='manual_state_topic')
+        assert len(link.client.pub) == 7
+        assert mqtt.suppressed == 1
+
+        # Reconnecting clears the history.
+        mqtt._startup()
+        mqtt.publish("a/state", "OFF", retain=True)
+        assert len(link.client.pub) == 8
+
+        # Disabled.
+        config['suppress_retained'] = False
+        mqtt.load_config(config)
+        mqtt.publish("a/state", "OFF", retain=True)
+        mqtt.publish("a/state", "OFF", retain=True)
+        assert len(link.client.pub) == 10
+
+    #-----------------------------------------------------------------------
+    def test_offline_buffer(self, setup, config):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['offline_buffer'] = 1000
+        mqtt.load_config(config)
+        link.client.clear()
+
+        # Disconnected - buffered.
+        mqtt.publish("a/state", "ON", retain=True)
+        mqtt.publish("a/state", "OFF", retain=True)
+        mqtt.publish("a/event", "UP", retain=False)
+        assert len(link.client.pub) == 0
+        assert len(mqtt.offline_buffer) == 2
+
+        # Connecting sends the latest state and the events.
+        link.connected = True
+        mqtt.handle_connected(link, True)
+        pub = [(i.topic, i.payload) for i in link.client.pub]
+        assert pub == [("a/state", "OFF"), ("a/event", "UP")]
+        assert len(mqtt.offline_buffer) == 0
+
+        mqtt.publish("a/state", "ON", retain=True)
+        assert link.client.pub[-1].payload == "ON"
+
+    #-----------------------------------------------------------------------
+    def test_offline_buffer_paced(self, setup, config):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['offline_buffer'] = 1000
+        config['offline_flush_rate'] = 1
+        mqtt.load_config(config)
+        link.client.clear()
+
+        calls = []
+        mqtt.modem.timed_call = H.Data(add=lambda t, func: calls.append(func))
+
+        mqtt.publish("a/state", "ON", retain=True)
+        mqtt.publish("b/state", "ON", retain=True)
+        mqtt.publish("a/event", "UP", retain=False)
+
+        # Only the first message fits in the rate, the rest stay buffered.
+        link.connected = True
+        mqtt.handle_connected(link, True)
+        pub = [(i.topic, i.payload) for i in link.client.pub]
+        assert pub == [("a/state", "ON")]
+        assert len(calls) == 1
+
+        # New messages are buffered while flushing so a newer state
+        # replaces the buffered one and events stay in order.
+        mqtt.publish("b/state", "OFF", retain=True)
+        mqtt.publish("a/event", "DOWN", retain=False)
+        assert len(link.client.pub) == 1
+
+        now = time.time()
+        while calls:
+            now += 1
+            with mock.patch('time.time', return_value=now):
+                calls.pop(0)()
+        pub = [(i.topic, i.payload) for i in link.client.pub]
+        assert pub == [("a/state", "ON"), ("b/state", "OFF"),
+                       ("a/event", "UP"), ("a/event", "DOWN")]
+        assert len(mqtt.offline_buffer) == 0
+
+        mqtt.publish("a/state", "OFF", retain=True)
+        assert link.client.pub[-1].payload == "OFF"
+
+    #-----------------------------------------------------------------------
+    def test_handle_bulk_cmd(self, setup, config):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['bulk_cmd_topic'] = "insteon/bulk"
+        mqtt.load_config(config)
+
+        calls = []
+
+        def on(on_done, level=255):
+            calls.append(("a", "on", level))
+            on_done(True, "Done", None)
+
+        def off(on_done):
+            calls.append(("b", "off"))
+            on_done(False, "Failed", None)
+
+        dev_a = H.Data(label="a", cmd_map={"on": on})
+        dev_b = H.Data(label="b", cmd_map={"off": off})
+        mqtt.modem.find = {"a": dev_a, "b": dev_b}.get
+
+        payload = ('{"session" : "s1", "commands" : ['
+                   '{"device" : "a", "cmd" : "on", "level" : 10},'
+                   '{"device" : "b", "cmd" : "off", "priority" : 1},'
+                   '{"device" : "a", "cmd" : "on", "level" : 20},'
+                   '{"device" : "c", "cmd" : "on"},'
+                   '{"device" : "a", "cmd" : "bad"}]}')
+        link.client.clear()
+        mqtt.handle_bulk_cmd(None, None,
+                             MockMqttMessage("insteon/bulk", payload))
+
+        # Duplicate merged, higher priority first.
+        assert calls == [("b", "off"), ("a", "on", 20)]
+
+        # One aggregated reply and the end marker.
+        assert len(link.client.pub) == 2
+        assert link.client.pub[0].topic == "insteon/bulk/session/s1"
+        reply = IM.mqtt.Reply.from_json(link.client.pub[0].payload)
+        assert reply.type == IM.mqtt.Reply.Type.ERROR
+        assert reply.data.startswith("1 of 4 commands succeeded")
+        reply = IM.mqtt.Reply.from_json(link.client.pub[1].payload)
+        assert reply.type == IM.mqtt.Reply.Type.END
+
+        # Invalid entries are reported in the reply.
+        payload = ('{"session" : "s1", "commands" : ['
+                   '"a", ["b"],'
+                   '{"device" : "a", "cmd" : "on", "priority" : "high"},'
+                   '{"device" : ["a"], "cmd" : "on"},'
+                   '{"device" : "a", "cmd" : {"on" : 1}},'
+                   '{"device" : "b", "cmd" : "off"}]}')
+        calls.clear()
+        link.client.clear()
+        mqtt.handle_bulk_cmd(None, None,
+                             MockMqttMessage("insteon/bulk", payload))
+        assert calls == [("b", "off")]
+        reply = IM.mqtt.Reply.from_json(link.client.pub[0].payload)
+        assert reply.data.startswith("0 of 6 commands succeeded")
+
+        # Payloads that aren't a dict are ignored.
+        link.client.clear()
+        for payload in ('["a"]', '{"session" : "s1", "commands" : 5}'):
+            mqtt.handle_bulk_cmd(None, None,
+                                 MockMqttMessage("insteon/bulk", payload))
+        assert len(link.client.pub) == 2
+        reply = IM.mqtt.Reply.from_json(link.client.pub[0].payload)
+        assert reply.type == IM.mqtt.Reply.Type.ERROR
+
+    #-----------------------------------------------------------------------
+    def test_concurrent_sessions(self, setup, config, caplog):
+        caplog.set_level(logging.DEBUG, logger="insteon_mqtt")
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        mqtt.load_config(config)
+
+        pending = []
+
+        def on(on_done):
+            pending.append(on_done)
+
+        device = H.Data(label="a", type=lambda: "Dimmer", cmd_map={"on": on})
+        mqtt.modem.find = lambda x: device
+
+        for session in ("s1", "s2"):
+            mqtt.handle_cmd(None, None, MockMqttMessage(
+                "insteon/command/a", '{"cmd" : "on", "session" : "%s"}' %
+                session))
+        assert IM.log.get_ui_callback() is None
+
+        # Finish in the reverse order - each reply goes to its own session.
+        link.client.clear()
+        pending[1](True, "Done 2", None)
+        pending[0](True, "Done 1", None)
+        pub = [(i.topic.split("/")[-1],
+                IM.mqtt.Reply.from_json(i.payload).data)
+               for i in link.client.pub]
+        assert pub == [("s2", "Done 2"), ("s2", None), ("s1", "Done 1"),
+                       ("s1", None)]
+
+    #-----------------------------------------------------------------------
+    def test_bulk_scenes(self, setup, config, tmpdir):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['bulk_cmd_topic'] = "insteon/bulk"
+        config['bulk_scenes'] = True
+        mqtt.load_config(config)
+
+        modem = H.main.MockModem(tmpdir)
+        modem.db = IM.db.Modem(None, modem)
+        protocol = H.main.MockProtocol()
+        flags = IM.message.DbFlags(in_use=True, is_controller=False,
+                                   is_last_rec=False)
+        for i in range(2):
+            device = IM.device.Dimmer(protocol, modem,
+                                      IM.Address(0x10, 0x00, i), "d%d" % i)
+            modem.add(device)
+            modem.db.add_entry(IM.db.ModemEntry(device.addr, 20, True),
+                               save=False)
+            device.db.add_entry(IM.db.DeviceEntry(modem.addr, 20, 0x0fff,
+                                                  flags, bytes([128, 0, 1])),
+                                save=False)
+
+        # Devices that aren't in the scene.
+        calls = []
+        for i in range(2, 4):
+            device = IM.device.Dimmer(protocol, modem,
+                                      IM.Address(0x10, 0x00, i), "d%d" % i)
+            device.cmd_map = {"on" : functools.partial(self.on, calls,
+                                                       device.name)}
+            modem.add(device)
+
+        def scene(is_on, group, on_done):
+            calls.append(("scene", is_on, group))
+            on_done(True, "Scene command complete", None)
+
+        modem.scene = scene
+        mqtt.modem = modem
+
+        # The scene runs at the highest priority of its commands.
+        payload = ('{"session" : "s1", "commands" : ['
+                   '{"device" : "d2", "cmd" : "on", "priority" : -1},'
+                   '{"device" : "d0", "cmd" : "on", "level" : 128},'
+                   '{"device" : "d3", "cmd" : "on", "priority" : 1},'
+                   '{"device" : "d1", "cmd" : "on", "level" : 128,'
+                   ' "priority" : 1}]}')
+        link.client.clear()
+        mqtt.handle_bulk_cmd(None, None,
+                             MockMqttMessage("insteon/bulk", payload))
+
+        assert calls == [("on", "d3"), ("scene", True, 20), ("on", "d2")]
+        assert len(protocol.sent) == 0
+        reply = IM.mqtt.Reply.from_json(link.client.pub[0].payload)
+        assert reply.data.startswith("4 of 4 commands succeeded")
+
+        # Levels that aren't integers aren't converted for a scene.  The
+        # commands are sent directly.
+        payload = ('{"session" : "s1", "commands" : ['
+                   '{"device" : "d0", "cmd" : "on", "level" : "full"},'
+                   '{"device" : "d1", "cmd" : "on", "level" : 128}]}')
+        calls.clear()
+        link.client.clear()
+        mqtt.handle_bulk_cmd(None, None,
+                             MockMqttMessage("insteon/bulk", payload))
+        assert calls == []
+        assert len(protocol.sent) == 2
+
+    #-----------------------------------------------------------------------
+    @staticmethod
+    def on(calls, name, on_done):
+        calls.append(("on", name))
+        on_done(True, "Done", None)
+
+    #-----------------------------------------------------------------------
+    def test_reload_config(self, setup, config, tmpdir, caplog):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['switch'] = {'on_off_topic' : 'insteon/{{address}}/set'}
+        config['dimmer'] = {'level_topic' : 'insteon/{{address}}/level'}
+        mqtt.load_config(config)
+        link.connected = True
+
+        modem = H.main.MockModem(tmpdir)
+        protocol = H.main.MockProtocol()
+        switch = IM.device.Switch(protocol, modem, IM.Address(1, 2, 3), "sw")
+        dimmer = IM.device.Dimmer(protocol, modem, IM.Address(4, 5, 6), "dim")
+        mqtt.handle_new_device(modem, switch)
+        mqtt.handle_new_device(modem, dimmer)
+        link.client.sub = []
+
+        # Only the changed topics are subscribed again.
+        config = dict(config)
+        config['cmd_topic'] = "insteon/cmd2"
+        config['switch'] = {'on_off_topic' : 'insteon/{{name}}/set'}
+        config['broker'] = "other"
+        config['availability_topic'] = "insteon/avail2"
+        mqtt.reload_config(config)
+        assert [i.topic for i in link.client.unsub] == [
+            "insteon/command/+", "insteon/01.02.03/set"]
+        assert [i.topic for i in link.client.sub] == [
+            "insteon/cmd2/+", "insteon/sw/set", "insteon/01.02.03/scene"]
+        assert "mqtt.broker changed" in caplog.text
+
+        # The link still uses the old availability topic so it isn't changed.
+        assert "mqtt.availability_topic changed" in caplog.text
+        assert mqtt.availability_topic == "insteon/availability"
+
+        # Removed devices are unsubscribed.
+        link.client.unsub = []
+        mqtt.handle_remove_device(modem, dimmer)
+        assert "insteon/04.05.06/level" in [i.topic for i in
+                                            link.client.unsub]
+        assert list(mqtt.devices.keys()) == [switch.addr.id]
+
+    #-----------------------------------------------------------------------
+    def test_reload_rename(self, setup, config, tmpdir):
+        mqtt = setup.get('mqtt')
+        link = setup.get('link')
+        config['switch'] = {'state_topic' : 'insteon/{{name}}/state',
+                            'on_off_topic' : 'insteon/{{name}}/set'}
+        mqtt.load_config(config)
+        link.connected = True
+
+        modem = H.main.MockModem(tmpdir)
+        protocol = H.main.MockProtocol()
+        switch = IM.device.Switch(protocol, modem, IM.Address(1, 2, 3), "sw")
+        mqtt.handle_new_device(modem, switch)
+        assert "insteon/sw/set" in link.client.cb
+
+        # Rename the device the same way Modem.reload_config() does.
+        mqtt.handle_remove_device(modem, switch)
+        switch.name = switch.name_user_case = "sw2"
+        mqtt.handle_new_device(modem, switch)
+        assert "insteon/sw/set" not in link.client.cb
+        assert "insteon/sw2/set" in link.client.cb
+
+        # The old MQTT device doesn't publish anymore.
+        link.client.clear()
+        switch._set_state(is_on=True)
+        assert [i.topic for i in link.client.pub] == ["insteon/sw2/state"]
+
+        # Removing while disconnected still removes the callbacks.
+        link.connected = False
+        mqtt.handle_remove_device(modem, switch)
+        assert "insteon/sw2/set" not in link.client.cb
+        link.client.clear()
+        switch._set_state(is_on=False)
+        assert link.client.pub == []
+
+
 class MockMqttMessage():
     """MockMqttMessage, generates a mocked paho mqtt message"""
     def __init__(self, topic, payload):
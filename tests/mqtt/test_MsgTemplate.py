@@ -135,4 +135,48 @@ class Test_MsgTemplate:
         jdata = msg.to_json(b'{"state": "ON","brightness":255}')
         assert jdata == {'cmd': 'on', 'level': 255}
 
+    #-----------------------------------------------------------------------
+    def test_topic_filter(self):
+        msg = MsgTemplate(topic='insteon/{{address}}/set/', payload='')
+        assert msg.topic_filter() == "insteon/+/set"
+
+        msg = MsgTemplate(topic='{{name}}/kp_{{button}}/set', payload='')
+        assert msg.topic_filter() == "+/+/set"
+
+        msg = MsgTemplate(topic='insteon/{{ "a/b" }}/set', payload='')
+        assert msg.topic_filter() is None
+
+        msg = MsgTemplate(topic='{% if 1 %}a{% endif %}', payload='')
+        assert msg.topic_filter() is None
+
+        assert MsgTemplate(None, None).topic_filter() is None
+
+    #-----------------------------------------------------------------------
+    def test_topic_cache(self):
+        msg = MsgTemplate(topic='insteon/{{address}}/state/{{button}}',
+                          payload='{{on_str}}')
+        data = {"address" : "aa.bb.cc", "button" : 1, "timestamp" : 1}
+        assert msg.render_topic(data) == "insteon/aa.bb.cc/state/1"
+        assert len(msg._topic_cache) == 1
+
+        data["timestamp"] = 2
+        assert msg.render_topic(data) == "insteon/aa.bb.cc/state/1"
+        assert len(msg._topic_cache) == 1
+
+        data["button"] = 2
+        assert msg.render_topic(data) == "insteon/aa.bb.cc/state/2"
+        assert len(msg._topic_cache) == 2
+
+        # Loading the config clears the cache.
+        msg.load_config({"topic" : "new/{{name}}"}, "topic", "payload")
+        assert msg._topic_cache == {}
+        data["name"] = "foo"
+        assert msg.render_topic(data) == "new/foo"
+
+        # Topics that use other variables aren't cached.
+        msg = MsgTemplate(topic='insteon/{{address}}/{{timestamp}}',
+                          payload='{{on_str}}')
+        assert msg.render_topic(data) == "insteon/aa.bb.cc/2"
+        assert msg._topic_cache == {}
+
 #===========================================================================
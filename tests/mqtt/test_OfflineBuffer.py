@@ -0,0 +1,50 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/mqtt/OfflineBuffer.py
+#
+#===========================================================================
+from insteon_mqtt.mqtt.OfflineBuffer import OfflineBuffer
+
+
+class Test_OfflineBuffer:
+    #-----------------------------------------------------------------------
+    def test_compact(self):
+        buf = OfflineBuffer(1000)
+        buf.add("a/state", "ON", 1, True)
+        buf.add("a/event", "UP", 1, False)
+        buf.add("b/state", "ON", 1, True)
+        buf.add("a/state", "OFF", 1, True)
+        buf.add("a/event", "DOWN", 1, False)
+        assert len(buf) == 4
+        assert buf.num_bytes == 39
+
+        # States in update order then the events in order.
+        msgs = buf.pop_all()
+        assert msgs == [("b/state", "ON", 1, True),
+                        ("a/state", "OFF", 1, True),
+                        ("a/event", "UP", 1, False),
+                        ("a/event", "DOWN", 1, False)]
+        assert len(buf) == 0
+        assert buf.num_bytes == 0
+
+    #-----------------------------------------------------------------------
+    def test_limit(self):
+        # Each message is 10 bytes.
+        buf = OfflineBuffer(30)
+        buf.add("a/state", "OFF", 1, True)
+        buf.add("b/state", "OFF", 1, True)
+        buf.add("a/event", "UPP", 1, False)
+
+        # Events are dropped before states.
+        buf.add("c/state", "OFF", 1, True)
+        assert buf.dropped == 1
+        assert [i[0] for i in buf.pop_all()] == ["a/state", "b/state",
+                                                 "c/state"]
+
+        buf.add("a/state", "OFF", 1, True)
+        buf.add("b/state", "OFF", 1, True)
+        buf.add("c/state", "OFF", 1, True)
+        buf.add("d/state", "OFF", 1, True)
+        assert buf.dropped == 2
+        assert [i[0] for i in buf.pop_all()] == ["b/state", "c/state",
+                                                 "d/state"]
@@ -0,0 +1,67 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/mqtt/PacedPublisher.py
+#
+#===========================================================================
+from unittest import mock
+import helpers as H
+from insteon_mqtt.mqtt.PacedPublisher import PacedPublisher
+
+
+class Test_PacedPublisher:
+    #-----------------------------------------------------------------------
+    def test_no_limit(self):
+        mqtt = MockMqtt()
+        pacer = PacedPublisher(mqtt)
+        for i in range(5):
+            pacer.publish("topic/%d" % i, "payload", 1, False)
+
+        assert len(mqtt.pub) == 5
+        assert mqtt.pub[0] == ("topic/0", "payload", 1, False)
+        assert len(mqtt.modem.timed_call.calls) == 0
+
+    #-----------------------------------------------------------------------
+    def test_paced(self):
+        mqtt = MockMqtt()
+        with mock.patch('time.time', return_value=100.0):
+            pacer = PacedPublisher(mqtt, rate=2, burst=3)
+            for i in range(5):
+                pacer.publish("topic/%d" % i, "payload")
+
+        # The burst goes out and the rest waits for the next token.
+        assert len(mqtt.pub) == 3
+        assert len(pacer) == 2
+        calls = mqtt.modem.timed_call.calls
+        assert len(calls) == 1
+        assert calls[0].time == 100.5
+
+        # Half a second later there is one more token.
+        with mock.patch('time.time', return_value=100.5):
+            calls.pop(0).func()
+        assert len(mqtt.pub) == 4
+        assert len(calls) == 1
+
+        with mock.patch('time.time', return_value=101.0):
+            calls.pop(0).func()
+        assert len(mqtt.pub) == 5
+        assert mqtt.pub[4][0] == "topic/4"
+        assert len(pacer) == 0
+        assert len(calls) == 0
+
+
+#===========================================================================
+class MockMqtt:
+    def __init__(self):
+        self.pub = []
+        self.modem = H.Data(timed_call=MockTimedCall())
+
+    def publish(self, topic, payload, qos=None, retain=None):
+        self.pub.append((topic, payload, qos, retain))
+
+
+class MockTimedCall:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, time, func, *args, **kwargs):
+        self.calls.append(H.Data(time=time, func=func))
@@ -221,7 +221,7 @@ class MockMqtt:
         self.mode_command = None
         self.device_info_template = {}
 
-    def publish(self, topic, payload, qos=None, retain=None):
+    def publish(self, topic, payload, qos=None, retain=None, topic_key=None):
         self.last_topic = topic
         self.last_payload = payload
 
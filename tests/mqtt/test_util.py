@@ -120,3 +120,43 @@ class Test_util:
         data = {"cmd" : "foo"}
         with pytest.raises(Exception):
             util.parse_on_off(data, have_mode=False)
+
+    #-----------------------------------------------------------------------
+    def test_template(self):
+        t1 = util.template("{{name}}/state")
+        t2 = util.template("{{name}}/state")
+        assert t1 is t2
+        assert t1.render(name="foo") == "foo/state"
+
+        # Templates are shared by every MsgTemplate with the same string.
+        msg1 = IM.mqtt.MsgTemplate("{{name}}/state", "{{on_str}}")
+        msg2 = IM.mqtt.MsgTemplate("{{name}}/state", "{{on_str}}")
+        assert msg1.topic is msg2.topic
+        assert msg1.payload is msg2.payload
+        assert msg1.topic is t1
+
+    #-----------------------------------------------------------------------
+    def test_fast_template(self):
+        data = {"address" : "aa.bb.cc", "on_str" : "on", "level" : 255,
+                "json" : {"state" : "OFF"}}
+        render = util.fast_template("insteon/{{address}}/state")
+        assert render(data) == "insteon/aa.bb.cc/state"
+
+        render = util.fast_template("{ \"s\" : \"{{ on_str.upper() }}\", "
+                                    "\"l\" : {{level}} }\n")
+        assert render(data) == "{ \"s\" : \"ON\", \"l\" : 255 }"
+
+        render = util.fast_template("{{json.state | lower}}")
+        assert render(data) == "off"
+
+        # Data the fast path can't handle falls back to jinja.
+        assert render({"json" : None}) is None
+        render = util.fast_template("{{level.upper()}}")
+        assert render(data) is None
+        render = util.fast_template("{{missing}}")
+        assert render(data) is None
+
+        # Templates with logic aren't compiled.
+        assert util.fast_template("{% if level %}ON{% endif %}") is None
+        assert util.fast_template("{{level + 1}}") is None
+        assert util.fast_template("{{level|float}}") is None
@@ -491,7 +491,10 @@ class Test_DiscoveryTopic:
     #-----------------------------------------------------------------------
     @mock.patch('time.time', mock.MagicMock(return_value=12345))
     def test_publish(self, discovery_switch):
-        discovery_switch.disc_templates.append(mock.Mock())
+        template = mock.Mock(qos=1)
+        template.render_topic.return_value = "topic"
+        template.render_payload.return_value = "payload"
+        discovery_switch.disc_templates.append(template)
         discovery_switch.publish_discovery()
         data = {
             'address': '11.22.33',
@@ -511,8 +514,45 @@ class Test_DiscoveryTopic:
             'device_info_template': '{}',
             'timestamp': 12345,
         }
-        discovery_switch.disc_templates[0].publish.assert_called_once_with(
-            discovery_switch.mqtt,
-            data,
-            retain=False
-        )
+        template.render_payload.assert_called_once_with(data)
+        pub = discovery_switch.mqtt.link.client.pub
+        assert len(pub) == 1
+        assert (pub[0].topic, pub[0].payload) == ("topic", "payload")
+        assert pub[0].qos == 1
+        assert pub[0].retain is False
+
+    #-----------------------------------------------------------------------
+    def test_publish_cache(self, discovery_switch):
+        discovery_switch.mqtt.discovery_enabled = True
+        discovery_switch.device.config_extra['discovery_class'] = 'fake_dev'
+        config = {'fake_dev': {'discovery_entities': {
+            'fake': {
+                "component": "switch",
+                "config": '{"uniq_id": "{{address}}", "fw": {{firmware}}}',
+            },
+        }}}
+        discovery_switch.load_discovery_data(config)
+        pub = discovery_switch.mqtt.link.client.pub
+
+        discovery_switch.publish_discovery()
+        assert pub[0].payload == '{"uniq_id": "11.22.33", "fw": 0}'
+
+        # Same device values - not rendered again.
+        with mock.patch.object(discovery_switch,
+                               'discovery_template_data') as mocked:
+            discovery_switch.publish_discovery()
+            assert mocked.call_count == 0
+        assert pub[1].payload == pub[0].payload
+
+        # Firmware changed.
+        discovery_switch.device.db.firmware = 0x45
+        discovery_switch.publish_discovery()
+        assert pub[2].payload == '{"uniq_id": "11.22.33", "fw": 69}'
+
+        # Templates using the timestamp are never cached.
+        config['fake_dev']['discovery_entities']['fake']['config'] = \
+            '{"uniq_id": "{{address}}", "t": {{timestamp}}}'
+        discovery_switch.disc_templates = []
+        discovery_switch.load_discovery_data(config)
+        discovery_switch.publish_discovery()
+        assert discovery_switch._disc_cache is None
@@ -0,0 +1,106 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/network/Mqtt.py
+#
+#===========================================================================
+import insteon_mqtt as IM
+import helpers as H
+
+
+class Test_Mqtt:
+    #-----------------------------------------------------------------------
+    def test_wildcard_subscribe(self, mock_paho_mqtt):
+        link = IM.network.Mqtt()
+        link.wildcard_subscribe = True
+        calls = []
+
+        def callback(name):
+            return lambda client, data, msg: calls.append((name, msg.topic))
+
+        link.subscribe("insteon/aa.bb.cc/set", 1, callback("cc"),
+                       topic_filter="insteon/+/set")
+        link.subscribe("insteon/aa.bb.dd/set", 1, callback("dd"),
+                       topic_filter="insteon/+/set")
+        assert [i.topic for i in link.client.sub] == ["insteon/+/set"]
+
+        # Filter that doesn't match the topic - normal subscription.
+        link.subscribe("insteon/a/b/set", 1, callback("ab"),
+                       topic_filter="insteon/+/set")
+        assert link.client.sub[-1].topic == "insteon/a/b/set"
+
+        link._on_message(None, None, H.Data(topic="insteon/aa.bb.dd/set",
+                                            payload=b"on"))
+        link._on_message(None, None, H.Data(topic="insteon/aa.bb.ee/set",
+                                            payload=b"on"))
+        assert calls == [("dd", "insteon/aa.bb.dd/set")]
+
+        # The filter is only unsubscribed when no topics use it.
+        link.unsubscribe("insteon/aa.bb.cc/set")
+        assert link.client.unsub == []
+        link.unsubscribe("insteon/aa.bb.dd/set")
+        assert [i.topic for i in link.client.unsub] == ["insteon/+/set"]
+
+        # Reconnecting sends the filters again.
+        link.subscribe("insteon/aa.bb.cc/set", 1, callback("cc"),
+                       topic_filter="insteon/+/set")
+        link.client.sub = []
+        link._on_connect(None, None, None, 0)
+        link.subscribe("insteon/aa.bb.cc/set", 1, callback("cc"),
+                       topic_filter="insteon/+/set")
+        assert [i.topic for i in link.client.sub] == ["insteon/+/set"]
+        assert len(link._routes) == 1
+
+    #-----------------------------------------------------------------------
+    def test_wildcard_disabled(self, mock_paho_mqtt):
+        link = IM.network.Mqtt()
+        link.subscribe("insteon/aa.bb.cc/set", 1, lambda *args: None,
+                       topic_filter="insteon/+/set")
+        assert [i.topic for i in link.client.sub] == ["insteon/aa.bb.cc/set"]
+        assert "insteon/aa.bb.cc/set" in link.client.cb
+
+    #-----------------------------------------------------------------------
+    def test_io_thread(self, mock_paho_mqtt):
+        link = IM.network.Mqtt()
+        link.io_thread = True
+        writes = []
+        closed = []
+
+        def on_write(*args):
+            writes.append(args)
+
+        def on_close(*args):
+            closed.append(args)
+
+        link.signal_needs_write.connect(on_write)
+        link.signal_closing.connect(on_close)
+
+        assert link.connect() is True
+        assert link.client.thread is True
+        assert link.fileno() == link._wake[0].fileno()
+
+        # Callbacks from the paho thread are queued until the event loop
+        # reads the wake up socket.
+        calls = []
+        link.subscribe("insteon/aa.bb.cc/set", 1,
+                       lambda client, data, msg: calls.append(msg.topic))
+        msg = H.Data(topic="insteon/aa.bb.cc/set", payload=b"on")
+        link.client.cb["insteon/aa.bb.cc/set"](None, None, msg)
+        link.client.on_connect(None, None, None, 0)
+        assert calls == []
+        assert link.connected is False
+
+        assert link.read_from_link() == 1
+        assert calls == ["insteon/aa.bb.cc/set"]
+        assert link.connected is True
+        assert len(link._calls) == 0
+
+        # The paho thread does the writing.
+        link.publish("insteon/aa.bb.cc/state", "on")
+        assert writes == []
+
+        link.close()
+        assert link.client.thread is False
+        assert link.connected is False
+        assert len(closed) == 1
+        link._wake[0].close()
+        link._wake[1].close()
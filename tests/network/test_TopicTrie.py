@@ -0,0 +1,52 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/network/TopicTrie.py
+#
+#===========================================================================
+from insteon_mqtt.network.TopicTrie import TopicTrie
+
+
+class Test_TopicTrie:
+    #-----------------------------------------------------------------------
+    def test_exact(self):
+        trie = TopicTrie()
+        trie.add("insteon/aa.bb.cc/set", 1)
+        trie.add("insteon/aa.bb.cc/level", 2)
+        trie.add("insteon/aa.bb.dd/set", 3)
+        assert len(trie) == 3
+
+        assert trie.find("insteon/aa.bb.cc/set") == [1]
+        assert trie.find("insteon/aa.bb.dd/set") == [3]
+        assert trie.find("insteon/aa.bb.ee/set") == []
+        assert trie.find("insteon/aa.bb.cc") == []
+        assert trie.get("insteon/aa.bb.cc/level") == 2
+
+        # Replacing a value.
+        trie.add("insteon/aa.bb.cc/set", 4)
+        assert len(trie) == 3
+        assert trie.find("insteon/aa.bb.cc/set") == [4]
+
+        assert trie.remove("insteon/aa.bb.cc/set") == 4
+        assert trie.remove("insteon/aa.bb.cc/set") is None
+        assert trie.remove("insteon/aa") is None
+        assert trie.find("insteon/aa.bb.cc/set") == []
+        assert trie.find("insteon/aa.bb.cc/level") == [2]
+        assert len(trie) == 2
+
+        trie.remove("insteon/aa.bb.cc/level")
+        trie.remove("insteon/aa.bb.dd/set")
+        assert len(trie) == 0
+        assert trie._root == [{}, None]
+
+    #-----------------------------------------------------------------------
+    def test_wildcards(self):
+        trie = TopicTrie()
+        trie.add("insteon/+/set", 1)
+        trie.add("insteon/#", 2)
+        trie.add("insteon/aa.bb.cc/set", 3)
+
+        assert sorted(trie.find("insteon/aa.bb.cc/set")) == [1, 2, 3]
+        assert sorted(trie.find("insteon/aa.bb.dd/set")) == [1, 2]
+        assert trie.find("insteon/aa.bb.dd/level") == [2]
+        assert trie.find("insteon") == [2]
+        assert trie.find("other/aa.bb.cc/set") == []
@@ -126,6 +126,55 @@ class Test_Base_Config():
             assert record.levelname != "ERROR"
         assert test_device.addr == IM.Address('44.85.12')
 
+    def test_reload_config(self, test_device, tmpdir, caplog):
+        cfg = {'storage' : str(tmpdir), 'port' : '/dev/insteon',
+               'devices' : {'switch' : [{'aa.bb.01' : 'lamp'}, 'aa.bb.02'],
+                            'dimmer' : ['aa.bb.03']}}
+        msg = Msg.OutModemInfo(addr=IM.Address('44.85.12'), dev_cat=None,
+                               sub_cat=None, firmware=None, is_ack=True)
+        test_device.load_config_step2(True, 'message', msg, cfg)
+        lamp = test_device.find('lamp')
+        assert len(test_device.devices) == 3
+
+        added = []
+        removed = []
+
+        def on_new(modem, device):
+            added.append(device)
+
+        def on_remove(modem, device):
+            removed.append(device)
+
+        test_device.signal_new_device.connect(on_new)
+        test_device.signal_remove_device.connect(on_remove)
+
+        # Rename lamp, change the type of 02, remove 03, and add 04.
+        cfg2 = {'storage' : str(tmpdir), 'port' : '/dev/other',
+                'devices' : {'switch' : [{'aa.bb.01' : 'Kitchen'}],
+                             'dimmer' : ['aa.bb.02'],
+                             'outlet' : ['aa.bb.04']}}
+        result = test_device.reload_config(cfg2)
+        assert result == {'added' : ['aa.bb.02', 'aa.bb.04'],
+                          'removed' : ['aa.bb.02', 'aa.bb.03'],
+                          'renamed' : ['aa.bb.01 (kitchen)']}
+        assert 'insteon.port changed' in caplog.text
+
+        # The renamed device is the same object.
+        assert test_device.find('kitchen') is lamp
+        assert 'lamp' not in test_device.device_names
+        assert lamp.name_user_case == 'Kitchen'
+        assert isinstance(test_device.find('aa.bb.02'), IM.device.Dimmer)
+        assert test_device.find('aa.bb.03') is None
+        assert isinstance(test_device.find('aa.bb.04'), IM.device.Outlet)
+        assert [i.addr.hex for i in removed] == ['aa.bb.02', 'aa.bb.03', 'aa.bb.01']
+        assert [i.addr.hex for i in added] == ['aa.bb.01', 'aa.bb.02', 'aa.bb.04']
+
+        # Nothing changes on an unchanged config.
+        del added[:], removed[:]
+        result = test_device.reload_config(cfg2)
+        assert result == {'added' : [], 'removed' : [], 'renamed' : []}
+        assert not added and not removed
+
     def test_db_update(self, test_device, test_entry_2,
                        test_device_2, caplog):
         test_device.add(test_device_2)
@@ -4,6 +4,7 @@
 #
 # pylint: disable=protected-access
 #===========================================================================
+import logging
 import time
 import pytest
 import insteon_mqtt as IM
@@ -70,6 +71,28 @@ class Test_Protocol:
         test_proto.set_wait_time(0)
         assert test_proto._next_write_time > 5
 
+    #-----------------------------------------------------------------------
+    def test_session_ui_callback(self, test_proto, caplog):
+        caplog.set_level(logging.DEBUG, logger="insteon_mqtt")
+        replies = []
+
+        def session(name):
+            return lambda record: replies.append((name, record.getMessage()))
+
+        # Queue messages from two sessions.  The replies are handled after
+        # the sessions have returned.
+        cb_a = session("a")
+        cb_b = session("b")
+        with IM.log.ui_callback(cb_a):
+            test_proto.send(Msg.OutModemInfo(), MockHandler("done a"))
+        with IM.log.ui_callback(cb_b):
+            test_proto.send(Msg.OutModemInfo(), MockHandler("done b"))
+        assert IM.log.get_ui_callback() is None
+
+        test_proto._process_msg(Msg.OutModemInfo())
+        test_proto._process_msg(Msg.OutModemInfo())
+        assert replies == [("a", "done a"), ("b", "done b")]
+
 #===========================================================================
 
 
@@ -84,3 +107,15 @@ class MockSerial:
 
     def load_config(self, config):
         self.config = config
+
+    def write(self, data, next_write_time=0):
+        pass
+
+
+class MockHandler:
+    def __init__(self, ui_msg):
+        self.ui_msg = ui_msg
+
+    def msg_received(self, protocol, msg):
+        IM.log.get_logger().ui(self.ui_msg)
+        return Msg.FINISHED
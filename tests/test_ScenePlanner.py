@@ -0,0 +1,90 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/ScenePlanner.py
+#
+# pylint: disable=redefined-outer-name
+#===========================================================================
+import pytest
+import insteon_mqtt as IM
+import insteon_mqtt.message as Msg
+import helpers as H
+
+
+@pytest.fixture
+def setup(tmpdir):
+    modem = H.main.MockModem(tmpdir)
+    modem.db = IM.db.Modem(None, modem)
+    protocol = H.main.MockProtocol()
+    dimmers = [IM.device.Dimmer(protocol, modem, IM.Address(0x10, 0x00, i))
+               for i in range(1, 4)]
+    switch = IM.device.Switch(protocol, modem, IM.Address('20.00.01'))
+    return H.Data(modem=modem, dimmers=dimmers, switch=switch)
+
+
+def link(modem, device, group, level=0xff):
+    modem.db.add_entry(IM.db.ModemEntry(device.addr, group, True,
+                                        bytes([0, 0, 0])), save=False)
+    flags = Msg.DbFlags(in_use=True, is_controller=False, is_last_rec=False)
+    device.db.add_entry(IM.db.DeviceEntry(modem.addr, group, 0x0fff, flags,
+                                          bytes([level, 0x1f, 0x01])),
+                        save=False)
+
+
+#===========================================================================
+class Test_ScenePlanner:
+    #-----------------------------------------------------------------------
+    def test_plan(self, setup):
+        modem, dimmers, switch = setup.modem, setup.dimmers, setup.switch
+        link(modem, dimmers[0], 20, 0x80)
+        link(modem, dimmers[1], 20, 0x80)
+        link(modem, switch, 20)
+
+        planner = IM.ScenePlanner(modem)
+        targets = [(dimmers[0], 1, True, 0x80), (dimmers[1], 1, True, 0x80),
+                   (switch, 1, True, None), (dimmers[2], 1, True, 0x80)]
+        scenes, leftovers = planner.plan(targets)
+        assert len(scenes) == 1
+        assert scenes[0][0] == 20
+        assert scenes[0][1] is True
+        assert scenes[0][2] == targets[:3]
+        assert leftovers == [targets[3]]
+
+        # Different level - can't use the scene.
+        targets[0] = (dimmers[0], 1, True, 0xff)
+        scenes, leftovers = planner.plan(targets)
+        assert scenes == []
+        assert leftovers == targets
+
+        # Off doesn't depend on the level.
+        targets = [(dimmers[0], 1, False, None), (dimmers[1], 1, False, None),
+                   (switch, 1, False, None)]
+        scenes, leftovers = planner.plan(targets)
+        assert [i[:2] for i in scenes] == [(20, False)]
+        assert leftovers == []
+
+    #-----------------------------------------------------------------------
+    def test_extra_responder(self, setup):
+        modem, dimmers = setup.modem, setup.dimmers
+        for dimmer in dimmers:
+            link(modem, dimmer, 30)
+
+        # The scene would also turn on dimmers[2].
+        planner = IM.ScenePlanner(modem)
+        targets = [(dimmers[0], 1, True, 0xff), (dimmers[1], 1, True, 0xff)]
+        scenes, leftovers = planner.plan(targets)
+        assert scenes == []
+        assert leftovers == targets
+
+    #-----------------------------------------------------------------------
+    def test_best_group(self, setup):
+        modem, dimmers = setup.modem, setup.dimmers
+        link(modem, dimmers[0], 40)
+        link(modem, dimmers[1], 40)
+        for dimmer in dimmers:
+            link(modem, dimmer, 41)
+
+        planner = IM.ScenePlanner(modem)
+        targets = [(i, 1, True, 0xff) for i in dimmers]
+        scenes, leftovers = planner.plan(targets)
+        assert [i[0] for i in scenes] == [41]
+        assert leftovers == []
@@ -133,6 +133,84 @@ class Test_Scenes:
         scenes.compress_responders()
         assert len(scenes.entries) == 1
 
+    def test_index(self):
+        modem = MockModem()
+        scenes = Scenes.SceneManager(modem, None)
+
+        scenes.data = [{'controllers': ['aa.bb.01'],
+                        'responders': ['cc.bb.22']},
+                       {'controllers': [{'aa.bb.01': 2}],
+                        'responders': ['cc.bb.22', 'cc.bb.33']}]
+        scenes._init_scene_entries()
+        scene1, scene2 = scenes.entries
+        ctrl = scene2.controllers[0]
+        resp = scene1.responders[0]
+        assert scenes.find_scenes(scene1.controllers[0]) == [scene1]
+        assert scenes.find_scenes(ctrl) == [scene2]
+        assert scenes.find_scenes(resp) == [scene1, scene2]
+
+        # Appending and deleting devices updates the index.
+        scene1.append_controller(ctrl)
+        assert scenes.find_scenes(ctrl) == [scene2, scene1]
+        scene2.del_controller(ctrl)
+        assert scenes.find_scenes(ctrl) == [scene1]
+
+        # Deleting a scene removes it.
+        scenes.del_scene(scene1)
+        assert scenes.find_scenes(ctrl) == []
+        assert scenes.find_scenes(resp) == [scene2]
+
+        # New scenes are added.
+        scene3 = Scenes.SceneEntry(scenes, {'controllers': ['aa.bb.04'],
+                                            'responders': ['cc.bb.22']})
+        scenes.append_scene(scene3)
+        assert scenes.find_scenes(resp) == [scene2, scene3]
+        assert scenes.find_scenes(scene3.controllers[0]) == [scene3]
+
+    def test_compress_controllers(self):
+        modem = MockModem()
+        scenes = Scenes.SceneManager(modem, None)
+
+        # All scenes with the same responders merge into the last one.
+        scenes.data = [{'controllers': ['aa.bb.01'],
+                        'responders': ['cc.bb.22', 'cc.bb.33']},
+                       {'controllers': ['aa.bb.02'],
+                        'responders': ['cc.bb.44'],
+                        'name': 'other'},
+                       {'controllers': ['aa.bb.03'],
+                        'responders': ['cc.bb.33', 'cc.bb.22'],
+                        'name': 'test'},
+                       {'controllers': ['aa.bb.04', 'aa.bb.01'],
+                        'responders': ['cc.bb.22', 'cc.bb.33']}]
+        scenes._init_scene_entries()
+        scenes.compress_controllers()
+        assert len(scenes.entries) == 2
+        assert scenes.data[0]['name'] == 'other'
+        assert scenes.data[1] == {
+            'controllers': ['dev - aa.bb.04', 'dev - aa.bb.01',
+                            'dev - aa.bb.03'],
+            'responders': ['dev - cc.bb.22', 'dev - cc.bb.33'],
+            'name': 'test'}
+
+    def test_compress_n_way(self):
+        modem = MockModem()
+        scenes = Scenes.SceneManager(modem, None)
+
+        # 3-way switches.
+        scenes.data = [{'controllers': ['aa.bb.01'],
+                        'responders': ['aa.bb.02', 'aa.bb.03']},
+                       {'controllers': ['aa.bb.02'],
+                        'responders': ['aa.bb.01', 'aa.bb.03']},
+                       {'controllers': ['aa.bb.04'],
+                        'responders': ['aa.bb.01']},
+                       {'controllers': ['aa.bb.03'],
+                        'responders': ['aa.bb.01', 'aa.bb.02']}]
+        scenes._init_scene_entries()
+        scenes.compress_n_way()
+        assert len(scenes.entries) == 2
+        assert len(scenes.entries[1].controllers) == 3
+        assert len(scenes.entries[1].responders) == 3
+
     def test_populate_scenes(self):
         modem = MockModem()
         device = modem.find(Address("aa.bb.cc"))
@@ -173,3 +173,21 @@ def test_disconnect():
 
 
 #===========================================================================
+
+
+def test_disconnect_object():
+    clear()
+    sig = IM.Signal()
+    obj1 = Slot()
+    obj2 = Slot()
+    sig.connect(obj1.method_slot)
+    sig.connect(obj2.method_slot)
+    sig.connect(func_slot)
+
+    sig.disconnect_object(obj1)
+    sig.emit(a=1)
+    assert len(Slot.method_data) == 1
+    assert len(func_data) == 1
+
+
+#===========================================================================
@@ -0,0 +1,115 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/StartupRefresh.py
+#
+#===========================================================================
+from unittest import mock
+import insteon_mqtt as IM
+import helpers as H
+
+
+class Test_StartupRefresh:
+    #-----------------------------------------------------------------------
+    def test_order(self, tmpdir):
+        modem = MockModem(tmpdir)
+        dev1 = MockDevice("dev1")
+        dev2 = MockDevice("dev2", delta=None)
+        dev3 = MockDevice("dev3", desc=None)
+        battery = IM.device.BatterySensor(H.main.MockProtocol(), modem,
+                                          IM.Address(0x01, 0x02, 0x03))
+        battery.refresh = mock.Mock()
+
+        refresh = IM.StartupRefresh(modem, window=30)
+        refresh.start([dev1, dev2, battery, dev3])
+
+        # Battery devices wait until they wake up.
+        battery.refresh.assert_called_once_with()
+        assert refresh.deferred == 1
+        assert refresh.total == 3
+        assert modem.progress == [(0, 3, 1)]
+
+        # Missing database first, then missing model info.
+        assert refresh.devices == [dev2, dev3, dev1]
+        assert len(modem.timed_call.calls) == 1
+
+    #-----------------------------------------------------------------------
+    def test_staged(self):
+        modem = MockModem()
+        dev1 = MockDevice("dev1")
+        dev2 = MockDevice("dev2")
+
+        refresh = IM.StartupRefresh(modem, window=30)
+        with mock.patch('time.time', mock.MagicMock(return_value=100)):
+            refresh.start([dev1, dev2])
+
+            # PLM is busy - try again later.
+            modem.protocol.queue_size = 1
+            t, func = modem.timed_call.calls.pop(0)
+            assert t == 100
+            func()
+            assert dev1.on_done is None
+            t, func = modem.timed_call.calls.pop(0)
+            assert t == 101
+
+            # Only one device refresh at a time.
+            modem.protocol.queue_size = 0
+            func()
+            assert dev1.on_done is not None
+            assert dev2.on_done is None
+            assert modem.timed_call.calls == []
+
+        # Next device waits for its slot in the window.
+        with mock.patch('time.time', mock.MagicMock(return_value=105)):
+            dev1.on_done(True, "Refresh complete", None)
+            assert modem.progress[-1] == (1, 2, 0)
+            t, func = modem.timed_call.calls.pop(0)
+            assert t == 115
+
+            func()
+            dev2.on_done(False, "Command timed out", None)
+            assert modem.progress[-1] == (2, 2, 0)
+            assert modem.timed_call.calls == []
+
+
+#===========================================================================
+class MockDevice:
+    def __init__(self, label, delta=0x05, desc="desc"):
+        self.label = label
+        self.db = IM.db.Device(IM.Address(0x44, 0x55, 0x66))
+        self.db.delta = delta
+        self.db.desc = desc
+        self.db.firmware = 0x41
+        self.db.engine = 2
+        self.on_done = None
+
+    def refresh(self, force=False, group=None, on_done=None):
+        self.on_done = on_done
+
+
+class MockProtocol:
+    def __init__(self):
+        self.queue_size = 0
+
+    def write_queue_size(self):
+        return self.queue_size
+
+
+class MockTimedCall:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, t, func):
+        self.calls.append((t, func))
+
+
+class MockModem:
+    def __init__(self, save_path=None):
+        self.save_path = str(save_path)
+        self.protocol = MockProtocol()
+        self.timed_call = MockTimedCall()
+        self.progress = []
+        self.signal_refresh_progress = IM.Signal()
+        self.signal_refresh_progress.connect(self.on_progress)
+
+    def on_progress(self, modem, done, total, deferred):
+        self.progress.append((done, total, deferred))
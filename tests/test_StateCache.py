@@ -0,0 +1,97 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/StateCache.py
+#
+#===========================================================================
+import json
+import os
+import insteon_mqtt as IM
+import insteon_mqtt.on_off as on_off
+import helpers as H
+
+
+class Test_StateCache:
+    #-----------------------------------------------------------------------
+    def test_record(self, tmpdir):
+        modem = H.main.MockModem(tmpdir)
+        modem.timed_call = MockTimedCall()
+        proto = H.main.MockProtocol()
+        dev = IM.device.Dimmer(proto, modem, IM.Address(0x01, 0x02, 0x03))
+        remote = IM.device.Remote(proto, modem, IM.Address(0x04, 0x05, 0x06),
+                                  "remote", None, 4)
+        path = os.path.join(str(tmpdir), "state.json")
+
+        cache = IM.StateCache(modem, path)
+        cache.connect([dev, remote])
+
+        # Changes schedule a single save.
+        dev._set_state(is_on=True, level=0x80, group=1)
+        dev._set_state(is_on=True, level=0xff, group=1)
+        assert len(modem.timed_call.calls) == 1
+        assert not os.path.exists(path)
+
+        # Manual mode and remote button presses aren't states.
+        dev._set_state(is_on=True, level=0x10, group=1,
+                       mode=on_off.Mode.MANUAL)
+        remote._set_state(is_on=True, group=2)
+
+        modem.timed_call.calls.pop(0)()
+        with open(path) as f:
+            data = json.load(f)
+        assert data == {"01.02.03" : {"1" : {"is_on" : True, "level" : 0xff}}}
+
+        # No changes - no save.
+        dev._set_state(is_on=True, level=0xff, group=1)
+        assert modem.timed_call.calls == []
+
+    #-----------------------------------------------------------------------
+    def test_restore(self, tmpdir):
+        modem = H.main.MockModem(tmpdir)
+        modem.timed_call = MockTimedCall()
+        proto = H.main.MockProtocol()
+        dev = IM.device.Dimmer(proto, modem, IM.Address(0x01, 0x02, 0x03))
+        path = os.path.join(str(tmpdir), "state.json")
+        with open(path, "w") as f:
+            json.dump({"01.02.03" : {"1" : {"is_on" : True, "level" : 0x80}}},
+                      f)
+
+        calls = []
+
+        def callback(device, **kwargs):
+            calls.append(kwargs)
+
+        dev.signal_state.connect(callback)
+
+        cache = IM.StateCache(modem, path)
+        cache.load()
+        cache.connect([dev])
+
+        # Restored state is set on the device and published.
+        assert dev._level == 0x80
+        assert len(calls) == 1
+        assert calls[0]['level'] == 0x80
+        assert calls[0]['reason'] == on_off.REASON_CACHE
+
+        # Nothing changed so nothing to save.
+        assert modem.timed_call.calls == []
+
+    #-----------------------------------------------------------------------
+    def test_bad_file(self, tmpdir):
+        modem = H.main.MockModem(tmpdir)
+        path = os.path.join(str(tmpdir), "state.json")
+        with open(path, "w") as f:
+            f.write("{junk")
+
+        cache = IM.StateCache(modem, path)
+        cache.load()
+        assert cache.states == {}
+
+
+#===========================================================================
+class MockTimedCall:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, t, func):
+        self.calls.append(func)
+        return func
@@ -80,6 +80,105 @@ class Test_config:
         val = IM.config.validate(file)
         assert val != ""
 
+    #-----------------------------------------------------------------------
+    def test_load_validated(self, tmpdir):
+        tmpdir.join("config.yaml").write(
+            "insteon: !include insteon.yaml\n"
+            "mqtt:\n"
+            "  broker: 127.0.0.1\n"
+            "  port: 1883\n")
+        tmpdir.join("insteon.yaml").write(
+            "port: '/dev/insteon'\n"
+            "address: 44.85.11\n")
+
+        file = str(tmpdir.join("config.yaml"))
+        cfg, error = IM.config.load_validated(file)
+        assert error == ""
+        assert cfg == IM.config.load(file)
+        assert os.path.exists(IM.config.cache_file(file))
+
+        # Unchanged files are loaded from the cache without validation.
+        with mock.patch.object(IM.config, "validate_config") as validate:
+            cfg2, error = IM.config.load_validated(file)
+            assert error == ""
+            assert cfg2 == cfg
+            validate.assert_not_called()
+
+        # Changing an included file invalidates the cache.
+        tmpdir.join("insteon.yaml").write("storage: 'foo'\n", mode="a")
+        with mock.patch.object(IM.config, "validate_config",
+                               return_value="") as validate:
+            cfg2, error = IM.config.load_validated(file)
+            validate.assert_called_once()
+            assert cfg2["insteon"]["storage"] == "foo"
+
+        # Errors are returned and not cached.
+        tmpdir.join("insteon.yaml").write("port: 5\n", mode="a")
+        cfg2, error = IM.config.load_validated(file)
+        assert cfg2 is None
+        assert error != ""
+        cfg2, error2 = IM.config.load_validated(file)
+        assert error2 == error
+
+    #-----------------------------------------------------------------------
+    def test_reload(self, tmpdir):
+        file = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            'configs', 'basic.yaml')
+        mqtt = mock.MagicMock()
+        modem = mock.MagicMock()
+        modem.reload_config.return_value = {'added' : ['a'], 'removed' : [],
+                                            'renamed' : []}
+        on_done = mock.MagicMock()
+        with mock.patch.object(IM.config, "cache_file",
+                               return_value=str(tmpdir.join("cache"))):
+            IM.config.reload(file, mqtt, modem, on_done)
+
+        cfg = IM.config.load(file)
+        mqtt.reload_config.assert_called_once_with(cfg['mqtt'])
+        modem.reload_config.assert_called_once_with(cfg['insteon'])
+        on_done.assert_called_once_with(
+            True, "Config reloaded: 1 added, 0 removed, 0 renamed",
+            modem.reload_config.return_value)
+
+        # Invalid configs aren't applied.
+        file = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            'configs', 'bad_plm.yaml')
+        on_done.reset_mock()
+        mqtt.reset_mock()
+        with mock.patch.object(IM.config, "cache_file",
+                               return_value=str(tmpdir.join("cache"))):
+            IM.config.reload(file, mqtt, modem, on_done)
+        assert on_done.call_args[0][0] is False
+        mqtt.reload_config.assert_not_called()
+
+        # YAML syntax errors and bad device entries are reported the same.
+        # Validation is skipped to check the device entries are parsed.
+        modem.reset_mock()
+
+        def load(path):
+            return IM.config.load(path), ""
+
+        for text in ("insteon: [bad", "insteon:\n  devices:\n    bad: [aa]"):
+            bad_file = tmpdir.join("bad.yaml")
+            bad_file.write(text)
+            on_done.reset_mock()
+            with mock.patch.object(IM.config, "load_validated", load):
+                IM.config.reload(str(bad_file), mqtt, modem, on_done)
+            assert on_done.call_args[0][0] is False
+            mqtt.reload_config.assert_not_called()
+            modem.reload_config.assert_not_called()
+
+        # Errors applying the config are reported.
+        file = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            'configs', 'basic.yaml')
+        on_done.reset_mock()
+        modem.reload_config.side_effect = ValueError("bad")
+        with mock.patch.object(IM.config, "cache_file",
+                               return_value=str(tmpdir.join("cache"))):
+            IM.config.reload(file, mqtt, modem, on_done)
+        on_done.assert_called_once_with(False, "Config reload failed: bad",
+                                        None)
+
     #-----------------------------------------------------------------------
     def test_validate_example(self):
         file = os.path.join(os.path.dirname(os.path.realpath(__file__)),
@@ -0,0 +1,102 @@
+#===========================================================================
+#
+# Tests for: insteont_mqtt/log.py
+#
+#===========================================================================
+import json
+import logging
+import queue
+import threading
+import pytest
+import insteon_mqtt as IM
+
+# Some tests replace threading.Thread with a mock.  Save the real one for
+# the queue listener.
+Thread = threading.Thread
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    monkeypatch.setattr(threading, "Thread", Thread)
+
+    # initialize() adds handlers to the library logger so restore it after
+    # each test.
+    log_obj = IM.log.get_logger()
+    handlers = log_obj.handlers[:]
+    level = log_obj.level
+    yield log_obj
+
+    IM.log.stop_queue()
+    for handler in log_obj.handlers[:]:
+        if handler not in handlers:
+            log_obj.removeHandler(handler)
+            handler.close()
+    log_obj.setLevel(level)
+
+
+class Test_log:
+    #-----------------------------------------------------------------------
+    def test_queue_json(self, logger, tmpdir):
+        path = str(tmpdir.join("log.txt"))
+        config = {"logging" : {"queue_size" : 10, "format" : "json"}}
+        IM.log.initialize(logging.INFO, False, path, config)
+        assert isinstance(logger.handlers[-1], IM.log.DropQueueHandler)
+
+        logger.info("Message %d", 1)
+        logger.debug("Not logged")
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("Error")
+
+        # Stopping the queue writes the queued records.
+        IM.log.stop_queue()
+        with open(path) as f:
+            lines = [json.loads(i) for i in f]
+
+        assert len(lines) == 2
+        assert lines[0]["level"] == "INFO"
+        assert lines[0]["module"] == "test_log"
+        assert lines[0]["msg"] == "Message 1"
+        assert lines[1]["msg"] == "Error"
+        assert "ValueError: bad" in lines[1]["exc"]
+
+    #-----------------------------------------------------------------------
+    def test_queue_text(self, logger, tmpdir):
+        path = str(tmpdir.join("log.txt"))
+        config = {"logging" : {"queue_size" : 10}}
+        IM.log.initialize(logging.INFO, False, path, config)
+
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("Error %d", 1)
+
+        IM.log.stop_queue()
+        with open(path) as f:
+            text = f.read()
+
+        assert "Error 1" in text
+        assert text.count("ValueError: bad") == 1
+
+    #-----------------------------------------------------------------------
+    def test_drop(self):
+        record_queue = queue.Queue(2)
+        handler = IM.log.DropQueueHandler(record_queue)
+
+        def record(msg):
+            return logging.makeLogRecord({"msg" : msg})
+
+        for i in range(4):
+            handler.handle(record("msg %d" % i))
+        assert handler.dropped == 2
+
+        # The number of dropped records is logged once there is room.
+        record_queue.get_nowait()
+        record_queue.get_nowait()
+        handler.handle(record("msg 4"))
+        msgs = [record_queue.get_nowait().getMessage() for i in range(2)]
+        assert msgs == ["Logging queue full, dropped 2 messages", "msg 4"]
+
+        handler.handle(record("msg 5"))
+        assert record_queue.get_nowait().getMessage() == "msg 5"
@@ -4,6 +4,8 @@
 #
 # pylint: disable=blacklisted-name, attribute-defined-outside-init
 #===========================================================================
+import subprocess
+import sys
 import pytest
 import insteon_mqtt as IM
 
@@ -208,5 +210,31 @@ class Test_util:
         v = IM.util.input_byte(inputs, 'key7')
         assert 'Valid inputs are 0-255' in caplog.text
 
+    #-----------------------------------------------------------------------
+    def test_lazy_import(self):
+        # Loading a sub-module with the same name doesn't hide the class.
+        import insteon_mqtt.network.TopicTrie
+        assert isinstance(IM.network.TopicTrie, type)
+        mod = sys.modules["insteon_mqtt.network.TopicTrie"]
+        assert IM.network.TopicTrie is mod.TopicTrie
+        assert "TopicTrie" in dir(IM.network)
+
+        # Other sub-modules work as attributes.
+        assert IM.mqtt.topic.StateTopic.__name__ == "StateTopic"
+
+        with pytest.raises(AttributeError):
+            IM.network.Foo
+
+    #-----------------------------------------------------------------------
+    def test_cli_imports(self):
+        # The command line tool shouldn't load the server modules.
+        code = ("import sys, insteon_mqtt.cmd_line.main; "
+                "print([i for i in ('jinja2', 'requests', 'serial', "
+                "'insteon_mqtt.Modem', 'insteon_mqtt.mqtt.Mqtt') "
+                "if i in sys.modules])")
+        out = subprocess.check_output([sys.executable, "-c", code],
+                                      universal_newlines=True)
+        assert out.strip() == "[]"
+
 
 #===========================================================================
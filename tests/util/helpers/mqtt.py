@@ -10,6 +10,7 @@ class MockModem:
     """Mock insteon_mqtt/mqtt/Modem class
     """
     signal_new_device = IM.Signal()
+    signal_remove_device = IM.Signal()
 
 
 #===========================================================================
@@ -20,7 +20,7 @@ class MockMqtt:
         self.pub.append(Data(topic=topic, payload=payload, qos=qos,
                              retain=retain))
 
-    def subscribe(self, topic, qos, callback):
+    def subscribe(self, topic, qos, callback, topic_filter=None):
         self.sub.append(Data(topic=topic, qos=qos, callback=callback))
 
     def unsubscribe(self, topic, qos, callback):
@@ -54,12 +54,26 @@ class MockMqttClient:
 
     def unsubscribe(self, topic):
         self.unsub.append(Data(topic=topic))
-        self.cb.pop(topic, None)
 
     def message_callback_add(self, topic, callback):
         self.cb[topic] = callback
 
+    def message_callback_remove(self, topic):
+        self.cb.pop(topic, None)
+
     def will_set(self, topic, payload, qos, retain):
         pass
 
+    def connect_async(self, host, port, keepalive):
+        self.host = (host, port, keepalive)
+
+    def loop_start(self):
+        self.thread = True
+
+    def loop_stop(self):
+        self.thread = False
+
+    def disconnect(self):
+        pass
+
 #===========================================================================